@@ -0,0 +1,5 @@
+# backend/benchmarks/__init__.py
+# Synthetic-instance benchmarks for the solver pipeline (run: python -m benchmarks.run).
+from .instances import generate_request, TIERS
+
+__all__ = ["generate_request", "TIERS"]
@@ -0,0 +1,86 @@
+# backend/benchmarks/instances.py
+# Seeded generator of realistic TimetableRequest instances. Loads are drawn so
+# the pre-solve capacity checks pass: every class fills roughly `utilisation` of
+# its week, lectures stay within one per subject per day and labs are double
+# blocks split evenly across batches.
+from models import TimetableRequest
+from typing import Dict, Any, Optional
+import random
+import math
+
+# Benchmark tiers (generate_request keyword arguments)
+TIERS: Dict[str, Dict[str, Any]] = {
+    "small": {"classes": 6, "subjects": 6, "lab_ratio": 0.3},
+    "medium": {"classes": 15, "subjects": 7, "lab_ratio": 0.3},
+    "large": {"classes": 40, "subjects": 7, "lab_ratio": 0.3},
+    "xlarge": {"classes": 120, "subjects": 8, "lab_ratio": 0.25},  # past LNS_CLASS_THRESHOLD
+    # Infeasible (labs do not fit): times the proof, which symmetry handling must not slow down
+    "lab_bound": {"classes": 3, "batches": 3, "days": 3, "periods": 6, "utilisation": 0.95, "seed": 6},
+}
+
+
+def generate_request(classes: int = 6, batches: int = 2, faculty: Optional[int] = None, subjects: int = 6,
+                     lab_ratio: float = 0.3, days: int = 5, periods: int = 8, utilisation: float = 0.7,
+                     seed: int = 0) -> TimetableRequest:
+    """Random but reproducible request.
+
+    `subjects` is per class, `lab_ratio` the share of them that are labs. Without
+    `faculty`, enough faculty are created for each to teach about half a week;
+    loads go to the least-loaded faculty, so a small `faculty` count produces
+    overloaded (infeasible) instances on purpose.
+    """
+    rnd = random.Random(seed)
+    class_names = [f"Class {i + 1}" for i in range(classes)]
+    batch_names = [f"Batch {i + 1}" for i in range(batches)]
+    week = days * periods
+    num_labs = min(subjects, round(subjects * lab_ratio)) if batches else 0
+    num_lectures = subjects - num_labs
+
+    # --- Per-class loads: (subject, lecture_load, lab_load) ---
+    loads = []
+    for cls in class_names:
+        budget = int(week * utilisation)
+        lab_subjects = []
+        for s in range(num_labs):
+            per_batch = 2 * rnd.randint(1, min(2, days))  # one or two double blocks per batch
+            if per_batch > budget:
+                break
+            budget -= per_batch
+            lab_subjects.append((f"Subject {num_lectures + s + 1} Lab", 0, per_batch * batches))
+
+        lecture_subjects = []
+        if num_lectures:
+            share = min(days, max(1, budget // num_lectures))
+            for s in range(num_lectures):
+                lecture_subjects.append((f"Subject {s + 1}", max(1, share - rnd.randint(0, 1)), 0))
+        for subject, lecture, lab in lecture_subjects + lab_subjects:
+            loads.append((cls, subject, lecture, lab))
+
+    # --- Faculty: spread the loads over the least-loaded members ---
+    total = sum(lecture + lab for _, _, lecture, lab in loads)
+    num_faculty = faculty or max(1, math.ceil(total / (week * 0.5)))
+    assigned = {f"Faculty {i + 1}": [] for i in range(num_faculty)}
+    taught = {name: 0 for name in assigned}
+    rnd.shuffle(loads)
+    for cls, subject, lecture, lab in sorted(loads, key=lambda l: -(l[2] + l[3])):
+        name = min(taught, key=lambda n: (taught[n], rnd.random()))
+        assigned[name].append({"subject": subject, "class_name": cls, "lecture_load": lecture, "lab_load": lab})
+        taught[name] += lecture + lab
+
+    # --- Rooms: one classroom per class, labs sized to the double blocks with headroom ---
+    lab_blocks = sum(lab for _, _, _, lab in loads) // 2
+    blocks_per_lab = days * (periods // 2)
+    labs = max(batches, math.ceil(lab_blocks * 1.5 / blocks_per_lab)) if lab_blocks else 0
+
+    return TimetableRequest(
+        workingDays=days,
+        periods=periods,
+        classes=class_names,
+        batches=batch_names,
+        classrooms=[f"C{i + 1}" for i in range(classes)],
+        labs=[f"Lab {i + 1}" for i in range(labs)],
+        syllabus={},
+        faculty=[{"name": name, "load_assignments": items} for name, items in assigned.items() if items],
+        userId="benchmark",
+        title=f"benchmark-{classes}c-seed{seed}",
+    )
@@ -0,0 +1,313 @@
+# backend/benchmarks/load.py
+# End-to-end load test of the HTTP API. Starts one uvicorn process on the
+# in-memory database (MONGO_URI=memory://, see storage.py) unless --url points
+# at a running server, saves synthetic timetables, then drives a weighted mix
+# of endpoints from `concurrency` closed-loop clients and reports throughput
+# and p50/p95/p99 latency per endpoint (a /generate answered 200 with an ERROR
+# body, e.g. QUEUE_FULL, counts as an error). Server-side queueing is split out
+# twice: latency minus the app's own time (Server-Timing header) is time spent
+# waiting for the event loop, and /metrics gives the time /generate jobs
+# waited for a solver worker.
+#
+#   cd backend
+#   python -m benchmarks.load --concurrency 16 --duration 60 --mix generate=1,add=4,get-timetables=4
+#   python -m benchmarks.load --url http://localhost:8000 --tier medium --requests 500
+from typing import Dict, List, Any, Optional, Tuple
+import subprocess
+import argparse
+import asyncio
+import random
+import socket
+import json
+import time
+import sys
+import os
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.instances import generate_request, TIERS
+from benchmarks.run import environment
+
+ENDPOINTS = ("generate", "add", "get-timetables", "timetables")
+DEFAULT_MIX = "generate=1,add=4,get-timetables=4"
+PERCENTILES = (50, 95, 99)
+SERVER_START_TIMEOUT = 60.0
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"generate=1,add=4" -> {endpoint: weight}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}' (use {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def server_time(response: httpx.Response) -> Optional[float]:
+    """Seconds the app spent on a request, from its `Server-Timing: app;dur=<ms>` header."""
+    for metric in response.headers.get("server-timing", "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "app" and params.startswith("dur="):
+            return float(params[4:]) / 1000
+    return None
+
+
+# --- /metrics: job queue waits from histogram deltas ---
+
+def histogram(text: str, name: str) -> Dict[float, float]:
+    """Cumulative bucket counts {upper bound: count} of one histogram in a Prometheus exposition."""
+    buckets = {}
+    for family in text_string_to_metric_families(text):
+        if family.name == name:
+            for sample in family.samples:
+                if sample.name == name + "_bucket":
+                    buckets[float(sample.labels["le"])] = sample.value
+    return buckets
+
+
+def histogram_quantile(q: float, before: Dict[float, float], after: Dict[float, float]) -> Optional[float]:
+    """Quantile of the observations made between two scrapes, interpolated within buckets like PromQL."""
+    bounds = sorted(after)
+    counts = [after[b] - before.get(b, 0) for b in bounds]
+    if not counts or counts[-1] <= 0:
+        return None
+    rank = q / 100 * counts[-1]
+    lower, below = 0.0, 0.0
+    for bound, count in zip(bounds, counts):
+        if count >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(count - below, 1e-12)
+        lower, below = bound, count
+    return lower
+
+
+# --- Synthetic workload ---
+
+class Workload:
+    """Request bodies: `distinct` generated requests and the saved-timetable bodies /add posts."""
+    def __init__(self, tier: str, distinct: int, solve_time_limit: Optional[float]):
+        self.requests = [generate_request(**TIERS[tier], seed=seed).dict() for seed in range(distinct)]
+        for body in self.requests:
+            body.pop("userId", None)
+        self.solve_time_limit = solve_time_limit
+        self.saved: List[Dict[str, Any]] = []
+
+    async def prepare(self, client: httpx.AsyncClient, saved: int):
+        """Solve every request once (bodies for /add, as the frontend saves them) and pre-fill the store."""
+        for body in self.requests:
+            response = await client.post("/generate", json=body, timeout=None)
+            result = response.json()
+            if result.get("status") != "FEASIBLE":
+                raise RuntimeError(f"warm-up solve of {body['title']} failed: {result.get('message')}")
+            self.saved.append({**result, "title": body["title"], "faculty": body["faculty"]})
+        for i in range(saved):
+            (await client.post("/add", json=self.saved[i % len(self.saved)])).raise_for_status()
+
+    def call(self, endpoint: str, rnd: random.Random) -> Tuple[str, str, Dict[str, Any]]:
+        if endpoint == "generate":
+            # time_limit is part of the solution cache key: a unique one per call (microsecond offsets) always solves
+            params = {"time_limit": self.solve_time_limit + rnd.random() * 1e-3} if self.solve_time_limit else {}
+            return "POST", "/generate", {"json": rnd.choice(self.requests), "params": params}
+        if endpoint == "add":
+            return "POST", "/add", {"json": rnd.choice(self.saved)}
+        if endpoint == "get-timetables":
+            return "GET", "/get-timetables/load-test", {}
+        return "GET", "/timetables", {}
+
+
+async def run_load(client: httpx.AsyncClient, workload: Workload, mix: Dict[str, float], concurrency: int,
+                   duration: Optional[float], total: Optional[int], seed: int) -> Tuple[List[Dict[str, Any]], float]:
+    """Closed loop: each client sends its next request as soon as the previous one is answered."""
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    samples: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+    issued = 0
+
+    async def client_loop(index: int):
+        nonlocal issued
+        rnd = random.Random(seed * 1000 + index)
+        while (deadline is None or time.perf_counter() < deadline) and (total is None or issued < total):
+            issued += 1
+            endpoint = rnd.choices(names, weights)[0]
+            method, path, kwargs = workload.call(endpoint, rnd)
+            sent = time.perf_counter()
+            try:
+                response = await client.request(method, path, timeout=None, **kwargs)
+                status, app = response.status_code, server_time(response)
+                outcome = str(status)
+                if endpoint == "generate" and status == 200:
+                    # Solver failures and QUEUE_FULL come back as 200 with an ERROR body
+                    body = response.json()
+                    if body.get("status") == "ERROR":
+                        outcome = body.get("error_type") or "ERROR"
+            except (httpx.HTTPError, ValueError):
+                status, app = 0, None
+                outcome = "0"
+            samples.append({"endpoint": endpoint, "status": status, "ok": 200 <= status < 300 and outcome == str(status),
+                            "outcome": outcome, "latency": time.perf_counter() - sent, "app": app})
+
+    await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def summarise(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    report = {}
+    for endpoint in ENDPOINTS:
+        rows = [s for s in samples if s["endpoint"] == endpoint]
+        if not rows:
+            continue
+        latencies = [s["latency"] for s in rows]
+        queueing = [max(0.0, s["latency"] - s["app"]) for s in rows if s["app"] is not None]
+        statuses: Dict[str, int] = {}
+        for s in rows:
+            statuses[s["outcome"]] = statuses.get(s["outcome"], 0) + 1
+        report[endpoint] = {
+            "requests": len(rows),
+            "errors": sum(1 for s in rows if not s["ok"]),
+            "statuses": statuses,
+            "throughput": round(len(rows) / elapsed, 2),
+            "latency": {**{f"p{q}": percentile(latencies, q) for q in PERCENTILES}, "max": max(latencies)},
+            "queueing": {f"p{q}": percentile(queueing, q) for q in PERCENTILES},
+        }
+    return report
+
+
+# --- Server under test ---
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=backend, env={**os.environ, **env},
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, process: Optional[subprocess.Popen]):
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while time.perf_counter() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            # Ready means the solver pool is warm; servers without /ready count as ready once they answer
+            if (await client.get("/ready")).status_code in (200, 404):
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server was not ready within {SERVER_START_TIMEOUT:g}s")
+
+
+def print_report(report: Dict[str, Any]):
+    ms = lambda seconds: f"{seconds * 1000:9.1f}" if seconds is not None else f"{'-':>9}"
+    print(f"{'endpoint':<15}{'reqs':>7}{'errors':>7}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'queue p50':>10}{'queue p99':>10}")
+    for endpoint, row in report["endpoints"].items():
+        latency, queueing = row["latency"], row["queueing"]
+        print(f"{endpoint:<15}{row['requests']:>7}{row['errors']:>7}{row['throughput']:>9.2f}"
+              f"{ms(latency['p50'])}{ms(latency['p95'])}{ms(latency['p99'])}{ms(latency['max'])}"
+              f" {ms(queueing['p50'])} {ms(queueing['p99'])}")
+    waits = report.get("job_queue_wait")
+    if waits:
+        print("solver job queue wait: " + "  ".join(f"{q} {ms(v).strip()} ms" for q, v in waits.items()))
+
+
+async def main_async(args) -> Dict[str, Any]:
+    process = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        env = {"MONGO_URI": args.mongo_uri}
+        if args.solver_workers:
+            env["SOLVER_WORKERS"] = str(args.solver_workers)
+        process = start_server(port, env)
+        url = f"http://127.0.0.1:{port}"
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+            await wait_until_up(client, process)
+            workload = Workload(args.tier, args.distinct, None if args.cached else args.solve_time_limit)
+            print(f"Preparing {args.distinct} {args.tier} timetable(s) and {args.saved} saved document(s) on {url}")
+            await workload.prepare(client, args.saved)
+
+            metrics_before = (await client.get("/metrics")).text
+            print(f"Running {args.concurrency} client(s), mix {args.mix}, "
+                  + (f"{args.requests} requests" if args.requests else f"{args.duration:g}s"))
+            samples, elapsed = await run_load(client, workload, args.mix, args.concurrency,
+                                              None if args.requests else args.duration, args.requests, args.seed)
+            metrics_after = (await client.get("/metrics")).text
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    wait_name = "timetable_job_queue_wait_seconds"
+    before, after = histogram(metrics_before, wait_name), histogram(metrics_after, wait_name)
+    return {
+        "environment": environment(),
+        "settings": {"url": args.url, "tier": args.tier, "concurrency": args.concurrency, "mix": args.mix,
+                     "distinct": args.distinct, "saved": args.saved, "cached": args.cached,
+                     "solve_time_limit": args.solve_time_limit, "solver_workers": args.solver_workers},
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(samples) / elapsed, 2),
+        "endpoints": summarise(samples, elapsed),
+        "job_queue_wait": {f"p{q}": histogram_quantile(q, before, after) for q in PERCENTILES}
+        if histogram_quantile(50, before, after) is not None else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the timetable API with a mix of endpoints.")
+    parser.add_argument("--url", help="server to test (default: start uvicorn on the in-memory database)")
+    parser.add_argument("--mongo-uri", default="memory://", help="MONGO_URI of the started server")
+    parser.add_argument("--solver-workers", type=int, help="SOLVER_WORKERS of the started server")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (ignored with --requests)")
+    parser.add_argument("--requests", type=int, help="stop after this many requests instead")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"endpoint weights, e.g. {DEFAULT_MIX} (endpoints: {', '.join(ENDPOINTS)})")
+    parser.add_argument("--tier", choices=sorted(TIERS), default="small", help="size of the synthetic timetables")
+    parser.add_argument("--distinct", type=int, default=4, help="distinct requests to cycle through")
+    parser.add_argument("--saved", type=int, default=20, help="timetables saved before the run")
+    parser.add_argument("--solve-time-limit", type=float, default=30.0, help="time_limit of /generate calls")
+    parser.add_argument("--cached", action="store_true", help="let /generate hit the solution cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report JSON here")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.distinct < 1:
+        parser.error("--concurrency and --distinct must be at least 1")
+
+    report = asyncio.run(main_async(args))
+    print(f"{sum(row['requests'] for row in report['endpoints'].values())} requests in {report['elapsed']:.1f}s "
+          f"({report['throughput']:.1f} req/s)")
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
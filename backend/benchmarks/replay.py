@@ -0,0 +1,101 @@
+# backend/benchmarks/replay.py
+# Offline replay of model dumps (see modeldump.py): re-solve the recorded
+# CpModelProto with the recorded parameters, or with overrides, and compare
+# against the recorded outcome. --full re-runs the whole pipeline on the
+# recorded request instead.
+#
+#   cd backend
+#   python -m benchmarks.replay dumps/20250101T120000000000-3f2a9c1d0b7e
+#   python -m benchmarks.replay dumps/ --param num_workers=1 --param search_branching=FIXED_SEARCH
+from typing import Dict, List, Any, Optional
+import argparse
+import json
+import sys
+
+from modeldump import find_dumps, load_model, load_meta, load_request, merge_parameters, parameters_text
+
+# Statuses that end a search with an answer (a solution proven optimal, or a proof of infeasibility)
+CONCLUSIVE = ("OPTIMAL", "INFEASIBLE")
+
+
+def solve_dump(model, recorded: str = "", overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Solve a dumped model with its recorded SatParameters text, then `overrides` ({field: value}) on top."""
+    from ortools.sat.python import cp_model
+
+    solver = cp_model.CpSolver()
+    merge_parameters(solver.parameters, recorded)
+    if overrides:
+        merge_parameters(solver.parameters, parameters_text(overrides))
+    status = solver.Solve(model)
+    result = {
+        "status": solver.StatusName(status),
+        "wall_time": round(solver.WallTime(), 4),
+        "conflicts": solver.NumConflicts(),
+        "branches": solver.NumBranches(),
+    }
+    if model.HasObjective() and status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["objective"] = solver.ObjectiveValue()
+        result["bound"] = solver.BestObjectiveBound()
+    return result
+
+
+def parse_overrides(pairs: List[str]) -> Dict[str, Any]:
+    """name=value pairs; values are JSON where possible (numbers, booleans), otherwise strings (enum names)."""
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        try:
+            overrides[name] = json.loads(value)
+        except ValueError:
+            overrides[name] = value
+    return overrides
+
+
+def replay(path: str, overrides: Dict[str, Any], time_limit: Optional[float] = None) -> Dict[str, Any]:
+    meta = load_meta(path)
+    if time_limit is not None:
+        overrides = {**overrides, "max_time_in_seconds": time_limit}
+    return {"recorded": {k: meta.get(k) for k in ("status", "wall_time", "objective")},
+            **solve_dump(load_model(path), meta.get("parameters", ""), overrides)}
+
+
+def replay_full(path: str, time_limit: Optional[float] = None) -> Dict[str, Any]:
+    from generator import generate_from_input, TimetableError
+
+    try:
+        result = generate_from_input(load_request(path), time_limit=time_limit)
+        return {"status": "OK", "stop_reason": result["stop_reason"], "diagnostics": result["diagnostics"]}
+    except TimetableError as e:
+        return {"status": e.error_type, "diagnostics": e.details.get("diagnostics", {})}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay dumped CP-SAT models offline.")
+    parser.add_argument("dumps", nargs="+", help="dump directories, or directories holding dumps")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a recorded SatParameters field (repeatable)")
+    parser.add_argument("--time-limit", type=float)
+    parser.add_argument("--full", action="store_true", help="re-run generate_from_input on the recorded request")
+    args = parser.parse_args(argv)
+
+    dumps = find_dumps(args.dumps)
+    if not dumps:
+        print("No model dumps found.")
+        return 1
+    overrides = parse_overrides(args.param)
+    for path in dumps:
+        if args.full:
+            result = replay_full(path, args.time_limit)
+            timings = result["diagnostics"].get("timings", {})
+            print(f"{path}: {result['status']} {result.get('stop_reason') or ''} "
+                  f"build {timings.get('model_build', 0):.3f}s solve {timings.get('solve', 0):.3f}s")
+        else:
+            result = replay(path, overrides, args.time_limit)
+            recorded = result["recorded"]
+            print(f"{path}: {result['status']:<10} {result['wall_time']:>8.3f}s objective {result.get('objective')} "
+                  f"(recorded {recorded['status']} {recorded['wall_time']}s objective {recorded['objective']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
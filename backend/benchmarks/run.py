@@ -0,0 +1,162 @@
+# backend/benchmarks/run.py
+# Benchmark runner: solves generated instances per tier, each in a fresh process
+# (so peak RSS is per instance), writes the results as JSON and optionally fails
+# when a run regresses against a stored baseline.
+#
+#   cd backend
+#   python -m benchmarks.run --tier small medium --output bench.json
+#   python -m benchmarks.run --tier small medium --baseline bench.json --tolerance 0.25
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+import multiprocessing
+import platform
+import argparse
+import json
+import time
+import sys
+import os
+
+from benchmarks.instances import generate_request, TIERS
+
+# Metrics compared against the baseline (lower is better)
+COMPARED_METRICS = ("wall_time", "model_build", "solve", "peak_rss_mb")
+# Differences smaller than these are noise, whatever the ratio
+MIN_DELTA = {"wall_time": 0.05, "model_build": 0.02, "solve": 0.05, "peak_rss_mb": 10.0}
+INSTANCE_PARAMS = ("classes", "batches", "faculty", "subjects", "lab_ratio", "days", "periods")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_instance(params: Dict[str, Any], solve_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate and solve one instance (runs inside a benchmark worker process)."""
+    from generator import generate_from_input, TimetableError
+
+    request = generate_request(**params)
+    started = time.perf_counter()
+    try:
+        result = generate_from_input(request, **solve_options)
+        status, diagnostics = "OK", result["diagnostics"]
+    except TimetableError as e:
+        status, diagnostics = e.error_type, e.details.get("diagnostics", {})
+    wall_time = time.perf_counter() - started
+
+    timings = diagnostics.get("timings", {})
+    model = diagnostics.get("model", {})
+    search = diagnostics.get("search", {})
+    return {
+        "status": status,
+        "wall_time": round(wall_time, 4),
+        "model_build": timings.get("model_build", 0.0),
+        "solve": timings.get("solve", 0.0),
+        "peak_rss_mb": _peak_rss_mb(),
+        "variables": model.get("variables", 0),
+        "constraints": model.get("constraints", 0),
+        "models": model.get("models", 0),
+        "solver_statuses": diagnostics.get("statuses", {}),
+        "conflicts": search.get("conflicts", 0),
+        "branches": search.get("branches", 0),
+    }
+
+
+def run_tier(name: str, params: Dict[str, Any], solve_options: Dict[str, Any], repeat: int = 1) -> Dict[str, Any]:
+    """Best (fastest) of `repeat` runs, each in a freshly spawned process."""
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            runs.append(pool.submit(run_instance, params, solve_options).result())
+    best = min(runs, key=lambda r: r["wall_time"])
+    return {"tier": name, "params": params, "repeat": repeat, **best}
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of `results` against a previous run's JSON (matched by tier and params)."""
+    previous = {(r["tier"], json.dumps(r["params"], sort_keys=True)): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = previous.get((result["tier"], json.dumps(result["params"], sort_keys=True)))
+        if base is None:
+            continue
+        if result["status"] != base["status"]:
+            regressions.append(f"{result['tier']}: status {base['status']} -> {result['status']}")
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > MIN_DELTA[metric]:
+                regressions.append(f"{result['tier']}: {metric} {old} -> {new} (+{(new - old) / old:.0%})" if old
+                                   else f"{result['tier']}: {metric} {old} -> {new}")
+    return regressions
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        from ortools import __version__ as ortools_version
+    except ImportError:
+        ortools_version = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "ortools": ortools_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the timetable solver on synthetic instances.")
+    parser.add_argument("--tier", nargs="+", choices=sorted(TIERS), default=["small", "medium"])
+    parser.add_argument("--seed", type=int, help="instance seed (default: the tier's, else 0)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per tier; the fastest is kept")
+    for param in INSTANCE_PARAMS:
+        kind = float if param == "lab_ratio" else int
+        parser.add_argument("--" + param.replace("_", "-"), dest=param, type=kind, help="override the tier's value")
+    parser.add_argument("--mode", choices=("auto", "exact", "lns"), default="auto")
+    parser.add_argument("--time-limit", type=float)
+    parser.add_argument("--no-decompose", action="store_true")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    overrides = {p: getattr(args, p) for p in INSTANCE_PARAMS if getattr(args, p) is not None}
+    solve_options = {"mode": args.mode, "time_limit": args.time_limit, "decompose": not args.no_decompose}
+
+    results = []
+    for name in args.tier:
+        params = {"seed": 0, **TIERS[name], **overrides}
+        if args.seed is not None:
+            params["seed"] = args.seed
+        result = run_tier(name, params, solve_options, args.repeat)
+        results.append(result)
+        print(f"{name:>7}: {result['status']:<10} wall {result['wall_time']:>8.3f}s  build {result['model_build']:>7.3f}s  "
+              f"solve {result['solve']:>8.3f}s  rss {result['peak_rss_mb']} MB  "
+              f"vars {result['variables']}  cons {result['constraints']}  {result['solver_statuses']}")
+
+    report = {"environment": environment(), "solve_options": solve_options, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# backend/benchmarks/tune.py
+# CP-SAT parameter tuning over a corpus of model dumps (see modeldump.py).
+# Coordinate search: starting from the defaults, each parameter group in turn
+# is swept with the others held at their best values so far; every candidate
+# is scored over all models and seeds by PAR2 (wall time, twice the time limit
+# for runs that end without an answer). A candidate replaces the best so far
+# only when it beats it by MIN_IMPROVEMENT, so run-to-run noise is not picked
+# up. The winner is written to a candidate file; copy it over the tuning file
+# the generator loads at startup (SOLVER_TUNING_FILE) to promote it.
+#
+#   cd backend
+#   python -m benchmarks.tune dumps/ --time-limit 30 --seeds 0 1 2
+#   cp solver_tuning.candidate.json solver_tuning.json
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+import argparse
+import json
+import sys
+import os
+
+from jobs import available_cores
+from modeldump import find_dumps, load_model, load_meta
+from benchmarks.replay import solve_dump, CONCLUSIVE
+from benchmarks.run import environment
+
+# Parameter groups swept in order; each candidate is a partial SatParameters dict
+SEARCH_SPACE: List[Tuple[str, List[Dict[str, Any]]]] = [
+    ("num_workers", [{"num_workers": n} for n in (1, 2, 4, 8, 16)]),
+    ("search_branching", [{"search_branching": b} for b in
+                          ("AUTOMATIC_SEARCH", "FIXED_SEARCH", "PORTFOLIO_SEARCH", "LP_SEARCH", "PSEUDO_COST_SEARCH")]),
+    ("presolve", [{"cp_model_presolve": False}, {"max_presolve_iterations": 1}, {"max_presolve_iterations": 3}]),
+    ("linearization_level", [{"linearization_level": level} for level in (0, 1, 2)]),
+]
+# Relative PAR2 gain a candidate needs over the best so far to replace it
+MIN_IMPROVEMENT = 0.05
+CANDIDATE_FILE = "solver_tuning.candidate.json"
+# Recorded settings kept for every trial: they belong to the request, not to the tuning
+RECORDED_PARAMETERS = ("relative_gap_limit",)
+
+
+def recorded_parameters(meta: Dict[str, Any]) -> str:
+    lines = (meta.get("parameters") or "").splitlines()
+    return "\n".join(line for line in lines if line.split(":")[0].strip() in RECORDED_PARAMETERS)
+
+
+def par2(result: Dict[str, Any], time_limit: float) -> float:
+    return result["wall_time"] if result["status"] in CONCLUSIVE else 2 * time_limit
+
+
+def evaluate(corpus: List[Tuple[str, Any, Dict[str, Any]]], candidate: Dict[str, Any], time_limit: float,
+             seeds: List[int]) -> Dict[str, Any]:
+    """Mean PAR2 of `candidate` over every (model, seed)."""
+    scores = []
+    solved = 0
+    for _, model, meta in corpus:
+        recorded = recorded_parameters(meta)
+        for seed in seeds:
+            result = solve_dump(model, recorded, {**candidate, "max_time_in_seconds": time_limit, "random_seed": seed})
+            scores.append(par2(result, time_limit))
+            solved += result["status"] in CONCLUSIVE
+    return {"parameters": candidate, "score": round(sum(scores) / len(scores), 4), "solved": solved, "runs": len(scores)}
+
+
+def tune(corpus, time_limit: float, seeds: List[int], groups: Optional[List[str]] = None,
+         min_improvement: float = MIN_IMPROVEMENT, log=print) -> Dict[str, Any]:
+    cores = available_cores()
+    best = evaluate(corpus, {}, time_limit, seeds)
+    default_score = best["score"]
+    log(f"defaults: PAR2 {best['score']:.3f}s ({best['solved']}/{best['runs']} conclusive)")
+    trials = [best]
+    for group, candidates in SEARCH_SPACE:
+        if groups and group not in groups:
+            continue
+        for candidate in candidates:
+            if candidate.get("num_workers", 0) > cores:
+                continue
+            trial = evaluate(corpus, {**best["parameters"], **candidate}, time_limit, seeds)
+            trials.append(trial)
+            log(f"{group:>20} {json.dumps(candidate):<40} PAR2 {trial['score']:.3f}s ({trial['solved']}/{trial['runs']})")
+            if trial["score"] < best["score"] * (1 - min_improvement):
+                best = trial
+    return {"parameters": best["parameters"], "score": best["score"], "default_score": default_score, "trials": trials}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from generator import SOLVER_TUNING_FILE
+
+    parser = argparse.ArgumentParser(description="Tune CP-SAT parameters over dumped timetable models.")
+    parser.add_argument("corpus", nargs="+", help="dump directories, or directories holding dumps")
+    parser.add_argument("--time-limit", type=float, default=30.0, help="per-solve limit (seconds)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--groups", nargs="+", choices=[group for group, _ in SEARCH_SPACE], help="sweep only these groups")
+    parser.add_argument("--min-improvement", type=float, default=MIN_IMPROVEMENT,
+                        help="relative PAR2 gain a candidate needs to replace the best so far")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(SOLVER_TUNING_FILE), CANDIDATE_FILE),
+                        help="file to write; copy it to SOLVER_TUNING_FILE to promote it")
+    args = parser.parse_args(argv)
+
+    dumps = find_dumps(args.corpus)
+    if not dumps:
+        print("No model dumps found.")
+        return 1
+    corpus = [(path, load_model(path), load_meta(path)) for path in dumps]
+    print(f"Tuning over {len(corpus)} model(s) x {len(args.seeds)} seed(s), {args.time_limit:g}s per solve")
+    result = tune(corpus, args.time_limit, args.seeds, args.groups, args.min_improvement)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "corpus": [path for path, _, _ in corpus],
+        "time_limit": args.time_limit,
+        "seeds": args.seeds,
+        "min_improvement": args.min_improvement,
+        **result,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Best: {json.dumps(result['parameters'])} PAR2 {result['score']:.3f}s (defaults {result['default_score']:.3f}s) -> {args.output}")
+    if os.path.abspath(args.output) != os.path.abspath(SOLVER_TUNING_FILE):
+        print(f"Promote it with: cp {args.output} {SOLVER_TUNING_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# backend/cache.py
+# Content-addressed cache of solved timetables, keyed by the solver-relevant
+# part of a TimetableRequest (title/userId/syllabus do not change the solve,
+# the solve profile, soft objective, mode and time limit do).
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+from datetime import datetime, timezone
+import threading
+import hashlib
+import json
+import time
+import os
+
+# Bump whenever the model/extraction changes so stale Mongo entries stop matching
+CACHE_VERSION = 6
+
+
+# Solve options that are part of the cache key; any other option bypasses the cache
+CACHEABLE_OPTIONS = ("mode", "time_limit")
+
+
+def canonical_request(request, **solve_options) -> Dict[str, Any]:
+    """Solver-relevant fields of a request, with faculty loads normalised (sorted, zero loads dropped).
+
+    `solve_options` are the CACHEABLE_OPTIONS given with the request (mode, time_limit).
+    """
+    data = request.dict()
+    faculty = []
+    for fac in data["faculty"]:
+        loads = sorted(
+            (a["class_name"], a["subject"], a["lecture_load"], a.get("lab_load", 0))
+            for a in fac["load_assignments"]
+            if a["lecture_load"] or a.get("lab_load", 0)
+        )
+        faculty.append({"name": fac["name"], "loads": loads})
+    faculty.sort(key=lambda f: f["name"])
+
+    return {
+        "version": CACHE_VERSION,
+        "workingDays": data["workingDays"],
+        "periods": data["periods"],
+        "classes": data["classes"],
+        "batches": data["batches"],
+        "classrooms": data["classrooms"],
+        "labs": data["labs"],
+        "faculty": faculty,
+        "profile": data.get("profile"),
+        "soft_objective": {k: v for k, v in sorted((data.get("soft_objective") or {}).items()) if v} or None,
+        "options": {k: v for k, v in sorted(solve_options.items()) if v is not None} or None,
+    }
+
+
+def request_cache_key(request, **solve_options) -> str:
+    payload = json.dumps(canonical_request(request, **solve_options), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MongoSolutionStore:
+    """Optional second tier: solved timetables in a Mongo collection with a TTL index."""
+    def __init__(self, collection, ttl_seconds: int):
+        self.collection = collection
+        self.collection.create_index("createdAt", expireAfterSeconds=ttl_seconds)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        doc = self.collection.find_one({"_id": key}, {"result": 1})
+        return doc["result"] if doc else None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "result": result, "createdAt": datetime.now(timezone.utc)},
+            upsert=True,
+        )
+
+
+class SolutionCache:
+    """In-process LRU with size/TTL eviction in front of an optional MongoSolutionStore."""
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None, store: Optional[MongoSolutionStore] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SOLUTION_CACHE_SIZE", 128))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("SOLUTION_CACHE_TTL", 3600))
+        self.store = store
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "store_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    key_for = staticmethod(request_cache_key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if time.time() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return result
+                del self._entries[key]
+                self.stats["evictions"] += 1
+
+        if self.store is not None:
+            try:
+                result = self.store.get(key)
+            except Exception as e:
+                print(f"Solution cache store lookup failed: {e}")
+                result = None
+            if result is not None:
+                self._remember(key, result)
+                self.stats["store_hits"] += 1
+                return result
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        self._remember(key, result)
+        if self.store is not None:
+            try:
+                self.store.put(key, result)
+            except Exception as e:
+                print(f"Solution cache store write failed: {e}")
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds, "store": self.store is not None}
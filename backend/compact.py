@@ -0,0 +1,178 @@
+# backend/compact.py
+# Compact timetable format: one table of sessions (faculty, subject, class,
+# batch, room), every placement of a session (id, day, period) and per-class
+# day x period grids of session ids. A class grid cell holds one session, so
+# when two batches are in labs at once it shows one of them; faculty, lab and
+# classroom grids, and the legacy dict-per-cell views, are derived on demand
+# from the placements and hold every session.
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+
+FREE = -1
+FULL_CLASS = "Full Class"
+COMPACT_MEDIA_TYPE = "application/vnd.timetable.compact+json"
+
+# view -> legacy response key
+LEGACY_KEYS = {
+    "class": "class_timetable",
+    "faculty": "faculty_timetable",
+    "lab": "lab_timetable",
+    "classroom": "classroom_timetable",
+}
+
+
+def assign_rooms(request, occupied: Dict[tuple, tuple]) -> Dict[tuple, str]:
+    """Room of every busy cell: (class, batch, day, period) -> classroom or lab.
+
+    Each class keeps a home classroom and each (class, batch) lab group a home
+    lab, in request order. With fewer rooms than groups, sessions are placed in
+    start order per day (a lab block spans its consecutive periods) into the
+    home room or else the first free one. The model caps concurrent lectures and
+    lab periods at the pool sizes, so this interval colouring always finds a
+    free room.
+    """
+    groups = {(name, batch) for name, batch, _, _ in occupied}
+    pools = [
+        ([(name, FULL_CLASS) for name in request.classes if (name, FULL_CLASS) in groups], request.classrooms),
+        ([(name, batch) for name in request.classes for batch in request.batches if (name, batch) in groups], request.labs),
+    ]
+    rooms = {}
+    for members, pool in pools:
+        if not members:
+            continue
+        home = {group: pool[i % len(pool)] for i, group in enumerate(members)}
+        # day -> [(start, end, group)]: runs of one session (lectures are single periods)
+        blocks = defaultdict(list)
+        for name, batch in members:
+            for d in range(request.workingDays):
+                p = 0
+                while p < request.periods:
+                    pair = occupied.get((name, batch, d, p))
+                    end = p + 1
+                    if pair and batch != FULL_CLASS:
+                        while end < request.periods and occupied.get((name, batch, d, end)) == pair:
+                            end += 1
+                    if pair:
+                        blocks[d].append((p, end, (name, batch)))
+                    p = end
+        for d, day_blocks in blocks.items():
+            taken = defaultdict(set)  # period -> rooms in use
+            for start, end, group in sorted(day_blocks, key=lambda b: b[0]):
+                periods = range(start, end)
+                free = [room for room in [home[group]] + pool if all(room not in taken[p] for p in periods)]
+                room = free[0] if free else home[group]
+                for p in periods:
+                    taken[p].add(room)
+                    rooms[(*group, d, p)] = room
+    return rooms
+
+
+class CompactTimetable:
+    """Session table, placements + class grids; `grid(view)` derives the other views once and keeps them."""
+    def __init__(self, days: int, periods: int, sessions: List[List[Any]], class_grid: Dict[str, List[List[int]]],
+                 faculty: List[str], labs: List[str], classrooms: List[str], placements: Optional[List[List[int]]] = None):
+        self.days = days
+        self.periods = periods
+        self.sessions = sessions
+        # [session id, day, period] per busy (class, batch) cell; None for data without them (class grid only)
+        self.placements = placements
+        self.names = {"class": list(class_grid), "faculty": faculty, "lab": labs, "classroom": classrooms}
+        self._grids = {"class": class_grid}
+
+    @classmethod
+    def from_cells(cls, request, occupied: Dict[tuple, tuple]) -> "CompactTimetable":
+        """Build from busy cells ((class, batch, day, period) -> (faculty, subject, class, batch)); rooms per assign_rooms."""
+        rooms = assign_rooms(request, occupied)
+        session_ids: Dict[Tuple, int] = {}
+        sessions = []
+        placements = []
+        class_grid = {}
+
+        for name in request.classes:
+            grid = [[FREE] * request.periods for _ in range(request.workingDays)]
+            for d in range(request.workingDays):
+                for p in range(request.periods):
+                    for batch in [FULL_CLASS] + request.batches:
+                        pair = occupied.get((name, batch, d, p))
+                        if not pair:
+                            continue
+                        key = (*pair, rooms[(name, batch, d, p)])
+                        if key not in session_ids:
+                            session_ids[key] = len(sessions)
+                            sessions.append(list(key))
+                        placements.append([session_ids[key], d, p])
+                        # Display only: lectures (Full Class) first, then the first batch in a lab
+                        if grid[d][p] == FREE:
+                            grid[d][p] = session_ids[key]
+            class_grid[name] = grid
+
+        return cls(request.workingDays, request.periods, sessions, class_grid,
+                   [f.name for f in request.faculty], list(request.labs), list(request.classrooms), placements)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactTimetable":
+        compact = cls(data["days"], data["periods"], data["sessions"], data["grids"]["class"],
+                      data["faculty"], data["labs"], data["classrooms"], data.get("placements"))
+        for view, grid in data["grids"].items():
+            compact._grids.setdefault(view, grid)
+        return compact
+
+    def to_dict(self, views=("class",)) -> Dict[str, Any]:
+        """Wire/storage form; the session columns are faculty, subject, class, batch, room."""
+        data = {
+            "days": self.days,
+            "periods": self.periods,
+            "sessions": self.sessions,
+            "faculty": self.names["faculty"],
+            "labs": self.names["lab"],
+            "classrooms": self.names["classroom"],
+            "grids": {view: self.grid(view) for view in views},
+        }
+        if self.placements is not None:
+            data["placements"] = self.placements
+        return data
+
+    def is_lab(self, session_id: int) -> bool:
+        return self.sessions[session_id][3] != FULL_CLASS
+
+    def grid(self, view: str) -> Dict[str, List[List[int]]]:
+        if view not in self._grids:
+            self._grids[view] = self._derive(view)
+        return self._grids[view]
+
+    def _placements(self):
+        if self.placements is not None:
+            return self.placements
+        return [(sid, d, p) for rows in self._grids["class"].values()
+                for d, row in enumerate(rows) for p, sid in enumerate(row) if sid != FREE]
+
+    def _derive(self, view: str) -> Dict[str, List[List[int]]]:
+        grid = {name: [[FREE] * self.periods for _ in range(self.days)] for name in self.names[view]}
+        for sid, d, p in self._placements():
+            faculty, _, _, _, room = self.sessions[sid]
+            if view == "faculty":
+                key = faculty
+            elif (view == "lab") == self.is_lab(sid):
+                key = room
+            else:
+                continue
+            if key in grid:
+                grid[key][d][p] = sid
+        return grid
+
+    def cell(self, session_id: int) -> Any:
+        if session_id == FREE:
+            return "Free"
+        faculty, subject, class_name, batch, room = self.sessions[session_id]
+        return {"faculty": faculty, "subject": subject, "class_name": class_name, "batch": batch,
+                "room": room, "is_lab": batch != FULL_CLASS}
+
+    def view(self, view: str) -> Dict[str, List[List[Any]]]:
+        """Legacy view: "Free" or a period dict per cell."""
+        cells = [self.cell(sid) for sid in range(len(self.sessions))]
+        return {name: [[cells[sid] if sid != FREE else "Free" for sid in row] for row in rows]
+                for name, rows in self.grid(view).items()}
+
+    def timetables(self, views: Optional[List[str]] = None) -> Dict[str, Any]:
+        """The legacy class/faculty/lab/classroom timetables (as build_timetables used to return)."""
+        return {LEGACY_KEYS[view]: self.view(view) for view in views or LEGACY_KEYS}
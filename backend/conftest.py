@@ -0,0 +1,2 @@
+# backend/conftest.py
+# Puts the backend folder on sys.path so tests import its flat modules (server, storage, ...).
@@ -0,0 +1,69 @@
+# backend/decompose.py
+# Splits a request into independent sub-problems: connected components of the
+# class–faculty–resource conflict graph, each solvable as its own CP-SAT model.
+from typing import List, Dict, Any
+
+
+class _DisjointSet:
+    def __init__(self, items):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union_all(self, items):
+        items = list(items)
+        for other in items[1:]:
+            self.parent[self.find(other)] = self.find(items[0])
+
+
+def find_components(request, teacher_list: Dict[str, Any]) -> List[List[str]]:
+    """Groups of classes that share no faculty, lab rooms or classrooms.
+
+    Classes taught by the same faculty are joined. A room pool only couples
+    classes when it is binding: more classes with lectures than classrooms, or
+    more (class, batch) lab groups than lab rooms. Classes with no load are left
+    out (their timetable is all Free). Largest component first.
+    """
+    dsu = _DisjointSet(request.classes)
+    lab_batches = set(request.batches)
+    lecture_classes = set()
+    lab_groups = set()
+
+    for teacher in teacher_list.values():
+        taught = {cls for (cls, _, _), count in teacher.assignments.items() if count > 0}
+        dsu.union_all(taught)
+        for (cls, _, batch), count in teacher.assignments.items():
+            if count <= 0:
+                continue
+            if batch in lab_batches:
+                lab_groups.add((cls, batch))
+            else:
+                lecture_classes.add(cls)
+
+    if len(lecture_classes) > len(request.classrooms):
+        dsu.union_all(lecture_classes)
+    if len(lab_groups) > len(request.labs):
+        dsu.union_all({cls for cls, _ in lab_groups})
+
+    busy = lecture_classes | {cls for cls, _ in lab_groups}
+    components: Dict[str, List[str]] = {}
+    for cls in request.classes:
+        if cls in busy:
+            components.setdefault(dsu.find(cls), []).append(cls)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def sub_request(request, classes: List[str]):
+    """Copy of `request` restricted to `classes` and the faculty loads that touch them."""
+    keep = set(classes)
+    data = request.dict()
+    faculty = []
+    for fac in data["faculty"]:
+        loads = [a for a in fac["load_assignments"] if a["class_name"] in keep]
+        if loads:
+            faculty.append({**fac, "load_assignments": loads})
+    return request.__class__(**{**data, "classes": [c for c in request.classes if c in keep], "faculty": faculty})
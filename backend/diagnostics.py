@@ -0,0 +1,78 @@
+# backend/diagnostics.py
+# Per-run timing spans and CP-SAT statistics for generate_from_input. Collected
+# inside the solver process and returned under the response's `diagnostics` key.
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any
+import threading
+import time
+
+
+class Diagnostics:
+    """Accumulates phase timings and solver statistics (thread-safe: components solve concurrently)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(float)
+        self.model = {"variables": 0, "constraints": 0, "models": 0}
+        self.search = {"solves": 0, "conflicts": 0, "branches": 0, "wall_time": 0.0}
+        self.statuses = defaultdict(int)
+        self.symmetry = defaultdict(int)
+        self.stop_reasons = defaultdict(int)
+
+    @contextmanager
+    def span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.timings[name] += elapsed
+
+    def record_model(self, model):
+        proto = model.Proto()
+        with self._lock:
+            self.model["variables"] += len(proto.variables)
+            self.model["constraints"] += len(proto.constraints)
+            self.model["models"] += 1
+
+    def record_symmetry(self, summary: Dict[str, int]):
+        """Symmetry-breaking summary of one model (see TimetableModel.break_symmetries)."""
+        with self._lock:
+            self.symmetry["models"] += 1
+            self.symmetry["batch_groups"] += summary["batch_groups"]
+            self.symmetry["symmetries_pruned"] += summary["symmetries_pruned"]
+
+    def record_solve(self, solver, status, has_objective: bool = False):
+        """Search statistics of one solve; objective values and bounds are summed over the models."""
+        with self._lock:
+            self.search["solves"] += 1
+            self.search["conflicts"] += solver.NumConflicts()
+            self.search["branches"] += solver.NumBranches()
+            self.search["wall_time"] += solver.WallTime()
+            self.statuses[solver.StatusName(status)] += 1
+            if has_objective and solver.StatusName(status) in ("OPTIMAL", "FEASIBLE"):
+                self.search["objective"] = self.search.get("objective", 0) + solver.ObjectiveValue()
+                self.search["best_bound"] = self.search.get("best_bound", 0) + solver.BestObjectiveBound()
+
+    def record_stop(self, reason: str):
+        """Why one search ended (see generator.STOP_REASONS)."""
+        with self._lock:
+            self.stop_reasons[reason] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {
+                "timings": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+                "model": dict(self.model),
+                "search": {**self.search, "wall_time": round(self.search["wall_time"], 4)},
+                "statuses": dict(self.statuses),
+            }
+            if "objective" in self.search:
+                objective, bound = self.search["objective"], self.search["best_bound"]
+                result["search"]["relative_gap"] = round(abs(objective - bound) / max(1.0, abs(objective)), 4)
+            if self.symmetry:
+                result["symmetry"] = dict(self.symmetry)
+            if self.stop_reasons:
+                result["stop_reasons"] = dict(self.stop_reasons)
+            return result
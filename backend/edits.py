@@ -0,0 +1,120 @@
+# backend/edits.py
+# Cell-level edits of a saved timetable. An edit sets one (view, key, day, period)
+# cell; the session it replaces is cleared from, and the new session written to,
+# every view it appears in (class, faculty, lab or classroom), so the stored
+# views stay consistent without rewriting whole grids.
+from typing import Dict, List, Any, Iterable, Set, Tuple
+
+FREE = "Free"
+
+# view -> stored document field
+VIEW_FIELDS = {
+    "class": "class_timetable",
+    "faculty": "teacher_timetable",
+    "lab": "lab_timetable",
+    "classroom": "classroom_timetable",
+}
+SESSION_FIELDS = ("faculty", "subject", "class_name", "batch", "room")
+
+Row = Tuple[str, str]            # (view, key)
+Cell = Tuple[str, str, int, int] # (view, key, day, period)
+
+
+class CellEditError(Exception):
+    """An edit that cannot be applied; `conflicts` lists the cells involved."""
+    def __init__(self, message: str, conflicts: List[Dict[str, Any]] = None):
+        self.message = message
+        self.conflicts = conflicts or []
+        super().__init__(message)
+
+
+def session_rows(value: Any) -> List[Row]:
+    """Every (view, key) row a cell value appears in."""
+    if not isinstance(value, dict):
+        return []
+    room_view = "lab" if value.get("is_lab") else "classroom"
+    return [("class", value["class_name"]), ("faculty", value["faculty"]), (room_view, value["room"])]
+
+
+def normalise_value(value: Any) -> Any:
+    if value == FREE or value is None:
+        return FREE
+    if not isinstance(value, dict) or any(not isinstance(value.get(f), str) for f in SESSION_FIELDS):
+        raise CellEditError(f"A cell must be '{FREE}' or an object with string fields: {', '.join(SESSION_FIELDS)}.")
+    return {**{f: value[f] for f in SESSION_FIELDS}, "is_lab": bool(value.get("is_lab"))}
+
+
+def mongo_path(view: str, key: str, day: int, period: int) -> str:
+    if "." in key or key.startswith("$"):
+        raise CellEditError(f"'{key}' cannot be edited cell by cell (contains '.' or starts with '$'); save the whole timetable instead.")
+    return f"{VIEW_FIELDS[view]}.{key}.{day}.{period}"
+
+
+def shares_class_slot(current: Any, new: Any) -> bool:
+    """Two batches of one class may be in (different) labs at the same time; the class view shows one of them."""
+    return (isinstance(current, dict) and current.get("is_lab") and new.get("is_lab")
+            and current["class_name"] == new["class_name"] and current["batch"] != new["batch"])
+
+
+def rows_touched(edits: Iterable[Dict[str, Any]], values: Iterable[Any] = ()) -> Set[Row]:
+    rows = {(edit["view"], edit["key"]) for edit in edits}
+    for value in values:
+        rows.update(session_rows(value))
+    return rows
+
+
+def plan_cell_edits(grids: Dict[Row, List[List[Any]]], edits: List[Dict[str, Any]]) -> Dict[Cell, Any]:
+    """Apply `edits` in order to the fetched rows `grids`; returns every cell to write.
+
+    `grids` must hold the edited rows and the rows of the sessions they replace
+    and introduce (see rows_touched). A new session may only land on cells that
+    are free or being vacated by the same batch of edits.
+    """
+    overlay: Dict[Cell, Any] = {}
+
+    def get(cell: Cell):
+        if cell in overlay:
+            return overlay[cell]
+        view, key, d, p = cell
+        return grids[(view, key)][d][p]
+
+    for edit in edits:
+        view, key, d, p = edit["view"], edit["key"], edit["day"], edit["period"]
+        if view not in VIEW_FIELDS:
+            raise CellEditError(f"Unknown view '{view}'. Use one of: {', '.join(VIEW_FIELDS)}.")
+        grid = grids.get((view, key))
+        if grid is None:
+            raise CellEditError(f"No {view} timetable named '{key}'.")
+        if not (0 <= d < len(grid) and 0 <= p < len(grid[d])):
+            raise CellEditError(f"Day {d}, period {p} is outside the {view} timetable '{key}'.")
+
+        new = normalise_value(edit["value"])
+        if new != FREE and (view, key) not in session_rows(new):
+            raise CellEditError(f"The new value for {view} '{key}' belongs to {session_rows(new)}, not this timetable.")
+        old = get((view, key, d, p))
+
+        # Vacate the old session everywhere it is shown
+        for row in session_rows(old):
+            cell = (*row, d, p)
+            if row in grids and get(cell) == old:
+                overlay[cell] = FREE
+
+        # Place the new session in each of its views
+        conflicts = []
+        targets = []
+        for row in session_rows(new):
+            if row not in grids:
+                raise CellEditError(f"No {row[0]} timetable named '{row[1]}'.")
+            current = get((*row, d, p))
+            if row[0] == "class" and shares_class_slot(current, new):
+                continue
+            if current != FREE and current != new:
+                conflicts.append({"view": row[0], "key": row[1], "day": d, "period": p, "current": current})
+            targets.append(row)
+        if conflicts:
+            raise CellEditError(f"Day {d}, period {p} is already taken for the new session.", conflicts)
+        for row in targets:
+            overlay[(*row, d, p)] = new
+        overlay[(view, key, d, p)] = new
+
+    return {cell: value for cell, value in overlay.items() if value != grids[cell[:2]][cell[2]][cell[3]]}
@@ -1,9 +1,66 @@
 # backend/generator.py (FIXED: Batch 1 and Batch 2 Output)
 from ortools.sat.python import cp_model
 from models import SubjectLoad, Timetable, InputFaculty, TimetableRequest, PeriodDetail
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Sequence
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decompose import find_components, sub_request
+from jobs import available_cores
+from diagnostics import Diagnostics
+from compact import CompactTimetable, FULL_CLASS
+from lns import LNSEngine
+from quality import METRICS
+import modeldump
+import numpy as np
+import math
+import threading
 import traceback
+import json
+import time
+import os
+
+# Components with at least this many classes are solved with LNS in "auto" mode
+LNS_CLASS_THRESHOLD = int(os.getenv("LNS_CLASS_THRESHOLD", 100))
+DEFAULT_TIME_LIMIT = 60
+# Symmetries are left to CP-SAT's presolve detection (symmetry_level); the model's own
+# day/batch symmetry breaking (SYMMETRY_BREAKING=1) is opt-in, as it slows infeasibility proofs
+SYMMETRY_BREAKING = os.getenv("SYMMETRY_BREAKING", "0") == "1"
+SYMMETRY_LEVEL = int(os.getenv("SOLVER_SYMMETRY_LEVEL", 2))
+# Soft objective terms; each minimises the quality metric of the same name
+SOFT_OBJECTIVE_TERMS = METRICS
+# Solve profiles: deadline (s), relative gap at which an optimising search stops,
+# CP-SAT workers (capped at the available cores) and the soft objective used
+# when the request names none
+SOLVE_PROFILES = {
+    "latency": {"time_limit": 10, "relative_gap": 0.10, "num_workers": 8, "objective": {}},
+    "balanced": {"time_limit": 60, "relative_gap": 0.02, "num_workers": 8,
+                 "objective": {"faculty_gaps": 1, "daily_load": 1}},
+    "quality": {"time_limit": 300, "relative_gap": 0.0, "num_workers": 16,
+                "objective": {"faculty_gaps": 1, "daily_load": 1}},
+}
+# Why a search ended, most limiting first (the overall reason of a decomposed solve is the first one hit)
+STOP_REASONS = ("stopped", "time_limit", "gap_limit", "first_solution", "optimal", "complete")
+# CP-SAT parameters written by `python -m benchmarks.tune`, loaded once at startup
+SOLVER_TUNING_FILE = os.getenv("SOLVER_TUNING_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "solver_tuning.json"))
+
+def load_solver_tuning(path: str) -> Optional[str]:
+    """The tuned SatParameters in `path` as text format (None when there is no usable file)."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            parameters = json.load(f).get("parameters", {})
+        text = modeldump.parameters_text(parameters)
+        modeldump.merge_parameters(cp_model.CpSolver().parameters, text)  # reject unknown fields now, not per solve
+    except Exception as e:
+        print(f"Ignoring solver tuning file {path}: {e}")
+        return None
+    print(f"Loaded tuned solver parameters from {path}: {parameters}")
+    return text
+
+
+TUNED_PARAMETERS = load_solver_tuning(SOLVER_TUNING_FILE)
+
 
 class TimetableError(Exception):
     """Custom exception for timetable generation errors"""
@@ -13,236 +70,1085 @@ class TimetableError(Exception):
         self.details = details or {}
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # Keep error_type/details when the error crosses a process boundary (solver pool)
+        return (self.__class__, (self.message, self.error_type, self.details))
+
 class InternalTeacherModel:
     """Internal model tracks subjects and total periods needed, adapted to hold *virtual batch assignments*."""
     def __init__(self, name):
         self.name = name
         # Store all final assignments keyed by (Class, Subject, Batch)
-        self.assignments = defaultdict(int) 
+        self.assignments = defaultdict(int)
         self.lab_subjects = set()
-    
-def validate_input_constraints(teacher_list: dict, classes: List[str], working_days: int, periods_per_day: int) -> List[Dict]:
-    """Validate input constraints (Re-used original core validation)."""
+
+class SolveControl:
+    """Progress reporting and cooperative stop for a running solve.
+
+    `state` is any dict-like object; the job queue passes a multiprocessing
+    Manager dict so the API process can read progress and request a stop.
+    """
+    def __init__(self, state=None, poll_interval: float = 0.2, stream: bool = False, parent: Optional["SolveControl"] = None):
+        self.state = state if state is not None else {}
+        self.poll_interval = poll_interval
+        self.parent = parent
+        # Timings/solver statistics of the whole run (shared with child controls)
+        self.diagnostics = parent.diagnostics if parent is not None else Diagnostics()
+        # When set, every improved solution is extracted and published under state["solution"]
+        self.stream = stream
+        self.cells: Optional[Dict[tuple, tuple]] = None  # latest solution of a streaming child
+        self._children: List["SolveControl"] = []
+        self._request: Optional[TimetableRequest] = None
+        self._published = 0
+        self._lock = threading.Lock()
+
+    def report(self, **fields):
+        self.state.update(fields)
+        if self.parent is not None:
+            self.parent._merge_children()
+
+    def publish_solution(self, tm: "TimetableModel", values: Sequence[int]):
+        """Streaming: publish an improved solution (children hand their cells to the parent to merge)."""
+        if self.parent is None:
+            self.state["solution"] = extract_timetables(tm, values)
+        else:
+            self.cells = solution_cells(tm, values)
+
+    def stop_requested(self) -> bool:
+        return bool(self.state.get("stop")) or (self.parent is not None and self.parent.stop_requested())
+
+    def child(self, request: Optional[TimetableRequest] = None) -> "SolveControl":
+        """Control for a concurrent sub-solve of `request` (the whole request); stops with its parent.
+
+        The parent reports the children's progress merged: solution counts add
+        up, objectives and bounds are summed once every child has one and, when
+        streaming, each improvement publishes the latest solutions of all
+        children as one (partial) timetable of `request`.
+        """
+        child = SolveControl(poll_interval=self.poll_interval, stream=self.stream, parent=self)
+        with self._lock:
+            self._children.append(child)
+            if request is not None:
+                self._request = request
+        return child
+
+    def _merge_children(self):
+        with self._lock:
+            states = [dict(child.state) for child in self._children]
+            fields = {"solution_count": sum(state.get("solution_count", 0) for state in states)}
+            if states and all("objective" in state for state in states):
+                fields["objective"] = sum(state["objective"] for state in states)
+                fields["bound"] = sum(state.get("bound", 0) for state in states)
+            if self.stream and self._request is not None and fields["solution_count"] > self._published:
+                cells = {}
+                for child in self._children:
+                    cells.update(child.cells or {})
+                # Solution before count: readers fetch the solution once they see the count move
+                fields = {"solution": build_timetables(self._request, cells), **fields}
+                self._published = fields["solution_count"]
+            self.report(**fields)
+
+    def watch(self, solver: cp_model.CpSolver) -> threading.Event:
+        """Stop `solver` once a stop is requested; set the returned event to end watching."""
+        done = threading.Event()
+
+        def _poll():
+            while not done.wait(self.poll_interval):
+                if self.stop_requested():
+                    solver.StopSearch()
+                    return
+
+        threading.Thread(target=_poll, daemon=True).start()
+        return done
+
+def is_lab_subject(subject: str) -> bool:
+    """Lab heuristic shared with the frontend (AddTeacher.jsx)."""
+    subject = subject.lower()
+    return 'lab' in subject or 'practical' in subject
+
+def validate_input_constraints(teacher_list: dict, classes: List[str], working_days: int, periods_per_day: int,
+                               num_classrooms: Optional[int] = None, num_labs: Optional[int] = None) -> List[Dict]:
+    """Pre-solve capacity analysis: loads that cannot fit the available slots/rooms fail here in milliseconds."""
     errors = []
     total_periods_per_class = working_days * periods_per_day
-    
-    # Check 1: Total periods per class constraint (omitted for brevity, assume passed)
-    
-    # Check 3: Teacher availability (max 1 class per period) (omitted for brevity, assume passed)
-    
+    blocks_per_day = periods_per_day // 2
+
+    lecture_load = defaultdict(int)        # class -> lecture periods
+    lab_load = defaultdict(int)            # (class, batch) -> lab periods
+    lab_blocks = defaultdict(int)          # (class, batch) -> double lab blocks
+    lecture_per_subject = defaultdict(int) # (class, subject) -> lecture periods
+    total_lectures = 0
+    total_lab_blocks = 0
+
+    for teacher in teacher_list.values():
+        faculty_load = 0
+        faculty_blocks = 0
+        for (cls, subject, batch), count in teacher.assignments.items():
+            faculty_load += count
+            if batch == FULL_CLASS:
+                lecture_load[cls] += count
+                lecture_per_subject[(cls, subject)] += count
+                total_lectures += count
+            else:
+                lab_load[(cls, batch)] += count
+                lab_blocks[(cls, batch)] += count // 2
+                faculty_blocks += count // 2
+                total_lab_blocks += count // 2
+                # Check 4: At most one double lab block per batch and subject per day
+                if count // 2 > working_days or (count and blocks_per_day == 0):
+                    errors.append({
+                        "type": "LAB_BLOCKS_EXCEED_DAYS",
+                        "faculty": teacher.name, "class": cls, "subject": subject, "batch": batch,
+                        "required": count // 2, "available": working_days if blocks_per_day else 0,
+                        "message": f"{subject} for {cls} ({batch}) needs {count // 2} double lab blocks but only one fits per day ({working_days} days, {periods_per_day} periods)."
+                    })
+
+        # Check 3: Teacher availability (max 1 class per period)
+        if faculty_load > total_periods_per_class:
+            errors.append({
+                "type": "FACULTY_OVERLOAD",
+                "faculty": teacher.name, "required": faculty_load, "available": total_periods_per_class,
+                "message": f"{teacher.name} is assigned {faculty_load} periods but the week has only {total_periods_per_class}."
+            })
+
+        # Check 6: Lab blocks per day (with an odd number of periods a day fits fewer periods of labs than of lectures)
+        if faculty_blocks > working_days * blocks_per_day:
+            errors.append({
+                "type": "LAB_BLOCKS_PER_DAY",
+                "faculty": teacher.name, "required": faculty_blocks, "available": working_days * blocks_per_day,
+                "message": f"{teacher.name} has {faculty_blocks} double lab blocks but a day fits only {blocks_per_day} ({working_days} days, {periods_per_day} periods)."
+            })
+
+    # Check 1: Total periods per class constraint (lectures + the busiest batch's labs)
+    batches = sorted({batch for (_, batch) in lab_load})
+    for cls in classes:
+        for batch in batches or [FULL_CLASS]:
+            required = lecture_load[cls] + lab_load.get((cls, batch), 0)
+            if required > total_periods_per_class:
+                errors.append({
+                    "type": "CLASS_OVERLOAD",
+                    "class": cls, "batch": batch, "required": required, "available": total_periods_per_class,
+                    "message": f"{cls} ({batch}) needs {required} periods but the week has only {total_periods_per_class}."
+                })
+
+    # Check 2: Max 1 lecture per subject per day
+    for (cls, subject), count in lecture_per_subject.items():
+        if count > working_days:
+            errors.append({
+                "type": "SUBJECT_EXCEEDS_DAYS",
+                "class": cls, "subject": subject, "required": count, "available": working_days,
+                "message": f"{subject} for {cls} has {count} lectures but only one lecture per day is allowed ({working_days} days)."
+            })
+
+    # Check 6: Lab blocks per day of each batch
+    for (cls, batch), blocks in lab_blocks.items():
+        if blocks > working_days * blocks_per_day:
+            errors.append({
+                "type": "LAB_BLOCKS_PER_DAY",
+                "class": cls, "batch": batch, "required": blocks, "available": working_days * blocks_per_day,
+                "message": f"{cls} ({batch}) has {blocks} double lab blocks but a day fits only {blocks_per_day} ({working_days} days, {periods_per_day} periods)."
+            })
+
+    # Check 5: Room capacity (lab blocks per day and lecture periods per week)
+    if num_labs is not None and total_lab_blocks:
+        available = num_labs * working_days * blocks_per_day
+        if total_lab_blocks > available:
+            errors.append({
+                "type": "LAB_CAPACITY",
+                "required": total_lab_blocks, "available": available,
+                "message": f"Labs need {total_lab_blocks} double blocks but {num_labs} lab room(s) fit only {available} ({blocks_per_day} per lab per day)."
+            })
+    if num_classrooms is not None and total_lectures > num_classrooms * total_periods_per_class:
+        available = num_classrooms * total_periods_per_class
+        errors.append({
+            "type": "CLASSROOM_CAPACITY",
+            "required": total_lectures, "available": available,
+            "message": f"Lectures need {total_lectures} classroom periods but {num_classrooms} classroom(s) provide only {available}."
+        })
+
     return errors
 
-def generate_from_input(request: TimetableRequest):
-    
-    # --- STEP 1: Process and Split Loads into Batches (for Solver) ---
-    
+def format_constraint_errors(constraint_errors: List[Dict], heading: str) -> str:
+    error_summary = defaultdict(list)
+    for error in constraint_errors:
+        error_summary[error["type"]].append(error)
+
+    error_message = heading + "\n\n"
+    for error_type, errors in error_summary.items():
+        error_message += f"{error_type.replace('_', ' ').title()}:\n"
+        for error in errors:
+            error_message += f"  • {error['message']}\n"
+    return error_message
+
+def build_teacher_list(request: TimetableRequest) -> Dict[str, InternalTeacherModel]:
+    """STEP 1: Split faculty loads into per-batch virtual assignments (for Solver)."""
     teacher_list = {f.name: InternalTeacherModel(f.name) for f in request.faculty}
-    lab_subjects = set()
-    
+    known_classes = set(request.classes)
+
     for fac_input in request.faculty:
         teacher = teacher_list[fac_input.name]
-        
+
         for assignment in fac_input.load_assignments:
-            # Determine if subject is a lab (using the same heuristic as frontend)
-            is_lab = assignment.subject.lower().includes('lab') or assignment.subject.lower().includes('practical')
+            if assignment.class_name not in known_classes:
+                raise TimetableError(
+                    message=f"Class '{assignment.class_name}' assigned to {fac_input.name} is not defined.",
+                    error_type="INPUT_ERROR"
+                )
 
-            if is_lab:
+            # Determine if subject is a lab (using the same heuristic as frontend)
+            if is_lab_subject(assignment.subject):
                 if len(request.batches) == 0:
                      raise TimetableError(message="Batches not defined for labs.", error_type="INPUT_ERROR")
-                     
+
                 lab_per_batch = assignment.lab_load // len(request.batches)
-                
-                if lab_per_batch * len(request.batches) != assignment.lab_load:
+
+                if lab_per_batch * len(request.batches) != assignment.lab_load or lab_per_batch % 2 != 0:
                     raise TimetableError(
-                        message=f"Lab load for {assignment.subject} is odd ({assignment.lab_load}). Must be a multiple of the number of batches ({len(request.batches)}).", 
+                        message=f"Lab load for {assignment.subject} is odd ({assignment.lab_load}). Must give every one of the {len(request.batches)} batches an even number of periods for double blocks.",
                         error_type="LAB_PERIOD_ODD"
                     )
 
                 teacher.lab_subjects.add(assignment.subject)
-                lab_subjects.add(assignment.subject)
-                
+
                 if assignment.lab_load > 0:
                     for batch in request.batches:
                         # Create virtual assignment for each batch
                         key = (assignment.class_name, assignment.subject, batch)
                         teacher.assignments[key] = lab_per_batch
-            
+
             if assignment.lecture_load > 0:
                 # Lectures are always assigned to the "Full Class" batch
-                key = (assignment.class_name, assignment.subject, "Full Class")
+                key = (assignment.class_name, assignment.subject, FULL_CLASS)
                 teacher.assignments[key] = assignment.lecture_load
 
-    
-    classes = request.classes
-    working_days = request.workingDays
-    periods_per_day = request.periods
-    
-    # Run validation checks
-    constraint_errors = validate_input_constraints(teacher_list, classes, working_days, periods_per_day)
-    
-    if constraint_errors:
-        error_summary = defaultdict(list)
-        for error in constraint_errors:
-            error_summary[error["type"]].append(error)
-        
-        error_message = "❌ Timetable generation failed due to constraint violations:\n\n"
-        # ... (error formatting)
-        
-        raise TimetableError(message=error_message.strip(), error_type="INPUT_VALIDATION_FAILED", details={"constraint_errors": constraint_errors})
-    
-    # --- STEP 2: OR-Tools Solver Implementation (Updated for Batches) ---
-    model = cp_model.CpModel()
-    
-    # Generate unique integer IDs for every possible (Faculty, Subject, Class, Batch) quadruplet
-    pair_to_id = {}
-    id_to_pair = {}
-    current_id = 1
+    return teacher_list
 
-    for teacher in teacher_list.values():
-        for (cls, subject, batch), count in teacher.assignments.items():
-            if count > 0:
-                pair = (teacher.name, subject, cls, batch)
-                pair_to_id[pair] = current_id
-                id_to_pair[current_id] = pair
-                current_id += 1
-
-    all_batch_keys = request.batches + ["Full Class"]
-    
-    timetable_vars = {
-        (cls, batch): [[model.NewIntVar(0, current_id, f"{cls}_{batch}_d{d}_p{p}")
-              for p in range(periods_per_day)] for d in range(working_days)]
-        for cls in classes
-        for batch in all_batch_keys
+
+class TimetableModel:
+    """Boolean assignment-matrix CP-SAT model.
+
+    Every (Faculty, Subject, Class, Batch) quadruplet gets an assignment id and one
+    literal per (day, period); all rules are exactly-one/at-most-one or linear sums
+    over those literals.
+
+    With `explain=True` every constraint group is enforced by its own assumption
+    literal (see `self.assumptions`) so an infeasible model yields a conflicting
+    set of groups instead of a bare INFEASIBLE. With `relax=True` subject counts
+    may fall short by `self.unscheduled[aid]` periods (lab: double blocks), which
+    LNS drives to zero.
+    """
+    def __init__(self, request: TimetableRequest, teacher_list: Dict[str, InternalTeacherModel], explain: bool = False,
+                 relax: bool = False):
+        self.request = request
+        self.classes = request.classes
+        self.working_days = request.workingDays
+        self.periods_per_day = request.periods
+        self.slots = [(d, p) for d in range(self.working_days) for p in range(self.periods_per_day)]
+        self.model = cp_model.CpModel()
+        self.explain = explain
+        self.assumptions = {}  # constraint group key -> enforcement literal (explain mode only)
+        self.relax = relax
+        self.unscheduled = {}  # aid -> IntVar of missing periods/blocks (relax mode only)
+
+        # Unique integer IDs for every (Faculty, Subject, Class, Batch) quadruplet
+        self.pair_to_id = {}
+        self.id_to_pair = {}
+        self.counts = {}
+        current_id = 1
+        for teacher in teacher_list.values():
+            for (cls, subject, batch), count in teacher.assignments.items():
+                if count > 0:
+                    pair = (teacher.name, subject, cls, batch)
+                    self.pair_to_id[pair] = current_id
+                    self.id_to_pair[current_id] = pair
+                    self.counts[current_id] = count
+                    current_id += 1
+
+        self.lecture_ids = [aid for aid, pair in self.id_to_pair.items() if pair[3] == FULL_CLASS]
+        self.lab_ids = [aid for aid, pair in self.id_to_pair.items() if pair[3] != FULL_CLASS]
+
+        # x[(aid, d, p)] is true when assignment aid occupies period p on day d
+        self.x = {
+            (aid, d, p): self.model.NewBoolVar(f"x_{aid}_d{d}_p{p}")
+            for aid in self.id_to_pair
+            for d, p in self.slots
+        }
+        # lab_start[(aid, d, p)] is true when a double lab block starts at period p
+        self.lab_start = {
+            (aid, d, p): self.model.NewBoolVar(f"lab_{aid}_d{d}_p{p}")
+            for aid in self.lab_ids
+            for d in range(self.working_days)
+            for p in range(self.periods_per_day - 1)
+        }
+
+        self._add_subject_counts()
+        self._add_lab_double_periods()
+        self._add_faculty_conflicts()
+        self._add_class_conflicts()
+        self._add_daily_limits()
+        self._add_resource_limits()
+        self._x_index = None
+
+    def x_index(self) -> Tuple[List[tuple], Any]:
+        """x keys and the matching model variable indices (a numpy array), for gathering solution values."""
+        if self._x_index is None:
+            keys = list(self.x)
+            self._x_index = (keys, np.fromiter((self.x[key].Index() for key in keys), dtype=np.int64, count=len(keys)))
+        return self._x_index
+
+    def _guard(self, key: tuple):
+        """Enforcement literal for constraint group `key` (None unless explaining)."""
+        if not self.explain:
+            return None
+        if key not in self.assumptions:
+            self.assumptions[key] = self.model.NewBoolVar("assume_" + "_".join(map(str, key)))
+        return self.assumptions[key]
+
+    def _add(self, expr, key: tuple):
+        constraint = self.model.Add(expr)
+        guard = self._guard(key)
+        if guard is not None:
+            constraint.OnlyEnforceIf(guard)
+        return constraint
+
+    def _at_most_one(self, literals, key: tuple):
+        if self.explain:
+            # AtMostOne takes no enforcement literal; use the equivalent linear form
+            self._add(sum(literals) <= 1, key)
+        else:
+            self.model.AddAtMostOne(literals)
+
+    def day_period_literals(self, aid: int, d: int) -> List[Any]:
+        return [self.x[(aid, d, p)] for p in range(self.periods_per_day)]
+
+    def slack_upper_bound(self, aid: int) -> int:
+        return self.counts[aid] if self.id_to_pair[aid][3] == FULL_CLASS else self.counts[aid] // 2
+
+    def _required(self, aid: int):
+        """Periods (lab: blocks) aid must receive, minus its slack when relaxed."""
+        required = self.slack_upper_bound(aid)
+        if not self.relax:
+            return required
+        self.unscheduled[aid] = self.model.NewIntVar(0, required, f"unscheduled_{aid}")
+        return required - self.unscheduled[aid]
+
+    def _add_subject_counts(self):
+        # Constraint 2: Subject Count Matching
+        for aid in self.lecture_ids:
+            self._add(sum(self.x[(aid, d, p)] for d, p in self.slots) == self._required(aid), ("subject_count", aid))
+
+    def _add_lab_double_periods(self):
+        # Constraint 4: Lab Subject Consecutive Scheduling (Double Period Rule)
+        for aid in self.lab_ids:
+            starts = [self.lab_start[(aid, d, p)] for d in range(self.working_days) for p in range(self.periods_per_day - 1)]
+            self._add(sum(starts) == self._required(aid), ("subject_count", aid))
+            for d, p in self.slots:
+                covering = []
+                if p < self.periods_per_day - 1:
+                    covering.append(self.lab_start[(aid, d, p)])
+                if p > 0:
+                    covering.append(self.lab_start[(aid, d, p - 1)])
+                # A lab period is busy exactly when a block starts here or on the previous period
+                self.model.Add(self.x[(aid, d, p)] == sum(covering))
+
+    def _add_faculty_conflicts(self):
+        # Constraint 1: Faculty Conflict (a faculty teaches at most one group per period)
+        by_faculty = defaultdict(list)
+        for aid, (tname, _, _, _) in self.id_to_pair.items():
+            by_faculty[tname].append(aid)
+        for tname, aids in by_faculty.items():
+            if len(aids) < 2:
+                continue
+            for d, p in self.slots:
+                self._at_most_one([self.x[(aid, d, p)] for aid in aids], ("faculty", tname))
+
+    def _add_class_conflicts(self):
+        # A class lecture blocks every batch; each batch attends at most one lab per period
+        lectures_by_class = defaultdict(list)
+        labs_by_group = defaultdict(list)
+        for aid, (_, _, cls, batch) in self.id_to_pair.items():
+            if batch == FULL_CLASS:
+                lectures_by_class[cls].append(aid)
+            else:
+                labs_by_group[(cls, batch)].append(aid)
+
+        for cls in self.classes:
+            groups = [(b, lectures_by_class[cls] + labs_by_group[(cls, b)]) for b in self.request.batches]
+            if not groups:
+                groups = [(FULL_CLASS, lectures_by_class[cls])]
+            for batch, aids in groups:
+                if len(aids) < 2:
+                    continue
+                for d, p in self.slots:
+                    self._at_most_one([self.x[(aid, d, p)] for aid in aids], ("class", cls, batch))
+
+    def _add_daily_limits(self):
+        # Constraint 3: Daily Subject Limit (max 1 period per LECTURE subject per day)
+        lectures_by_subject = defaultdict(list)
+        for aid in self.lecture_ids:
+            _, subject, cls, _ = self.id_to_pair[aid]
+            lectures_by_subject[(cls, subject)].append(aid)
+        for (cls, subject), aids in lectures_by_subject.items():
+            for d in range(self.working_days):
+                self._at_most_one([lit for aid in aids for lit in self.day_period_literals(aid, d)], ("daily_limit", cls, subject))
+
+        # ... and at most one double lab block per batch and subject per day
+        for aid in self.lab_ids:
+            _, subject, cls, batch = self.id_to_pair[aid]
+            for d in range(self.working_days):
+                self._at_most_one([self.lab_start[(aid, d, p)] for p in range(self.periods_per_day - 1)], ("daily_limit", cls, subject, batch))
+
+    def _add_resource_limits(self):
+        # Constraint 5: Resource Conflict (never more concurrent sessions than rooms/labs)
+        for d, p in self.slots:
+            if self.lab_ids:
+                self._add(sum(self.x[(aid, d, p)] for aid in self.lab_ids) <= len(self.request.labs), ("lab_capacity",))
+            if self.lecture_ids:
+                self._add(sum(self.x[(aid, d, p)] for aid in self.lecture_ids) <= len(self.request.classrooms), ("classroom_capacity",))
+
+    def break_symmetries(self, days: bool = True) -> Dict[str, Any]:
+        """Prune interchangeable days and batches with lex-leader style constraints.
+
+        Every constraint is the same on every day, so one "anchor" lecture with k
+        periods (at most one a day) may be put on days 0..k-1; the anchor with the
+        most distinct day sets, C(days, k), is picked. Ordering its periods as
+        well was tried and made first solutions slower.
+
+        Batches of a class with identical lab demand are interchangeable, so their
+        lab-start rows (same subject/faculty order) are ordered lexicographically
+        (see add_lex_greater_equal). Only valid for the exact model:
+        not with explain/relax (per-group relaxations are not symmetric) nor with
+        warm-start hints (the previous orientation may be cut off). Pass
+        `days=False` when the objective is not the same under a day permutation.
+        """
+        summary = {"day_permutations": 1, "batch_groups": 0, "batch_permutations": 1, "symmetries_pruned": 0}
+        if self.explain or self.relax:
+            return summary
+
+        # --- Days ---
+        if days and self.lecture_ids:
+            anchor = max(self.lecture_ids, key=lambda aid: (math.comb(self.working_days, min(self.counts[aid], self.working_days)), -aid))
+            k = min(self.counts[anchor], self.working_days)
+            if math.comb(self.working_days, k) > 1:
+                for d in range(self.working_days):
+                    self.model.Add(sum(self.day_period_literals(anchor, d)) == (1 if d < k else 0))
+                summary["day_permutations"] = math.comb(self.working_days, k)
+
+        # --- Batches ---
+        rows_by_class = defaultdict(dict)
+        for aid in sorted(self.lab_ids, key=lambda a: self.id_to_pair[a]):
+            tname, subject, cls, batch = self.id_to_pair[aid]
+            rows_by_class[cls].setdefault(batch, []).append(((tname, subject, self.counts[aid]), aid))
+        for cls, rows in rows_by_class.items():
+            groups = defaultdict(list)
+            for batch in self.request.batches:
+                if batch in rows:
+                    groups[tuple(sig for sig, _ in rows[batch])].append(batch)
+            for batches in groups.values():
+                if len(batches) < 2:
+                    continue
+                vectors = [[self.lab_start[(aid, d, p)] for _, aid in rows[b]
+                            for d in range(self.working_days) for p in range(self.periods_per_day - 1)]
+                           for b in batches]
+                for i, (first, second) in enumerate(zip(vectors, vectors[1:])):
+                    self.add_lex_greater_equal(first, second, f"lex_{cls}_{batches[i]}")
+                summary["batch_groups"] += 1
+                summary["batch_permutations"] *= math.factorial(len(batches))
+
+        summary["symmetries_pruned"] = summary["day_permutations"] * summary["batch_permutations"] - 1
+        return summary
+
+    def add_lex_greater_equal(self, first: List[Any], second: List[Any], name: str):
+        """first >= second lexicographically, as clauses over one "equal so far" literal per position."""
+        equal = None  # positions before i are equal (None: the empty prefix)
+        for i, (x, y) in enumerate(zip(first, second)):
+            prefix = [equal.Not()] if equal is not None else []
+            self.model.AddBoolOr(prefix + [x, y.Not()])  # equal so far -> x >= y
+            if i == len(first) - 1:
+                break
+            # Still equal after position i <-> equal so far and x == y
+            following = self.model.NewBoolVar(f"{name}_eq{i}")
+            self.model.AddBoolOr(prefix + [x, following])
+            self.model.AddBoolOr(prefix + [y.Not(), following])
+            self.model.AddBoolOr([following.Not(), x.Not(), y])
+            if equal is not None:
+                self.model.AddImplication(following, equal)
+            equal = following
+
+    def add_soft_objective(self, weights: Dict[str, int], keep_cells: Optional[set] = None) -> bool:
+        """Minimize weighted soft-quality terms; returns False when every weight is zero.
+
+        With `keep_cells` (a re-solve), keeping previous cells comes first: each
+        kept cell outweighs all soft terms together, which only break ties.
+
+        faculty_gaps: idle periods between a faculty member's first and last session of each day.
+        subject_spread: lectures of a class's subject on consecutive days.
+        lab_clustering: lab periods in the first half of the day (labs cluster in the afternoon).
+        daily_load: spread between a faculty member's busiest and lightest day.
+        """
+        terms = []
+        worst = 0  # upper bound of sum(terms)
+        by_faculty = defaultdict(list)
+        for aid, (tname, _, _, _) in self.id_to_pair.items():
+            by_faculty[tname].append(aid)
+
+        if weights.get("faculty_gaps"):
+            for tname, aids in by_faculty.items():
+                for d in range(self.working_days):
+                    # busy is 0/1: at most one class per faculty and period
+                    busy = [sum(self.x[(aid, d, p)] for aid in aids) for p in range(self.periods_per_day)]
+                    # started[p]: teaches at or before p; remaining[p]: teaches at or after p
+                    started = [self.model.NewBoolVar(f"started_{tname}_d{d}_p{p}") for p in range(self.periods_per_day)]
+                    remaining = [self.model.NewBoolVar(f"remaining_{tname}_d{d}_p{p}") for p in range(self.periods_per_day)]
+                    for p in range(self.periods_per_day):
+                        self.model.Add(started[p] >= busy[p])
+                        self.model.Add(remaining[p] >= busy[p])
+                        if p:
+                            self.model.Add(started[p] >= started[p - 1])
+                            self.model.Add(remaining[p - 1] >= remaining[p])
+                    for p in range(1, self.periods_per_day - 1):
+                        idle = self.model.NewBoolVar(f"idle_{tname}_d{d}_p{p}")
+                        self.model.Add(idle >= started[p - 1] + remaining[p + 1] - 1 - busy[p])
+                        terms.append(weights["faculty_gaps"] * idle)
+                        worst += weights["faculty_gaps"]
+
+        if weights.get("subject_spread"):
+            lectures_by_subject = defaultdict(list)
+            for aid in self.lecture_ids:
+                _, subject, cls, _ = self.id_to_pair[aid]
+                lectures_by_subject[(cls, subject)].append(aid)
+            for (cls, subject), aids in lectures_by_subject.items():
+                on_day = [sum(lit for aid in aids for lit in self.day_period_literals(aid, d)) for d in range(self.working_days)]
+                for d in range(self.working_days - 1):
+                    adjacent = self.model.NewBoolVar(f"adjacent_{cls}_{subject}_d{d}")
+                    self.model.Add(adjacent >= on_day[d] + on_day[d + 1] - 1)
+                    terms.append(weights["subject_spread"] * adjacent)
+                    worst += weights["subject_spread"]
+
+        if weights.get("lab_clustering"):
+            morning = self.periods_per_day // 2
+            labs = [self.x[(aid, d, p)] for aid in self.lab_ids for d in range(self.working_days) for p in range(morning)]
+            terms.extend(weights["lab_clustering"] * x for x in labs)
+            worst += weights["lab_clustering"] * len(labs)
+
+        if weights.get("daily_load"):
+            for tname, aids in by_faculty.items():
+                busiest = self.model.NewIntVar(0, self.periods_per_day, f"busiest_{tname}")
+                lightest = self.model.NewIntVar(0, self.periods_per_day, f"lightest_{tname}")
+                for d in range(self.working_days):
+                    load = sum(lit for aid in aids for lit in self.day_period_literals(aid, d))
+                    self.model.Add(busiest >= load)
+                    self.model.Add(lightest <= load)
+                terms.append(weights["daily_load"] * (busiest - lightest))
+                worst += weights["daily_load"] * self.periods_per_day
+
+        if keep_cells:
+            self.model.Minimize(sum(terms) - (worst + 1) * self.keep_cells_objective(keep_cells))
+            return bool(terms)
+        if not terms:
+            return False
+        self.model.Minimize(sum(terms))
+        return True
+
+    def describe_group(self, key: tuple) -> Dict[str, Any]:
+        """Human-readable description of a constraint group (for infeasibility explanations)."""
+        kind = key[0]
+        if kind == "subject_count":
+            tname, subject, cls, batch = self.id_to_pair[key[1]]
+            message = f"{tname} must teach {subject} to {cls} ({batch}) for {self.counts[key[1]]} periods"
+            return {"type": "SUBJECT_COUNT", "faculty": tname, "subject": subject, "class": cls, "batch": batch, "periods": self.counts[key[1]], "message": message}
+        if kind == "faculty":
+            return {"type": "FACULTY_CONFLICT", "faculty": key[1], "message": f"{key[1]} can teach only one group per period"}
+        if kind == "class":
+            return {"type": "CLASS_CONFLICT", "class": key[1], "batch": key[2], "message": f"{key[1]} ({key[2]}) can attend only one session per period"}
+        if kind == "daily_limit":
+            batch = key[3] if len(key) > 3 else FULL_CLASS
+            limit = "one double lab block" if len(key) > 3 else "one lecture"
+            return {"type": "DAILY_LIMIT", "class": key[1], "subject": key[2], "batch": batch, "message": f"{key[2]} for {key[1]} ({batch}) is limited to {limit} per day"}
+        if kind == "lab_capacity":
+            return {"type": "LAB_CAPACITY", "labs": len(self.request.labs), "message": f"At most {len(self.request.labs)} lab sessions can run in the same period"}
+        if kind == "classroom_capacity":
+            return {"type": "CLASSROOM_CAPACITY", "classrooms": len(self.request.classrooms), "message": f"At most {len(self.request.classrooms)} lectures can run in the same period"}
+        return {"type": kind.upper(), "message": str(key)}
+
+    def cells_from_timetables(self, timetables: Dict[str, Any]) -> set:
+        """(aid, d, p) literals that are busy in a stored timetable (any of its grid views)."""
+        cells = set()
+        for view in ("class_timetable", "teacher_timetable", "faculty_timetable", "lab_timetable"):
+            for grid in (timetables.get(view) or {}).values():
+                for d, row in enumerate(grid[:self.working_days]):
+                    for p, period in enumerate(row[:self.periods_per_day]):
+                        if not isinstance(period, dict):
+                            continue
+                        pair = (period.get("faculty"), period.get("subject"), period.get("class_name"), period.get("batch"))
+                        aid = self.pair_to_id.get(pair)
+                        if aid is not None:
+                            cells.add((aid, d, p))
+        return cells
+
+    def add_solution_hints(self, cells: set):
+        """Warm start: hint every literal from a previous solution (busy cells 1, everything else 0)."""
+        for key, lit in self.x.items():
+            self.model.AddHint(lit, key in cells)
+        for aid in self.lab_ids:
+            for d in range(self.working_days):
+                covered = False
+                for p in range(self.periods_per_day - 1):
+                    start = not covered and (aid, d, p) in cells and (aid, d, p + 1) in cells
+                    self.model.AddHint(self.lab_start[(aid, d, p)], start)
+                    covered = start
+
+    def keep_cells_objective(self, cells: set):
+        """Linear expression counting how many previous cells the solution keeps."""
+        return sum(self.x[key] for key in cells)
+
+
+def explain_infeasibility(request: TimetableRequest, teacher_list: Dict[str, InternalTeacherModel], time_limit: float = 10.0) -> List[Dict]:
+    """Minimal conflicting set of constraint groups, via CP-SAT assumption literals.
+
+    The first core comes from SufficientAssumptionsForInfeasibility; it is then
+    shrunk by deletion (drop a group, keep it dropped if still infeasible) until
+    the time budget runs out.
+    """
+    tm = TimetableModel(request, teacher_list, explain=True)
+    by_index = {lit.Index(): key for key, lit in tm.assumptions.items()}
+    deadline = time.time() + time_limit
+
+    def infeasible_core(keys):
+        tm.model.ClearAssumptions()
+        tm.model.AddAssumptions([tm.assumptions[k] for k in keys])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.1, deadline - time.time())
+        status = solver.Solve(tm.model)
+        if status != cp_model.INFEASIBLE:
+            return None
+        return [by_index[i] for i in solver.SufficientAssumptionsForInfeasibility() if i in by_index]
+
+    core = infeasible_core(list(tm.assumptions))
+    if not core:
+        return []
+
+    # Deletion-based minimisation
+    i = 0
+    while i < len(core) and time.time() < deadline:
+        candidate = core[:i] + core[i + 1:]
+        smaller = infeasible_core(candidate) if candidate else None
+        if smaller is not None:
+            core = [k for k in candidate if k in set(smaller)] or candidate
+        else:
+            i += 1
+
+    return [tm.describe_group(key) for key in core]
+
+
+def solution_cells(tm: TimetableModel, values: Sequence[int]) -> Dict[tuple, tuple]:
+    """(class, batch, day, period) -> (faculty, subject, class, batch) for every busy literal.
+
+    `values` is the full solution vector (indexed by model variable), read in one
+    gather instead of one Value() call per literal.
+    """
+    keys, indices = tm.x_index()
+    occupied = {}
+    for i in np.flatnonzero(np.asarray(values)[indices]):
+        aid, d, p = keys[i]
+        pair = tm.id_to_pair[aid]
+        occupied[(pair[2], pair[3], d, p)] = pair
+    return occupied
+
+
+def extract_timetables(tm: TimetableModel, values: Sequence[int]) -> Dict[str, Any]:
+    """Map a solution vector onto the compact timetable result (see build_timetables)."""
+    return build_timetables(tm.request, solution_cells(tm, values))
+
+
+def build_timetables(request: TimetableRequest, occupied: Dict[tuple, tuple]) -> Dict[str, Any]:
+    """Compact timetable (session table + class grids) from busy cells (see solution_cells).
+
+    The class, faculty, lab and classroom views are derived from it on demand
+    (CompactTimetable.from_dict(result["compact"]).timetables()).
+    """
+    return {"compact": CompactTimetable.from_cells(request, occupied).to_dict()}
+
+
+class SolutionStreamer(cp_model.CpSolverSolutionCallback):
+    """Reports each improved solution (mapped through extract_timetables) to a SolveControl."""
+    def __init__(self, tm: "TimetableModel", control: SolveControl):
+        super().__init__()
+        self.tm = tm
+        self.control = control
+        self.solution_count = 0
+        self.has_objective = tm.model.HasObjective()
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        fields = {"solution_count": self.solution_count, "solve_time": round(self.WallTime(), 3)}
+        if self.has_objective:
+            fields["objective"] = self.ObjectiveValue()
+            fields["bound"] = self.BestObjectiveBound()
+        if self.control.stream:
+            self.control.publish_solution(self.tm, self.Response().solution)
+        self.control.report(**fields)
+
+        if self.control.stop_requested():
+            # Client is happy with what it has: end the search and keep this solution
+            self.StopSearch()
+
+
+def configure_solver(solver: cp_model.CpSolver, time_limit: float, num_workers: int = 0, seed: Optional[int] = None,
+                     relative_gap: float = 0.0):
+    """CP-SAT symmetry level, tuned parameters (see SOLVER_TUNING_FILE), then the per-solve deadline, workers, seed and gap."""
+    solver.parameters.symmetry_level = SYMMETRY_LEVEL
+    if TUNED_PARAMETERS:
+        modeldump.merge_parameters(solver.parameters, TUNED_PARAMETERS)
+    solver.parameters.max_time_in_seconds = time_limit
+    if num_workers:
+        solver.parameters.num_workers = num_workers
+    if seed is not None:
+        solver.parameters.random_seed = seed
+    if relative_gap:
+        solver.parameters.relative_gap_limit = relative_gap
+
+
+def stop_reason(solver: cp_model.CpSolver, status, control: SolveControl, has_objective: bool) -> Optional[str]:
+    """Which limit ended a CP-SAT search (None when it proved infeasibility or failed)."""
+    if control.stop_requested():
+        return "stopped"
+    if status == cp_model.OPTIMAL:
+        if not has_objective:
+            return "first_solution"
+        # CP-SAT reports OPTIMAL once the relative gap limit is reached
+        return "optimal" if solver.ObjectiveValue() == solver.BestObjectiveBound() else "gap_limit"
+    if status in (cp_model.FEASIBLE, cp_model.UNKNOWN):
+        return "time_limit"
+    return None
+
+
+def resolve_profile(request: TimetableRequest, time_limit: Optional[float] = None, objective: Optional[Dict[str, int]] = None,
+                    num_workers: int = 0) -> Dict[str, Any]:
+    """Search settings of a request: explicit arguments win over the request's profile and soft_objective."""
+    profile = SOLVE_PROFILES.get(request.profile) if request.profile else {}
+    if profile is None:
+        raise TimetableError(f"❌ Unknown solve profile '{request.profile}'. Use one of: {', '.join(SOLVE_PROFILES)}.",
+                             error_type="INPUT_VALIDATION_FAILED")
+    weights = objective if objective is not None else request.soft_objective
+    if weights is None:
+        weights = profile.get("objective")
+    unknown = set(weights or {}) - set(SOFT_OBJECTIVE_TERMS)
+    if unknown or any(w < 0 for w in (weights or {}).values()):
+        raise TimetableError(f"❌ Soft objective weights must be non-negative integers for: {', '.join(SOFT_OBJECTIVE_TERMS)}.",
+                             error_type="INPUT_VALIDATION_FAILED", details={"unknown_terms": sorted(unknown)})
+    workers = num_workers or profile.get("num_workers", 0)
+    return {
+        "profile": request.profile,
+        "time_limit": time_limit or profile.get("time_limit"),
+        "relative_gap": profile.get("relative_gap", 0.0),
+        "num_workers": min(workers, available_cores()) if workers else 0,
+        "objective": {term: w for term, w in (weights or {}).items() if w} or None,
     }
-    
-    # Constraint 1: Faculty Conflict (omitted for brevity, assumed stable)
 
-    # Constraint 2: Subject Count Matching (omitted for brevity, assumed stable)
 
-    # Constraint 3 (MODIFIED): Daily Subject Limit (max 1 period per LECTURE subject per day)
-    for cls in classes:
-        for d in range(working_days):
-            all_lecture_subjects = {
-                subject
-                for teacher in teacher_list.values()
-                for (c, subject, batch), count in teacher.assignments.items()
-                if c == cls and batch == "Full Class"
-            }
-            
-            for subject in all_lecture_subjects:
-                subject_ids = [pid for pid, (_, subj, c, batch) in id_to_pair.items() if subj == subject and c == cls and batch == "Full Class"]
-                count_vars = []
-                for p in range(periods_per_day):
-                    var = timetable_vars[(cls, "Full Class")][d][p]
-                    b = model.NewBoolVar(f"{cls}_L_{d}_{p}_{pid}")
-                    model.Add(var == pid).OnlyEnforceIf(b)
-                    model.Add(var != pid).OnlyEnforceIf(b.Not())
-                    count_vars.append(b)
-                
-                # Enforce Max 1 occurrence per day for lectures
-                model.Add(sum(count_vars) <= 1)
-
-
-    # Constraint 4: Lab Subject Consecutive Scheduling (Double Period Rule) (omitted for brevity, assumed stable)
-            
-    # Constraint 5: Resource Conflict (Classroom/Lab Conflict) (omitted for brevity, assumed stable)
+def default_time_limit(request: TimetableRequest, mode: str = "auto", previous: Optional[Dict[str, Any]] = None) -> float:
+    """Deadline of a solve without one: DEFAULT_TIME_LIMIT, five times that for LNS (or auto on large requests)."""
+    if mode == "lns" or (mode == "auto" and not previous and len(request.classes) >= LNS_CLASS_THRESHOLD):
+        return 5 * DEFAULT_TIME_LIMIT
+    return DEFAULT_TIME_LIMIT
+
+
+def solve_lns(request: TimetableRequest, teacher_list: Dict[str, InternalTeacherModel], control: SolveControl,
+              time_limit: float, num_workers: int = 0, seed: Optional[int] = None) -> Tuple[Dict[tuple, tuple], Dict[str, Any]]:
+    """Large Neighbourhood Search on the relaxed model until nothing is left unscheduled or time runs out."""
+    control.report(phase="build")
+    with control.diagnostics.span("model_build"):
+        tm = TimetableModel(request, teacher_list, relax=True)
+        tm.model.Minimize(sum(tm.unscheduled.values()))
+    control.diagnostics.record_model(tm.model)
+
+    control.report(phase="lns")
+    with control.diagnostics.span("solve"):
+        values, stats = LNSEngine(tm, control, time_limit=time_limit, num_workers=num_workers, seed=seed or 0).run()
+
+    if values is None or stats["unscheduled_periods"]:
+        if control.stop_requested():
+            raise TimetableError(
+                message="❌ Timetable generation was cancelled before a solution was found.",
+                error_type="CANCELLED"
+            )
+        unscheduled = []
+        if values is not None:
+            for aid, var in tm.unscheduled.items():
+                if values[var.Index()]:
+                    tname, subject, cls, batch = tm.id_to_pair[aid]
+                    unscheduled.append({"faculty": tname, "subject": subject, "class": cls, "batch": batch, "missing": values[var.Index()]})
+        raise TimetableError(
+            message=f"❌ Large neighbourhood search could not place every period within {time_limit:g}s. Try a longer time limit or adjusting constraints.",
+            error_type="LNS_INCOMPLETE",
+            details={"lns": stats, "unscheduled": unscheduled}
+        )
+
+    control.diagnostics.record_stop("complete")
+    with control.diagnostics.span("extract"):
+        return solution_cells(tm, values), {"lns": stats}
+
+
+def solve_model(request: TimetableRequest, teacher_list: Dict[str, InternalTeacherModel], control: SolveControl,
+                previous: Optional[Dict[str, Any]] = None, minimize_changes: bool = False,
+                num_workers: int = 0, mode: str = "auto", time_limit: Optional[float] = None,
+                seed: Optional[int] = None, objective: Optional[Dict[str, int]] = None,
+                relative_gap: float = 0.0) -> Tuple[Dict[tuple, tuple], Dict[str, Any]]:
+    """STEP 2: solve one model; returns busy cells (see solution_cells) and solve info.
 
+    `mode` is "exact" (single CP-SAT call), "lns" or "auto". In "auto", models of
+    LNS_CLASS_THRESHOLD classes or more get a third of the budget for the exact
+    solve and fall back to Large Neighbourhood Search if it times out. `seed` is
+    CP-SAT's random seed; `objective` weights soft terms, optimised until the
+    deadline or until within `relative_gap` of the best bound (exact solves only).
+    """
+    if mode == "lns":
+        return solve_lns(request, teacher_list, control, time_limit or default_time_limit(request, mode), num_workers, seed)
+
+    large = mode == "auto" and not previous and len(request.classes) >= LNS_CLASS_THRESHOLD
+    if not large:
+        return solve_exact(request, teacher_list, control, previous, minimize_changes, num_workers,
+                           time_limit or default_time_limit(request, mode, previous), seed, objective, relative_gap)
+
+    budget = time_limit or default_time_limit(request, mode, previous)
+    started = time.time()
+    try:
+        return solve_exact(request, teacher_list, control, num_workers=num_workers, time_limit=budget / 3, seed=seed,
+                           objective=objective, relative_gap=relative_gap)
+    except TimetableError as e:
+        if e.error_type != "SOLVER_ERROR" or control.stop_requested():
+            raise
+    return solve_lns(request, teacher_list, control, budget - (time.time() - started), num_workers, seed)
+
+
+def solve_exact(request: TimetableRequest, teacher_list: Dict[str, InternalTeacherModel], control: SolveControl,
+                previous: Optional[Dict[str, Any]] = None, minimize_changes: bool = False,
+                num_workers: int = 0, time_limit: float = DEFAULT_TIME_LIMIT, seed: Optional[int] = None,
+                objective: Optional[Dict[str, int]] = None, relative_gap: float = 0.0) -> Tuple[Dict[tuple, tuple], Dict[str, Any]]:
+    """Build and solve the full CP-SAT model in one call."""
+    diagnostics = control.diagnostics
+    control.report(phase="build")
+    with diagnostics.span("model_build"):
+        tm = TimetableModel(request, teacher_list)
+
+        previous_cells = set()
+        if previous:
+            previous_cells = tm.cells_from_timetables(previous)
+            tm.add_solution_hints(previous_cells)
+            tm.add_soft_objective(objective or {}, keep_cells=previous_cells if minimize_changes else None)
+        else:
+            if objective:
+                tm.add_soft_objective(objective)
+            if SYMMETRY_BREAKING:
+                # Subject spread counts consecutive days, so days stop being interchangeable
+                diagnostics.record_symmetry(tm.break_symmetries(days=not (objective or {}).get("subject_spread")))
+    diagnostics.record_model(tm.model)
 
     # Solve the model
+    control.report(phase="solve")
     solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 60
-    status = solver.Solve(model)
+    configure_solver(solver, time_limit, num_workers, seed, relative_gap)
+    watching = control.watch(solver)
+    try:
+        with diagnostics.span("solve"):
+            status = solver.Solve(tm.model, SolutionStreamer(tm, control))
+    finally:
+        watching.set()
+    has_objective = tm.model.HasObjective()
+    diagnostics.record_solve(solver, status, has_objective)
+    reason = stop_reason(solver, status, control, has_objective)
+    if reason:
+        diagnostics.record_stop(reason)
+    if modeldump.should_dump(solver.WallTime(), status in (cp_model.OPTIMAL, cp_model.FEASIBLE)):
+        modeldump.dump_model(tm.model, request, {
+            "status": solver.StatusName(status),
+            "stop_reason": reason,
+            "wall_time": round(solver.WallTime(), 4),
+            "objective": solver.ObjectiveValue() if has_objective and status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+            "parameters": str(solver.parameters),
+        })
 
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        
-        # --- Solution Mapping and Output Generation ---
-        
-        room_map = {cls: request.classrooms[i % len(request.classrooms)] for i, cls in enumerate(request.classes)}
-        
-        def map_period(val, cls, batch_key, d):
-            if val in id_to_pair:
-                tname, subject, _, batch_assigned = id_to_pair[val]
-                is_lab_sub = batch_assigned != "Full Class" 
-                
-                room = room_map[cls]
-                if is_lab_sub:
-                     room = request.labs[d % len(request.labs)] 
-
-                return {
-                    "faculty": tname, 
-                    "subject": subject, 
-                    "class_name": cls, 
-                    "batch": batch_assigned,
-                    "room": room, 
-                    "is_lab": is_lab_sub
-                }
-            return "Free"
-
-        # 1. Generate Class Timetable (Consolidated view)
-        class_tt = {cls: [["Free"] * periods_per_day for _ in range(working_days)] for cls in classes}
-        
-        for cls in classes:
-            for d in range(working_days):
-                for p in range(periods_per_day):
-                    period_detail = "Free"
-                    
-                    # 1. Check Full Class (Lectures) - Highest Priority
-                    full_class_val = solver.Value(timetable_vars.get((cls, "Full Class"), [[0]*periods_per_day]*working_days)[d][p])
-                    
-                    if full_class_val != 0:
-                         period_detail = map_period(full_class_val, cls, "Full Class", d)
-                    
-                    # 2. Check if a batch is busy (Labs) - If Full Class is FREE, check Labs
-                    if period_detail == "Free":
-                        # Check ALL batches for this slot
-                        for batch in request.batches:
-                            batch_val = solver.Value(timetable_vars.get((cls, batch), [[0]*periods_per_day]*working_days)[d][p])
-                            if batch_val != 0:
-                                period_detail = map_period(batch_val, cls, batch, d)
-                                break
-                    
-                    class_tt[cls][d][p] = period_detail
-
-
-        # 2-4. Generate Faculty, Lab, and Classroom Timetables (Filtering Class TT)
-        faculties = [f.name for f in request.faculty]
-        faculty_tt = {fac: [["Free"] * periods_per_day for _ in range(working_days)] for fac in faculties}
-        lab_tt = {lab: [["Free"] * periods_per_day for _ in range(working_days)] for lab in request.labs}
-        classroom_tt = {room: [["Free"] * periods_per_day for _ in range(working_days)] for room in request.classrooms}
-
-        for cls in classes:
-            for d in range(working_days):
-                for p in range(periods_per_day):
-                    period = class_tt[cls][d][p]
-                    if period != "Free":
-                        # Faculty TT update
-                        faculty_tt[period["faculty"]][d][p] = period
-                        
-                        # Lab TT update (only for lab periods)
-                        if period["is_lab"] and period["room"] in lab_tt:
-                             # Use the assigned batch key when mapping to resources
-                             lab_tt[period["room"]][d][p] = period
-                        
-                        # Classroom TT update (only for lecture/classroom periods)
-                        if not period["is_lab"] and period["room"] in classroom_tt:
-                            classroom_tt[period["room"]][d][p] = period
-
-
-        return {
-            "class_timetable": class_tt,
-            "faculty_timetable": faculty_tt, 
-            "lab_timetable": lab_tt,
-            "classroom_timetable": classroom_tt,
-        }
-    
+        values = solver.ResponseProto().solution
+        info = {}
+        if previous:
+            kept = sum(1 for key in previous_cells if values[tm.x[key].Index()])
+            info["warm_start"] = {
+                "previous_cells": len(previous_cells),
+                "kept_cells": kept,
+                "changed_cells": len(previous_cells) - kept,
+                "optimal": status == cp_model.OPTIMAL,
+            }
+        with diagnostics.span("extract"):
+            return solution_cells(tm, values), info
+
+    elif control.stop_requested():
+        raise TimetableError(
+            message="❌ Timetable generation was cancelled before a solution was found.",
+            error_type="CANCELLED"
+        )
+
     elif status == cp_model.INFEASIBLE:
+        control.report(phase="explain")
+        with diagnostics.span("explain"):
+            conflicts = explain_infeasibility(request, teacher_list)
+        message = "❌ No feasible timetable solution exists with the given constraints. Try reducing loads or increasing resources."
+        if conflicts:
+            message = format_constraint_errors(conflicts, message + "\n\nThese requirements cannot all hold together:").strip()
         raise TimetableError(
-            message="❌ No feasible timetable solution exists with the given constraints. Try reducing loads or increasing resources.",
-            error_type="INFEASIBLE_SOLUTION"
+            message=message,
+            error_type="INFEASIBLE_SOLUTION",
+            details={"constraint_errors": conflicts}
         )
     else:
         raise TimetableError(
-            message=f"❌ Timetable generation failed with solver status: {cp_model.CpSolver().StatusName(status)}. Try adjusting constraints.",
+            message=f"❌ Timetable generation failed with solver status: {solver.StatusName(status)}. Try adjusting constraints.",
             error_type="SOLVER_ERROR",
-            details={"solver_status": cp_model.CpSolver().StatusName(status)}
-        )
\ No newline at end of file
+            details={"solver_status": solver.StatusName(status)}
+        )
+
+
+def solve_components(request: TimetableRequest, components: List[List[str]], control: SolveControl,
+                     num_workers: int = 0, **solve_options) -> Dict[tuple, tuple]:
+    """Solve independent class groups concurrently and merge their busy cells.
+
+    CP-SAT releases the GIL while searching, so a thread pool gives real
+    parallelism; the cores (`num_workers`, default all) are split between the components.
+    All components share one deadline, `time_limit` from now: a group gets its
+    share of the time left, split over the rounds of the pool still to run, so
+    groups that waited for a thread still fit before the deadline.
+    """
+    cores = num_workers or available_cores()
+    pool_size = min(len(components), cores)
+    children = [control.child(request) for _ in components]
+    occupied = {}
+    solved = 0
+    deadline = time.time() + (solve_options.pop("time_limit", None) or default_time_limit(request, solve_options.get("mode", "auto")))
+    started = []
+    lock = threading.Lock()
+
+    def solve_group(sub: TimetableRequest, child: SolveControl):
+        with lock:
+            rounds = math.ceil((len(components) - len(started)) / pool_size)
+            started.append(sub)
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimetableError(message="❌ The time limit ran out before every independent class group was solved.",
+                                 error_type="SOLVER_ERROR")
+        return solve_model(sub, build_teacher_list(sub), child, num_workers=max(1, cores // pool_size),
+                           time_limit=remaining / rounds, **solve_options)
+
+    with ThreadPoolExecutor(max_workers=pool_size) as pool:
+        futures = {
+            pool.submit(solve_group, sub, child): child
+            for sub, child in ((sub_request(request, classes), child) for classes, child in zip(components, children))
+        }
+        try:
+            for future in as_completed(futures):
+                cells, _ = future.result()
+                occupied.update(cells)
+                solved += 1
+                control.report(components_solved=solved)
+        except Exception:
+            # One group failed: the merged timetable cannot exist, stop the others
+            for child in children:
+                child.state["stop"] = True
+            raise
+
+    return occupied
+
+
+def generate_from_input(request: TimetableRequest, control: Optional[SolveControl] = None,
+                        previous: Optional[Dict[str, Any]] = None, minimize_changes: bool = False,
+                        decompose: bool = True, mode: str = "auto", time_limit: Optional[float] = None,
+                        seed: Optional[int] = None, objective: Optional[Dict[str, int]] = None, num_workers: int = 0):
+    """Solve `request`.
+
+    `previous` is a stored timetable document (class/teacher/lab grids); its cells
+    are fed to CP-SAT as hints and, with `minimize_changes`, the solver maximises
+    the number of cells kept. Otherwise, with `decompose`, independent groups of
+    classes are solved as separate models in parallel. `mode`/`time_limit` pick
+    exact CP-SAT or Large Neighbourhood Search per model, `seed`/`objective` set
+    the random seed and soft objective weights (see solve_model) and `num_workers`
+    caps the CP-SAT workers (default: every available core). Settings not given
+    here come from the request's `profile`/`soft_objective` (see resolve_profile);
+    the result reports them under `search_profile` and why the search ended as
+    `stop_reason`.
+    """
+    control = control or SolveControl()
+
+    # --- STEP 1: Process and Split Loads into Batches (for Solver) ---
+    control.report(phase="preprocess")
+    diagnostics = control.diagnostics
+    with diagnostics.span("preprocess"):
+        teacher_list = build_teacher_list(request)
+
+    classes = request.classes
+    working_days = request.workingDays
+    periods_per_day = request.periods
+
+    # Run validation checks
+    with diagnostics.span("validate"):
+        constraint_errors = validate_input_constraints(
+            teacher_list, classes, working_days, periods_per_day,
+            num_classrooms=len(request.classrooms), num_labs=len(request.labs)
+        )
+
+    if constraint_errors:
+        error_message = format_constraint_errors(constraint_errors, "❌ Timetable generation failed due to constraint violations:")
+        raise TimetableError(message=error_message.strip(), error_type="INPUT_VALIDATION_FAILED",
+                             details={"constraint_errors": constraint_errors, "diagnostics": diagnostics.to_dict()})
+
+    # --- STEP 2: OR-Tools Solver Implementation (Boolean assignment matrix) ---
+    try:
+        settings = resolve_profile(request, time_limit, objective, num_workers)
+        # Report the deadline actually applied, not just the requested one
+        settings["time_limit"] = settings["time_limit"] or default_time_limit(request, mode, previous)
+        search = {key: settings[key] for key in ("time_limit", "relative_gap", "objective")}
+        components = find_components(request, teacher_list) if decompose and not previous else []
+        if len(components) > 1:
+            control.report(phase="solve", components=len(components), components_solved=0)
+            occupied, info = solve_components(request, components, control, settings["num_workers"], mode=mode, seed=seed,
+                                              **search), {}
+        else:
+            occupied, info = solve_model(request, teacher_list, control, previous, minimize_changes, settings["num_workers"],
+                                         mode=mode, seed=seed, **search)
+    except TimetableError as e:
+        e.details.setdefault("diagnostics", diagnostics.to_dict())
+        raise
+
+    # --- Solution Mapping and Output Generation ---
+    control.report(phase="extract")
+    with diagnostics.span("extract"):
+        result = build_timetables(request, occupied)
+    result.update(info)
+    result["diagnostics"] = diagnostics.to_dict()
+    result["search_profile"] = settings
+    result["stop_reason"] = next((r for r in STOP_REASONS if r in result["diagnostics"].get("stop_reasons", {})), None)
+    return result
+
+
+# One class, one faculty, one lecture: solved by every pre-warmed pool worker at boot (see jobs.JobQueue.warm)
+WARM_UP_REQUEST = {
+    "workingDays": 1, "periods": 1, "classes": ["Warm-up"], "batches": [], "classrooms": ["R1"], "labs": [],
+    "syllabus": {}, "userId": "warm-up",
+    "faculty": [{"name": "F1", "load_assignments": [{"subject": "S1", "class_name": "Warm-up", "lecture_load": 1}]}],
+}
+
+
+def warm_up() -> str:
+    """Build, solve and extract a tiny model so this process has CP-SAT loaded and initialised.
+
+    Goes through the same model, solver configuration (tuned parameters) and
+    extraction code as a real solve, but records no diagnostics and never dumps.
+    Returns the solver status name.
+    """
+    request = TimetableRequest(**WARM_UP_REQUEST)
+    tm = TimetableModel(request, build_teacher_list(request))
+    solver = cp_model.CpSolver()
+    configure_solver(solver, time_limit=10.0, num_workers=1)
+    status = solver.Solve(tm.model)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        build_timetables(request, solution_cells(tm, solver.ResponseProto().solution))
+    return solver.StatusName(status)
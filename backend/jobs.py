@@ -0,0 +1,309 @@
+# backend/jobs.py
+# Solve job queue: runs CPU-bound generation in a bounded process pool so the
+# FastAPI event loop stays free for /add, /get-timetables and health checks.
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing import Manager
+from typing import Dict, Optional, Any, Callable
+from datetime import datetime
+import threading
+import uuid
+import time
+import os
+
+from cache import CACHEABLE_OPTIONS
+
+# Job statuses
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+
+FINISHED_JOB_TTL = 60 * 60  # seconds a finished job stays queryable
+PREWARM_TIMEOUT = 120.0  # seconds a warm-up task waits for the others to start
+
+
+def available_cores() -> int:
+    """Cores this process may actually run on (respects CPU affinity/cgroups where exposed)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+class JobQueueFull(Exception):
+    """Raised when the pool already holds the maximum number of queued/running jobs."""
+
+
+def _run_job(payload: Dict[str, Any], state, stream: bool = False, solve_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Worker entry point (runs in a pool process); `solve_options` go to generate_from_input."""
+    from models import TimetableRequest
+    from generator import generate_from_input, SolveControl
+
+    state["phase"] = "started"
+    state["started_at"] = time.time()
+    return generate_from_input(TimetableRequest(**payload), control=SolveControl(state, stream=stream), **(solve_options or {}))
+
+
+def _warm_worker(barrier, timeout: float) -> Dict[str, Any]:
+    """Pool warm-up task: load the solver and solve a tiny model in this worker.
+
+    The task then waits until every warm-up task is running, so each one lands
+    in its own process instead of a fast worker taking several.
+    """
+    from generator import warm_up
+
+    started = time.perf_counter()
+    status = warm_up()
+    seconds = time.perf_counter() - started
+    try:
+        barrier.wait(timeout)
+    except Exception:
+        pass  # a worker failed to start: the others are warm all the same
+    return {"pid": os.getpid(), "status": status, "seconds": round(seconds, 3)}
+
+
+class Job:
+    def __init__(self, job_id: str, request, state):
+        self.id = job_id
+        self.request = request
+        self.state = state  # Manager dict shared with the worker
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None  # when a pool worker picked the job up
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self.stop_requested = False
+        # Clients waiting on this job (identical in-flight requests share it); stops are applied
+        # once every waiter asked for one, cancels once the last waiter has left
+        self.waiters = 1
+        self.stops = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.future: Optional[Future] = None
+        self.cache_key: Optional[str] = None
+        self.stream = False
+
+    def progress(self) -> Dict[str, Any]:
+        try:
+            progress = dict(self.state)
+        except Exception:
+            # Manager already shut down
+            progress = {}
+        progress.pop("stop", None)
+        progress.pop("solution", None)
+        started = progress.pop("started_at", None)
+        if started and self.status == RUNNING:
+            progress["elapsed"] = round(time.time() - started, 3)
+        return progress
+
+    def latest_solution(self) -> Optional[Dict[str, Any]]:
+        """Best solution published so far by a streaming job."""
+        try:
+            return self.state.get("solution")
+        except Exception:
+            return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress(),
+            "createdAt": datetime.fromtimestamp(self.created_at).isoformat(),
+            "finishedAt": datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+        }
+
+
+class JobQueue:
+    """Bounded solver pool with back-pressure.
+
+    At most `max_workers` jobs run at once and at most `max_pending` more wait;
+    anything beyond that raises JobQueueFull so the API can answer 429.
+    With a `cache`, repeated requests are answered from it and identical
+    in-flight requests share one job. `on_finish(job)` is called once for every
+    job that went through the pool. The pool starts on the first job, or in
+    warm() with `prewarm` worker processes that have each solved a tiny model.
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None, cache=None,
+                 on_finish: Optional[Callable[[Job], None]] = None, prewarm: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("SOLVER_WORKERS", 0)) or available_cores()
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("SOLVER_QUEUE_SIZE", 4 * self.max_workers))
+        self.prewarm = min(self.max_workers, prewarm if prewarm is not None
+                           else int(os.getenv("SOLVER_PREWARM_WORKERS", self.max_workers)))
+        self.warm_workers = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.cache = cache
+        self.on_finish = on_finish
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._manager = Manager()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def warm(self, timeout: float = PREWARM_TIMEOUT) -> Dict[str, Any]:
+        """Start the pool and warm `prewarm` worker processes; blocks until they are warm (run it off the event loop)."""
+        if self.prewarm <= 0:
+            return {"workers": 0, "seconds": 0.0}
+        started = time.perf_counter()
+        with self._lock:
+            self._ensure_started()
+            barrier = self._manager.Barrier(self.prewarm)
+            futures = [self._executor.submit(_warm_worker, barrier, timeout) for _ in range(self.prewarm)]
+        results = [future.result() for future in futures]
+        self.warm_workers = len({result["pid"] for result in results})
+        return {
+            "workers": self.warm_workers,
+            "seconds": round(time.perf_counter() - started, 3),
+            "solve_seconds": max(result["seconds"] for result in results),
+        }
+
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status in (QUEUED, RUNNING))
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0}
+        for job_id in list(self._jobs):
+            job = self.get(job_id)
+            if job is not None and job.status in counts:
+                counts[job.status] += 1
+        return counts
+
+    def _purge_finished(self):
+        cutoff = time.time() - FINISHED_JOB_TTL
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _completed_job(self, request, result: Dict[str, Any]) -> Job:
+        job = Job(uuid.uuid4().hex, request, {"phase": "cached"})
+        job.status = DONE
+        job.finished_at = time.time()
+        job.result = result
+        job.future = Future()
+        job.future.set_result(result)
+        self._jobs[job.id] = job
+        return job
+
+    def submit(self, request, stream: bool = False, **solve_options) -> Job:
+        # mode/time_limit are part of the cache key; other solve options (warm starts, ...) bypass the cache
+        cacheable = self.cache is not None and all(option in CACHEABLE_OPTIONS for option in solve_options)
+        key = self.cache.key_for(request, **solve_options) if cacheable else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                with self._lock:
+                    return self._completed_job(request, cached)
+
+        with self._lock:
+            self._purge_finished()
+            inflight = self._inflight.get(key) if key is not None else None
+            if inflight is not None and inflight.stream == stream and not (inflight.cancel_requested or inflight.stop_requested):
+                # Identical solve already queued/running: share it
+                self.cache.stats["coalesced"] += 1
+                inflight.waiters += 1
+                return inflight
+
+            if self.active_count() >= self.max_workers + self.max_pending:
+                raise JobQueueFull(f"Solver queue is full ({self.max_workers} running, {self.max_pending} waiting).")
+
+            self._ensure_started()
+            job = Job(uuid.uuid4().hex, request, self._manager.dict())
+            job.cache_key = key
+            job.stream = stream
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+            job.future = self._executor.submit(_run_job, request.dict(), job.state, stream, self._pooled_options(request, solve_options))
+
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _pooled_options(self, request, solve_options: Dict[str, Any]) -> Dict[str, Any]:
+        """Without a profile or explicit num_workers, jobs share the cores instead of each taking all of them."""
+        if request.profile or solve_options.get("num_workers"):
+            return solve_options
+        return {**solve_options, "num_workers": max(1, available_cores() // self.max_workers)}
+
+    def _finish(self, job: Job, future: Future):
+        try:
+            job.started_at = job.state.get("started_at")
+        except Exception:
+            pass  # Manager already shut down
+        with self._lock:
+            job.finished_at = time.time()
+            if job.cache_key is not None and self._inflight.get(job.cache_key) is job:
+                del self._inflight[job.cache_key]
+            if future.cancelled():
+                job.status = CANCELLED
+                return
+            error = future.exception()
+            if error is not None:
+                job.error = error
+                job.status = CANCELLED if job.cancel_requested else FAILED
+            else:
+                job.result = future.result()
+                job.status = CANCELLED if job.cancel_requested else DONE
+
+        # A stopped search is only as good as the moment it was stopped: don't serve it to later requests
+        if job.status == DONE and job.cache_key is not None and job.result.get("stop_reason") != "stopped":
+            self.cache.put(job.cache_key, job.result)
+        if self.on_finish is not None:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                print(f"Job finish hook failed: {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == QUEUED and job.future.running():
+            job.status = RUNNING
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """One waiter leaves the job; the solve is cancelled when it was the last one."""
+        job = self.get(job_id)
+        if job is None or job.status not in (QUEUED, RUNNING):
+            return job
+        with self._lock:
+            job.waiters = max(0, job.waiters - 1)
+            if job.waiters > 0:
+                if job.stops >= job.waiters:
+                    self._stop(job)
+                return job
+        self._cancel(job)
+        return job
+
+    def _cancel(self, job: Job):
+        job.cancel_requested = True
+        if not job.future.cancel():
+            # Already on a worker: ask its solver to stop at the next poll
+            job.state["stop"] = True
+
+    def stop(self, job_id: str) -> Optional[Job]:
+        """End the search early but keep the best solution found so far (job finishes DONE).
+
+        A job shared by several waiters stops once each of them has asked.
+        """
+        job = self.get(job_id)
+        if job is not None and job.status in (QUEUED, RUNNING):
+            with self._lock:
+                job.stops += 1
+                if job.stops >= job.waiters:
+                    self._stop(job)
+        return job
+
+    def _stop(self, job: Job):
+        job.stop_requested = True
+        job.state["stop"] = True
+
+    def shutdown(self):
+        if self._executor is not None:
+            for job in list(self._jobs.values()):
+                if job.status in (QUEUED, RUNNING):
+                    self._cancel(job)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
+            self._manager = None
@@ -0,0 +1,275 @@
+# backend/lns.py
+# Large Neighbourhood Search for institution-scale instances: start from a
+# greedy schedule (periods that do not fit stay unscheduled), then repeatedly
+# free one day, one faculty's classes or a group of classes, fix everything
+# else and re-solve that neighbourhood with a short time budget. Neighbourhood
+# size and per-iteration time adapt to how the sub-solves end.
+from ortools.sat.python import cp_model
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple
+import random
+import time
+
+NEIGHBOURHOODS = ("day", "faculty", "classes")
+# Neighbourhood size (classes freed) and sub-solve budget move by these factors
+GROW = 1.25
+SHRINK = 0.8
+
+
+class _StopAtTarget(cp_model.CpSolverSolutionCallback):
+    """Ends a sub-solve once it beats `incumbent` or reaches `bound`, the best the neighbourhood can do.
+
+    CP-SAT's own bound on unscheduled periods is weak, so without this every
+    sub-solve would run until its time limit.
+    """
+    def __init__(self, incumbent: float, bound: float):
+        super().__init__()
+        self.incumbent = incumbent
+        self.bound = bound
+
+    def on_solution_callback(self):
+        if self.ObjectiveValue() < self.incumbent or self.ObjectiveValue() <= self.bound:
+            self.StopSearch()
+
+
+class LNSEngine:
+    """Runs LNS over a relaxed TimetableModel (built with relax=True and a Minimize objective)."""
+    def __init__(self, tm, control, time_limit: float = 300.0, iteration_time: float = 1.0,
+                 max_iteration_time: float = 10.0, min_classes: int = 2, max_classes: int = 8,
+                 seed: int = 0, num_workers: int = 0):
+        self.tm = tm
+        self.control = control
+        self.time_limit = time_limit
+        self.iteration_time = iteration_time
+        self.min_iteration_time = iteration_time / 4
+        self.max_iteration_time = max_iteration_time
+        self.min_classes = min(min_classes, len(tm.classes))
+        self.max_classes = len(tm.classes)
+        self.size = float(min(max_classes, len(tm.classes)))  # classes freed per neighbourhood, adapted
+        self.num_workers = num_workers
+        self.random = random.Random(seed)
+
+        # Variable indices per assignment id and per (assignment, day), used to fix the complement of a neighbourhood
+        self.indices_by_aid = defaultdict(list)
+        self.indices_by_aid_day = defaultdict(list)
+        for (aid, d, _), lit in list(tm.x.items()) + list(tm.lab_start.items()):
+            self.indices_by_aid[aid].append(lit.Index())
+            self.indices_by_aid_day[(aid, d)].append(lit.Index())
+        self.slack_index = {aid: var.Index() for aid, var in tm.unscheduled.items()}
+        for aid, index in self.slack_index.items():
+            self.indices_by_aid[aid].append(index)
+        self.all_indices = sorted({i for indices in self.indices_by_aid.values() for i in indices})
+
+        self.aids_by_class = defaultdict(list)
+        self.classes_by_faculty = defaultdict(set)
+        self.faculty_by_class = defaultdict(set)
+        for aid, (tname, _, cls, _) in tm.id_to_pair.items():
+            self.aids_by_class[cls].append(aid)
+            self.classes_by_faculty[tname].add(cls)
+            self.faculty_by_class[cls].add(tname)
+
+        self.stats = {"iterations": 0, "accepted": 0, "improved": 0, "timeouts": 0, "neighbourhoods": defaultdict(int)}
+
+    def _solver(self, time_limit: float) -> cp_model.CpSolver:
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.05, time_limit)
+        solver.parameters.random_seed = self.random.randrange(1 << 30)
+        if self.num_workers:
+            solver.parameters.num_workers = self.num_workers
+        return solver
+
+    def _unscheduled(self, values: List[int]) -> Dict[int, int]:
+        return {aid: values[i] for aid, i in self.slack_index.items() if values[i]}
+
+    # --- Initial schedule ---
+
+    def initial_values(self) -> List[int]:
+        """Greedy schedule as a full assignment of the relaxed model; what does not fit stays unscheduled.
+
+        Labs first (double blocks are the hardest to place), then lectures, each
+        unit on the first slot in a random order that every rule of the model allows.
+        """
+        tm = self.tm
+        values = [0] * len(tm.model.Proto().variables)
+        periods, rooms, labs = tm.periods_per_day, len(tm.request.classrooms), len(tm.request.labs)
+        batches = list(tm.request.batches)
+        slots = list(tm.slots)
+        lab_ids, lecture_ids = set(tm.lab_ids), set(tm.lecture_ids)
+        faculty_busy = defaultdict(set)   # faculty -> (d, p)
+        lecture_busy = defaultdict(set)   # class -> (d, p) with a lecture
+        batch_busy = defaultdict(set)     # (class, batch) -> (d, p) with a lab
+        rooms_used = defaultdict(int)     # (d, p) -> lectures
+        labs_used = defaultdict(int)      # (d, p) -> lab periods
+        days_used = defaultdict(set)      # lecture: (class, subject), lab: aid -> days
+
+        def lecture_fits(tname, cls, subject, d, p):
+            return ((d, p) not in faculty_busy[tname] and (d, p) not in lecture_busy[cls]
+                    and rooms_used[(d, p)] < rooms and d not in days_used[(cls, subject)]
+                    and not any((d, p) in batch_busy[(cls, b)] for b in batches))
+
+        def lab_fits(aid, tname, cls, batch, d, p):
+            return (p + 1 < periods and d not in days_used[aid]
+                    and all((d, q) not in faculty_busy[tname] and (d, q) not in lecture_busy[cls]
+                            and (d, q) not in batch_busy[(cls, batch)] and labs_used[(d, q)] < labs for q in (p, p + 1)))
+
+        load = defaultdict(int)
+        for aid, (tname, _, _, _) in tm.id_to_pair.items():
+            load[tname] += tm.counts[aid]
+        order = sorted(tm.id_to_pair, key=lambda aid: (aid in lecture_ids, -load[tm.id_to_pair[aid][0]], self.random.random()))
+
+        for aid in order:
+            tname, subject, cls, batch = tm.id_to_pair[aid]
+            missing = tm.slack_upper_bound(aid)
+            is_lab = aid in lab_ids
+            self.random.shuffle(slots)
+            for d, p in slots:
+                if not missing:
+                    break
+                if is_lab and lab_fits(aid, tname, cls, batch, d, p):
+                    values[tm.lab_start[(aid, d, p)].Index()] = 1
+                    for q in (p, p + 1):
+                        values[tm.x[(aid, d, q)].Index()] = 1
+                        faculty_busy[tname].add((d, q))
+                        batch_busy[(cls, batch)].add((d, q))
+                        labs_used[(d, q)] += 1
+                    days_used[aid].add(d)
+                    missing -= 1
+                elif not is_lab and lecture_fits(tname, cls, subject, d, p):
+                    values[tm.x[(aid, d, p)].Index()] = 1
+                    faculty_busy[tname].add((d, p))
+                    lecture_busy[cls].add((d, p))
+                    rooms_used[(d, p)] += 1
+                    days_used[(cls, subject)].add(d)
+                    missing -= 1
+            values[self.slack_index[aid]] = missing
+        return values
+
+    # --- Neighbourhoods ---
+
+    def _pick_classes(self, seed_class: str, size: int) -> List[str]:
+        """Seed class plus classes sharing its faculty, up to `size`."""
+        chosen = [seed_class]
+        frontier = [seed_class]
+        while frontier and len(chosen) < size:
+            cls = frontier.pop(0)
+            neighbours = sorted({c for t in self.faculty_by_class[cls] for c in self.classes_by_faculty[t]} - set(chosen))
+            self.random.shuffle(neighbours)
+            for other in neighbours[:size - len(chosen)]:
+                chosen.append(other)
+                frontier.append(other)
+        return chosen
+
+    def _neighbourhood(self, unscheduled: Dict[int, int]) -> Tuple[str, set]:
+        """Variable indices to free, around an unscheduled assignment when there is one.
+
+        A day neighbourhood frees one day of `working_days` times as many classes,
+        so every kind frees about as many variables.
+        """
+        kind = self.random.choice(NEIGHBOURHOODS)
+        target = self.random.choice(list(unscheduled)) if unscheduled else self.random.choice(list(self.tm.id_to_pair))
+        tname, _, cls, _ = self.tm.id_to_pair[target]
+        size = int(round(self.size))
+
+        free = set()
+        if kind == "day":
+            day = self.random.randrange(self.tm.working_days)
+            for c in self._pick_classes(cls, size * self.tm.working_days):
+                for aid in self.aids_by_class[c]:
+                    free.update(self.indices_by_aid_day[(aid, day)])
+                    if aid in self.slack_index:
+                        free.add(self.slack_index[aid])
+            return kind, free
+
+        if kind == "faculty":
+            classes = sorted(self.classes_by_faculty[tname] - {cls})
+            self.random.shuffle(classes)
+            classes = [cls] + classes[:size - 1]
+        else:
+            classes = self._pick_classes(cls, size)
+        for c in classes:
+            for aid in self.aids_by_class[c]:
+                free.update(self.indices_by_aid[aid])
+        return kind, free
+
+    def _solve_neighbourhood(self, values: List[int], free: set, objective: float, time_limit: float):
+        model = self.tm.model.Clone()
+        model.ClearHints()
+        proto = model.Proto()
+        for i in self.all_indices:
+            if i not in free:
+                # Every model variable has a single [lo, hi] interval; pin it to the current value
+                domain = proto.variables[i].domain
+                domain[0] = values[i]
+                domain[1] = values[i]
+        for i in free:
+            model.AddHint(model.GetIntVarFromProtoIndex(i), values[i])
+        # Slack outside the neighbourhood is fixed: the sub-solve cannot go below it
+        bound = sum(values[i] for i in self.slack_index.values() if i not in free)
+        solver = self._solver(time_limit)
+        watching = self.control.watch(solver)
+        try:
+            status = solver.Solve(model, _StopAtTarget(objective, bound))
+        finally:
+            watching.set()
+        self.control.diagnostics.record_solve(solver, status)
+        return solver, status
+
+    def _adapt(self, finished: bool):
+        """Bigger neighbourhoods and shorter budgets while sub-solves finish; the reverse when they time out."""
+        if finished:
+            self.size = min(self.max_classes, self.size * GROW)
+            self.iteration_time = max(self.min_iteration_time, self.iteration_time * SHRINK)
+        else:
+            self.stats["timeouts"] += 1
+            self.size = max(self.min_classes, self.size * SHRINK)
+            self.iteration_time = min(self.max_iteration_time, self.iteration_time * GROW)
+
+    def run(self) -> Tuple[Optional[List[int]], Dict[str, Any]]:
+        """Returns the best variable assignment (indexed by proto variable index) and run statistics."""
+        started = time.time()
+        deadline = started + self.time_limit
+
+        values = self.initial_values()
+        objective = sum(values[i] for i in self.slack_index.values())
+        self._report(started, objective)
+
+        while objective > 0 and time.time() < deadline and not self.control.stop_requested():
+            kind, free = self._neighbourhood(self._unscheduled(values))
+            self.stats["iterations"] += 1
+            self.stats["neighbourhoods"][kind] += 1
+
+            budget = min(self.iteration_time, deadline - time.time())
+            solver, status = self._solve_neighbourhood(values, free, objective, budget)
+            if status == cp_model.MODEL_INVALID:
+                raise ValueError(f"LNS neighbourhood model is invalid: {solver.SolutionInfo()}")
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and solver.ObjectiveValue() <= objective:
+                # Accept sideways moves too: they shuffle the schedule and open new neighbourhoods
+                if solver.ObjectiveValue() < objective:
+                    self.stats["improved"] += 1
+                self.stats["accepted"] += 1
+                values = list(solver.ResponseProto().solution)
+                objective = solver.ObjectiveValue()
+            # Stopped at the target or proved: finished; otherwise the budget ran out
+            self._adapt(status == cp_model.OPTIMAL or solver.WallTime() < 0.9 * budget)
+            self._report(started, objective)
+
+        return values, self._report(started, objective)
+
+    def _report(self, started: float, objective: Optional[float], status: Optional[str] = None) -> Dict[str, Any]:
+        iterations = self.stats["iterations"]
+        summary = {
+            "iterations": iterations,
+            "accepted": self.stats["accepted"],
+            "improved": self.stats["improved"],
+            "timeouts": self.stats["timeouts"],
+            "acceptance_rate": round(self.stats["accepted"] / iterations, 3) if iterations else None,
+            "neighbourhoods": dict(self.stats["neighbourhoods"]),
+            "neighbourhood_classes": round(self.size, 1),
+            "iteration_time": round(self.iteration_time, 3),
+            "unscheduled_periods": int(objective) if objective is not None else None,
+            "elapsed": round(time.time() - started, 3),
+        }
+        if status:
+            summary["status"] = status
+        self.control.report(phase="lns", lns=summary)
+        return summary
@@ -0,0 +1,120 @@
+# backend/metrics.py
+# Prometheus metrics for the API process. Solver-side numbers arrive through the
+# `diagnostics` of finished jobs (solves run in pool processes).
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+import time
+
+registry = CollectorRegistry()
+
+PHASE_SECONDS = Histogram(
+    "timetable_generate_phase_seconds", "Time spent per generation phase",
+    ["phase"], registry=registry,
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+SOLVE_SECONDS = Histogram(
+    "timetable_solver_wall_seconds", "CP-SAT wall time per generation (all sub-solves)",
+    registry=registry, buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 120, 300),
+)
+MODEL_VARIABLES = Histogram(
+    "timetable_model_variables", "CP-SAT variables per generation",
+    registry=registry, buckets=(1e3, 5e3, 1e4, 5e4, 1e5, 5e5, 1e6),
+)
+MODEL_CONSTRAINTS = Histogram(
+    "timetable_model_constraints", "CP-SAT constraints per generation",
+    registry=registry, buckets=(1e3, 5e3, 1e4, 5e4, 1e5, 5e5, 1e6),
+)
+SOLVER_CONFLICTS = Counter("timetable_solver_conflicts", "CP-SAT conflicts", registry=registry)
+SOLVER_BRANCHES = Counter("timetable_solver_branches", "CP-SAT branches", registry=registry)
+SOLVER_STATUS = Counter("timetable_solver_status", "CP-SAT solve results by status", ["status"], registry=registry)
+GENERATIONS = Counter("timetable_generations", "Finished generation jobs by outcome", ["outcome"], registry=registry)
+MONGO_SECONDS = Histogram(
+    "timetable_mongo_seconds", "MongoDB call latency", ["operation"], registry=registry,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+HTTP_SECONDS = Histogram(
+    "timetable_http_request_seconds", "Time from request arrival to response headers", ["method", "route", "status"],
+    registry=registry, buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+JOB_WAIT_SECONDS = Histogram(
+    "timetable_job_queue_wait_seconds", "Time solver jobs waited for a pool worker",
+    registry=registry, buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+STARTUP_SECONDS = Gauge(
+    "timetable_startup_seconds", "Cold start: seconds per startup phase (import, database, solver_pool, "
+    "solver_import) and from import to ready", ["phase"], registry=registry,
+)
+FIRST_REQUEST_SECONDS = Gauge(
+    "timetable_first_request_seconds", "Latency of the first request to each route since the process started",
+    ["route"], registry=registry,
+)
+JOBS = Gauge("timetable_jobs", "Solver jobs currently queued or running", ["status"], registry=registry)
+CACHE = Gauge("timetable_solution_cache", "Solution cache counters and size", ["stat"], registry=registry)
+
+
+def observe_diagnostics(diagnostics: Optional[Dict[str, Any]]):
+    if not diagnostics:
+        return
+    for phase, seconds in diagnostics.get("timings", {}).items():
+        PHASE_SECONDS.labels(phase=phase).observe(seconds)
+    model = diagnostics.get("model", {})
+    if model.get("models"):
+        MODEL_VARIABLES.observe(model["variables"])
+        MODEL_CONSTRAINTS.observe(model["constraints"])
+    search = diagnostics.get("search", {})
+    if search.get("solves"):
+        SOLVE_SECONDS.observe(search["wall_time"])
+        SOLVER_CONFLICTS.inc(search["conflicts"])
+        SOLVER_BRANCHES.inc(search["branches"])
+    for status, count in diagnostics.get("statuses", {}).items():
+        SOLVER_STATUS.labels(status=status).inc(count)
+
+
+def observe_job(job):
+    """JobQueue on_finish hook: record a finished solve (cache hits are not solves)."""
+    if job.started_at is not None:
+        JOB_WAIT_SECONDS.observe(max(0.0, job.started_at - job.created_at))
+    if job.result is not None:
+        GENERATIONS.labels(outcome=job.status).inc()
+        observe_diagnostics(job.result.get("diagnostics"))
+    elif job.error is not None:
+        GENERATIONS.labels(outcome=getattr(job.error, "error_type", "UNEXPECTED_ERROR")).inc()
+        observe_diagnostics(getattr(job.error, "details", {}).get("diagnostics"))
+    else:
+        GENERATIONS.labels(outcome=job.status).inc()
+
+
+_seen_routes = set()
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    HTTP_SECONDS.labels(method=method, route=route, status=str(status)).observe(seconds)
+    if route not in _seen_routes:
+        _seen_routes.add(route)
+        FIRST_REQUEST_SECONDS.labels(route=route).set(seconds)
+
+
+def observe_startup(phase: str, seconds: float):
+    STARTUP_SECONDS.labels(phase=phase).set(seconds)
+
+
+@contextmanager
+def mongo_timer(operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        MONGO_SECONDS.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+def render(job_queue=None, solution_cache=None):
+    """Prometheus text exposition, refreshing the point-in-time gauges first."""
+    if job_queue is not None:
+        for status, count in job_queue.status_counts().items():
+            JOBS.labels(status=status).set(count)
+    if solution_cache is not None:
+        for stat, value in solution_cache.snapshot().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                CACHE.labels(stat=stat).set(value)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
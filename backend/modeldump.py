@@ -0,0 +1,103 @@
+# backend/modeldump.py
+# Opt-in dumps of built CP-SAT models for offline replay and parameter tuning.
+# With MODEL_DUMP_DIR set, every exact solve slower than MODEL_DUMP_MIN_SECONDS
+# (or without a solution) writes <dir>/<timestamp>-<request key>/ holding
+# model.pbtxt (the CpModelProto), request.json (the request without title/user)
+# and meta.json (solve settings and outcome). Models and SatParameters are kept
+# in protobuf text format, which every OR-Tools version reads and writes.
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+import json
+import os
+
+from cache import request_cache_key
+
+DUMP_DIR = os.getenv("MODEL_DUMP_DIR")
+DUMP_MIN_SECONDS = float(os.getenv("MODEL_DUMP_MIN_SECONDS", 0))
+
+MODEL_FILE = "model.pbtxt"
+REQUEST_FILE = "request.json"
+META_FILE = "meta.json"
+
+
+def parameters_text(parameters: Dict[str, Any]) -> str:
+    """SatParameters text format of {field: value} (enums by name, e.g. "FIXED_SEARCH")."""
+    def value_text(value):
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+    return "\n".join(f"{name}: {value_text(value)}" for name, value in parameters.items())
+
+
+def merge_parameters(parameters, text: str):
+    """Merge SatParameters text into a solver's parameters (ValueError on unknown fields or values)."""
+    if hasattr(parameters, "merge_text_format"):
+        if not parameters.merge_text_format(text):
+            raise ValueError(f"invalid SatParameters: {text!r}")
+    else:  # protobuf-backed OR-Tools releases
+        from google.protobuf import text_format
+        text_format.Merge(text, parameters)
+
+
+def should_dump(wall_time: float, solved: bool) -> bool:
+    return bool(DUMP_DIR) and (not solved or wall_time >= DUMP_MIN_SECONDS)
+
+
+def dump_model(model, request, meta: Dict[str, Any], directory: Optional[str] = None) -> Optional[str]:
+    """Write one dump; returns its path (None when writing failed: a dump must never fail a solve)."""
+    key = request_cache_key(request)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(directory or DUMP_DIR, f"{stamp}-{key[:12]}")
+    try:
+        os.makedirs(path, exist_ok=True)
+        if not model.ExportToFile(os.path.join(path, MODEL_FILE)):
+            raise OSError("CP-SAT could not write the model")
+        data = request.dict(exclude={"userId", "title"})
+        with open(os.path.join(path, REQUEST_FILE), "w") as f:
+            json.dump(data, f, indent=1)
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({"request_key": key, "created_at": datetime.now(timezone.utc).isoformat(), **meta}, f, indent=1)
+    except OSError as e:
+        print(f"Could not dump model to {path}: {e}")
+        return None
+    return path
+
+
+def load_model(path: str):
+    """CpModel of a dump directory."""
+    from ortools.sat.python import cp_model
+
+    model = cp_model.CpModel()
+    with open(os.path.join(path, MODEL_FILE)) as f:
+        text = f.read()
+    proto = model.Proto()
+    if hasattr(proto, "parse_text_format"):
+        proto.parse_text_format(text)
+    else:
+        from google.protobuf import text_format
+        text_format.Parse(text, proto)
+    return model
+
+
+def load_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def load_request(path: str):
+    from models import TimetableRequest
+
+    with open(os.path.join(path, REQUEST_FILE)) as f:
+        return TimetableRequest(userId="replay", **json.load(f))
+
+
+def find_dumps(paths: List[str]) -> List[str]:
+    """Dump directories given directly or found one level below the given directories."""
+    dumps = []
+    for path in paths:
+        if os.path.isfile(os.path.join(path, MODEL_FILE)):
+            dumps.append(path)
+        elif os.path.isdir(path):
+            dumps.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if os.path.isfile(os.path.join(path, name, MODEL_FILE))))
+    return dumps
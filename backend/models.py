@@ -32,7 +32,46 @@ class TimetableRequest(BaseModel):
     faculty: List[InputFaculty] # List of all faculty members
     userId : str 
     title : Optional[str] = None
+    # Search settings: profile is latency, balanced or quality (see generator.SOLVE_PROFILES);
+    # soft_objective weights faculty_gaps, subject_spread, lab_clustering and daily_load
+    profile: Optional[str] = None
+    soft_objective: Optional[Dict[str, int]] = None
     
+class CellEdit(BaseModel):
+    """One cell of a saved timetable: view is class, faculty, lab or classroom; value is "Free" or a period object."""
+    view: str
+    key: str
+    day: int
+    period: int
+    value: Any
+
+class CellEditRequest(BaseModel):
+    """Body of PATCH /timetables/{id}/cells; `version` is the version the edits were made against."""
+    version: int = 0
+    edits: List[CellEdit]
+
+class ProposedMove(BaseModel):
+    """Move the session shown in a view cell to (to_day, to_period); with `swap`, the target's session comes back."""
+    view: str
+    key: str
+    day: int
+    period: int
+    to_day: int
+    to_period: int
+    swap: bool = False
+
+class ValidateMovesRequest(BaseModel):
+    """Body of POST /validate-moves: a saved timetable (`timetable_id`) or an unsaved one (`timetable` grids)."""
+    timetable_id: Optional[str] = None
+    timetable: Optional[Dict[str, Any]] = None
+    moves: List[ProposedMove]
+    alternatives: bool = True
+
+class VariantSpec(BaseModel):
+    """One /generate-variants solve: CP-SAT random seed and soft objective weights (faculty_gaps, subject_spread, lab_clustering, daily_load)."""
+    seed: Optional[int] = None
+    weights: Dict[str, int] = {}
+
 # --- Dataclass models for internal use in generator.py ---
 # Note: These reflect the complex nature of the timetable solution itself
 
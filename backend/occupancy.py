@@ -0,0 +1,216 @@
+# backend/occupancy.py
+# Occupancy index of a saved timetable for validating manual moves: who holds
+# each (day, period) slot of every faculty, classroom, lab, class and batch,
+# plus one busy-slot bitset per resource for finding free alternatives.
+from collections import defaultdict, OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from edits import SESSION_FIELDS, VIEW_FIELDS
+import threading
+
+Session = Tuple  # SESSION_FIELDS values + is_lab
+Key = Tuple[str, Any]  # (kind, name): kind is faculty, classroom, lab, lecture (class) or batch ((class, batch))
+
+
+def session_key(value: Any) -> Optional[Session]:
+    if not isinstance(value, dict):
+        return None
+    return (*(value.get(f) for f in SESSION_FIELDS), bool(value.get("is_lab")))
+
+
+def session_dict(session: Session) -> Dict[str, Any]:
+    return {**dict(zip(SESSION_FIELDS, session)), "is_lab": session[5]}
+
+
+class OccupancyIndex:
+    """Slot occupants and busy bitsets (bit day * periods + period) per resource."""
+    def __init__(self, days: int, periods: int):
+        self.days = days
+        self.periods = periods
+        self.occupant: Dict[Key, Dict[int, Session]] = defaultdict(dict)
+        self.mask: Dict[Key, int] = defaultdict(int)
+        self.batches = defaultdict(set)            # class -> batches with labs
+        self.subject_days = defaultdict(lambda: defaultdict(int))  # (class, subject) -> day -> lectures
+
+    @classmethod
+    def from_timetable(cls, doc: Dict[str, Any]) -> "OccupancyIndex":
+        """Index a stored timetable document. The faculty view lists every session (the class view
+        shows one lab when two batches are in labs at once), so it is preferred when present."""
+        views = doc.get(VIEW_FIELDS["faculty"]) or doc.get(VIEW_FIELDS["class"]) or {}
+        days = doc.get("workingDays") or max((len(g) for g in views.values()), default=0)
+        periods = doc.get("periods") or max((len(row) for g in views.values() for row in g), default=0)
+        index = cls(days, periods)
+        for grid in views.values():
+            for d, row in enumerate(grid[:days]):
+                for p, value in enumerate(row[:periods]):
+                    session = session_key(value)
+                    if session is not None:
+                        index.add(session, index.slot(d, p))
+        return index
+
+    def slot(self, day: int, period: int) -> int:
+        return day * self.periods + period
+
+    def add(self, session: Session, slot: int):
+        for key in self.resources(session):
+            self.occupant[key][slot] = session
+            self.mask[key] |= 1 << slot
+        faculty, subject, class_name, batch, room, is_lab = session
+        if is_lab:
+            self.batches[class_name].add(batch)
+        else:
+            self.subject_days[(class_name, subject)][slot // self.periods] += 1
+
+    def resources(self, session: Session) -> List[Key]:
+        """Resources a session occupies."""
+        faculty, _, class_name, batch, room, is_lab = session
+        own = ("batch", (class_name, batch)) if is_lab else ("lecture", class_name)
+        return [("faculty", faculty), ("lab" if is_lab else "classroom", room), own]
+
+    def blocking(self, session: Session) -> List[Key]:
+        """Resources whose occupants clash with a session: a lecture needs the whole class, a lab its batch."""
+        faculty, _, class_name, batch, room, is_lab = session
+        keys = [("faculty", faculty), ("lab" if is_lab else "classroom", room), ("lecture", class_name)]
+        if is_lab:
+            keys.append(("batch", (class_name, batch)))
+        else:
+            keys.extend(("batch", (class_name, b)) for b in self.batches[class_name])
+        return keys
+
+    def at(self, view: str, key: str, day: int, period: int) -> Optional[Session]:
+        """Session shown in a view's cell (class view: the lecture, else a batch's lab)."""
+        slot = self.slot(day, period)
+        if view == "class":
+            session = self.occupant[("lecture", key)].get(slot)
+            if session is None:
+                for batch in sorted(self.batches[key]):
+                    session = self.occupant[("batch", (key, batch))].get(slot)
+                    if session is not None:
+                        break
+            return session
+        return self.occupant[(view, key)].get(slot)
+
+    def block(self, session: Session, slot: int) -> List[int]:
+        """Slots of the period at `slot`, plus its double-block partner for labs."""
+        if not session[5]:
+            return [slot]
+        own = self.occupant[self.resources(session)[2]]
+        p = slot % self.periods
+        if p > 0 and own.get(slot - 1) == session:
+            return [slot - 1, slot]
+        if p + 1 < self.periods and own.get(slot + 1) == session:
+            return [slot, slot + 1]
+        return [slot]
+
+    def _shift(self, slots: List[int], source: int, target: int) -> Optional[List[int]]:
+        """`slots` moved so that `source` lands on `target`, or None when that leaves the target day."""
+        moved = [target + (s - source) for s in slots]
+        day = target // self.periods
+        if any(s < 0 or s // self.periods != day or s >= self.days * self.periods for s in moved):
+            return None
+        return moved
+
+    def check_move(self, view: str, key: str, day: int, period: int, to_day: int, to_period: int,
+                   swap: bool = False) -> Dict[str, Any]:
+        """Conflicts of moving (or swapping) the session in one view cell; each check is a few dict lookups."""
+        if not (0 <= day < self.days and 0 <= period < self.periods and 0 <= to_day < self.days and 0 <= to_period < self.periods):
+            return {"valid": False, "conflicts": [{"kind": "out_of_range"}]}
+        source, target = self.slot(day, period), self.slot(to_day, to_period)
+        session = self.at(view, key, day, period)
+        if session is None:
+            return {"valid": False, "conflicts": [{"kind": "empty_source"}]}
+
+        # (session, from slots, to slots) for everything that moves
+        cells = self.block(session, source)
+        moves = [(session, cells, self._shift(cells, source, target))]
+        if swap:
+            other = self.at(view, key, to_day, to_period)
+            if other is not None and other != session:
+                other_cells = self.block(other, target)
+                moves.append((other, other_cells, self._shift(other_cells, target, source)))
+
+        conflicts = []
+        if any(to_slots is None for _, _, to_slots in moves):
+            conflicts.append({"kind": "lab_block_split", "message": "A double lab block must stay within one day."})
+            return {"valid": False, "conflicts": conflicts}
+
+        vacated = {(s, slot) for s, from_slots, _ in moves for slot in from_slots}
+        for s, from_slots, to_slots in moves:
+            for slot in to_slots:
+                for resource in self.blocking(s):
+                    holder = self.occupant[resource].get(slot)
+                    if holder is not None and (holder, slot) not in vacated:
+                        conflicts.append(self._conflict(resource, slot, holder))
+            if not s[5]:
+                conflicts.extend(self._daily_limit(s, from_slots[0], to_slots[0], moves))
+        return {"valid": not conflicts, "conflicts": conflicts}
+
+    def _daily_limit(self, session: Session, from_slot: int, to_slot: int, moves) -> List[Dict[str, Any]]:
+        """One lecture of a subject per class per day."""
+        from_day, to_day = from_slot // self.periods, to_slot // self.periods
+        if from_day == to_day:
+            return []
+        subject_key = (session[2], session[1])
+        leaving = sum(1 for s, from_slots, to_slots in moves
+                      if (s[2], s[1]) == subject_key and not s[5] and from_slots[0] // self.periods == to_day)
+        if self.subject_days[subject_key].get(to_day, 0) - leaving >= 1:
+            return [{"kind": "daily_limit", "day": to_day, "class": session[2], "subject": session[1],
+                     "message": f"{session[1]} already has a lecture for {session[2]} that day."}]
+        return []
+
+    def _conflict(self, resource: Key, slot: int, holder: Session) -> Dict[str, Any]:
+        kind, name = resource
+        if kind == "batch":
+            kind, name = "class", f"{name[0]} ({name[1]})"
+        elif kind == "lecture":
+            kind = "class"
+        return {"kind": kind, "name": name, "day": slot // self.periods, "period": slot % self.periods,
+                "session": session_dict(holder)}
+
+    def alternatives(self, view: str, key: str, day: int, period: int) -> List[Dict[str, int]]:
+        """Every (day, period) the cell's session (with its lab partner) could move to without a conflict."""
+        session = self.at(view, key, day, period) if 0 <= day < self.days and 0 <= period < self.periods else None
+        if session is None:
+            return []
+        source = self.slot(day, period)
+        cells = self.block(session, source)
+        own = sum(1 << s for s in cells)
+        busy = 0
+        for resource in self.blocking(session):
+            busy |= self.mask[resource]
+        busy &= ~own
+
+        taken_days = set()
+        if not session[5]:
+            taken_days = {d for d, n in self.subject_days[(session[2], session[1])].items() if n and d != day}
+
+        free = []
+        for target in range(self.days * self.periods):
+            to_slots = self._shift(cells, source, target)
+            if to_slots is None or target == source or target // self.periods in taken_days:
+                continue
+            if not any(busy >> s & 1 for s in to_slots):
+                free.append({"day": target // self.periods, "period": target % self.periods})
+        return free
+
+
+class OccupancyCache:
+    """Indexes of recently validated timetables keyed by (id, version); every save bumps the version."""
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], OccupancyIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int]) -> Optional[OccupancyIndex]:
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None:
+                self._entries.move_to_end(key)
+            return index
+
+    def put(self, key: Tuple[str, int], index: OccupancyIndex):
+        with self._lock:
+            self._entries[key] = index
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,64 @@
+# backend/quality.py
+# Soft-quality metrics of a solved timetable, used to rank alternative
+# solutions of the same request (lower is better for every metric).
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+from compact import CompactTimetable, FREE
+
+METRICS = ("faculty_gaps", "subject_spread", "lab_clustering", "daily_load")
+
+
+def faculty_gaps(timetable: CompactTimetable) -> int:
+    """Idle periods between a faculty member's first and last session of each day."""
+    gaps = 0
+    for rows in timetable.grid("faculty").values():
+        for row in rows:
+            busy = [p for p, sid in enumerate(row) if sid != FREE]
+            if busy:
+                gaps += busy[-1] - busy[0] + 1 - len(busy)
+    return gaps
+
+
+def subject_spread(timetable: CompactTimetable) -> int:
+    """Lectures of one class's subject on consecutive days (a well-spread subject has none)."""
+    days = defaultdict(set)
+    for rows in timetable.grid("faculty").values():
+        for d, row in enumerate(rows):
+            for sid in row:
+                if sid != FREE and not timetable.is_lab(sid):
+                    _, subject, class_name, _, _ = timetable.sessions[sid]
+                    days[(class_name, subject)].add(d)
+    return sum(1 for taught in days.values() for d in taught if d + 1 in taught)
+
+
+def lab_clustering(timetable: CompactTimetable) -> int:
+    """Lab periods in the first half of the day (labs are meant to cluster in the afternoon)."""
+    morning = timetable.periods // 2
+    return sum(1 for rows in timetable.grid("faculty").values() for row in rows
+               for sid in row[:morning] if sid != FREE and timetable.is_lab(sid))
+
+
+def daily_load(timetable: CompactTimetable) -> int:
+    """Periods between each faculty member's busiest and lightest day, summed."""
+    spread = 0
+    for rows in timetable.grid("faculty").values():
+        loads = [sum(1 for sid in row if sid != FREE) for row in rows]
+        if loads:
+            spread += max(loads) - min(loads)
+    return spread
+
+
+def measure(timetable: CompactTimetable) -> Dict[str, int]:
+    return {
+        "faculty_gaps": faculty_gaps(timetable),
+        "subject_spread": subject_spread(timetable),
+        "lab_clustering": lab_clustering(timetable),
+        "daily_load": daily_load(timetable),
+    }
+
+
+def score(metrics: Dict[str, int], weights: Optional[Dict[str, Any]] = None) -> float:
+    """Weighted sum of the metrics; every metric counts once by default."""
+    weights = weights if weights is not None else {name: 1 for name in METRICS}
+    return sum(weights.get(name, 0) * metrics[name] for name in METRICS)
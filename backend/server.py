@@ -1,22 +1,54 @@
 # backend/server.py (UPDATED CONTENT)
+import time
+IMPORT_STARTED = time.perf_counter()  # cold start: module import time goes to /metrics
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any # Added Any for generic dictionaries
-from models import InputFaculty, SubjectLoad # Import new models
-from generator import generate_from_input, TimetableError
+from typing import List, Dict, Optional, Any, Tuple # Added Any for generic dictionaries
+from models import InputFaculty, SubjectLoad, CellEditRequest, ValidateMovesRequest, VariantSpec # Import new models
+from compact import CompactTimetable, COMPACT_MEDIA_TYPE, LEGACY_KEYS
+from edits import CellEditError, VIEW_FIELDS, plan_cell_edits, rows_touched, normalise_value, mongo_path
+from occupancy import OccupancyIndex, OccupancyCache
+from cache import SolutionCache, MongoSolutionStore
+import metrics
+import quality
+import storage
+from jobs import JobQueue, JobQueueFull, DONE, FAILED, QUEUED, RUNNING, available_cores
 from dotenv import load_dotenv
 from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi.encoders import jsonable_encoder
 from pytz import timezone
+from contextlib import asynccontextmanager, contextmanager
 import pymongo
+import asyncio
+import json
+import gzip
+import base64
 import traceback
+import threading
+import math
 import os
 
+try:
+    import msgpack  # optional: application/msgpack responses
+except ImportError:
+    msgpack = None
+
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work runs in a thread so `/` (liveness) answers at once; `/ready` reports when it is done
+    asyncio.get_running_loop().run_in_executor(None, prepare_service)
+    yield
+    job_queue.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 frontend_url = os.getenv("FRONTEND_URL")
 
 # --- Authentication and User ID Hardcoding (for local setup) ---
@@ -32,14 +64,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Database Setup ---
-client = pymongo.MongoClient(
-   os.getenv("MONGO_URI"),
-    # tls=True,
-    # tlsAllowInvalidCertificates=False
-)
-db = client["timetableDB"]
-collection = db["timetables"]
+# --- Database Setup (connected on first use; MONGO_URI=memory:// runs on the in-process stand-in, see storage.py) ---
+_db = None
+_db_lock = threading.Lock()
+
+
+def database():
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = storage.connect()
+    return _db
+
+
+def timetables():
+    return database()["timetables"]
+
+
+def use_database(db):
+    """Point the API at another database, e.g. a storage.MemoryDatabase seeded by a test or load run."""
+    global _db
+    with _db_lock:
+        _db = db
+
+# Listing order is (createdAt, _id) newest first; _id breaks ties for cursor pagination
+TIMETABLE_LIST_INDEX = [("userId", pymongo.ASCENDING), ("createdAt", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# --- Solution Cache (in-process LRU, optional Mongo tier via SOLUTION_CACHE_MONGO=1, attached at startup) ---
+solution_cache = SolutionCache()
+
+# --- Occupancy indexes of saved timetables (for /validate-moves), keyed by (id, version) ---
+occupancy_cache = OccupancyCache(int(os.getenv("OCCUPANCY_CACHE_SIZE", 32)))
+
+# --- Solver Job Queue (process pool, SOLVER_PREWARM_WORKERS of it warmed at startup; keeps the event loop responsive) ---
+job_queue = JobQueue(cache=solution_cache, on_finish=metrics.observe_job)
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Per-route latency metric plus a Server-Timing header (time spent inside the app)."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    metrics.observe_request(request.method, getattr(route, "path", "unmatched"), response.status_code, elapsed)
+    response.headers["Server-Timing"] = f"app;dur={elapsed * 1000:.2f}"
+    return response
 
 
 # --- NEW Request Models (Mirroring frontend/models.py) ---
@@ -56,77 +129,499 @@ class TimetableRequest(BaseModel):
     faculty: List[InputFaculty] # Renamed from 'teachers'
     userId : str = PLACEHOLDER_USER_ID # Hardcode for non-auth setup
     title : Optional[str] = None
+    profile: Optional[str] = None # latency, balanced or quality
+    soft_objective: Optional[Dict[str, int]] = None # e.g. {"faculty_gaps": 2, "daily_load": 1}
+
+
+class VariantsRequest(BaseModel):
+    """Body of /generate-variants: one request solved `count` times (or once per entry of `variants`)."""
+    request: TimetableRequest
+    variants: Optional[List[VariantSpec]] = None
+    count: int = 4
+    time_limit: Optional[float] = None  # shared wall-clock budget (seconds) for all variants
+    rank_weights: Optional[Dict[str, float]] = None  # metric weights for ranking; default 1 each
 
 
 # --- API Endpoints ---
 
-@app.post("/generate")
-async def generate_timetable(request: TimetableRequest):
-    # Ensure the user ID is the hardcoded one for local non-auth setup
-    request.userId = PLACEHOLDER_USER_ID
+SOLVE_INFO_KEYS = ("warm_start", "lns", "search_profile", "stop_reason", "diagnostics")
+RESPONSE_FORMATS = ("json", "compact")
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+GZIP_MIN_SIZE = 1024
+
+# /generate-variants: default budget, cap on variants, and how long stopped solves get to hand back their best solution
+VARIANTS_TIME_LIMIT = float(os.getenv("VARIANTS_TIME_LIMIT", 30))
+MAX_VARIANTS = int(os.getenv("MAX_VARIANTS", 16))
+VARIANT_STOP_GRACE = 2.0
+# Objective weights cycled through when variants are not given explicitly
+VARIANT_PRESETS = [{}] + [{term: 1} for term in quality.METRICS] + [{term: 1 for term in quality.METRICS}]
+
+
+def solver_options(mode: str = "auto", time_limit: Optional[float] = None) -> Dict[str, Any]:
+    """Query-string solve options; defaults are left out so they share a cache key with requests that omit them."""
+    options = {}
+    if mode != "auto":
+        if mode not in ("exact", "lns"):
+            raise HTTPException(status_code=422, detail="mode must be one of: auto, exact, lns")
+        options["mode"] = mode
+    if time_limit is not None:
+        if time_limit <= 0:
+            raise HTTPException(status_code=422, detail="time_limit must be positive")
+        options["time_limit"] = time_limit
+    return options
+
+
+def check_search_settings(request: TimetableRequest):
+    """Reject an unknown profile or soft objective term before queuing a solve."""
+    from generator import resolve_profile, TimetableError
 
     try:
-        print(f"Received request: {request.title} by {request.userId}")
-        
-        # Call the updated generator function
-        # This function returns a dictionary containing all four timetables
-        # NOTE: generator.py has NOT been fully implemented yet, but this mocks the call.
-        result_data = generate_from_input(request)
-
-        # Check if the generator returned a valid set of timetables (status is implicitly FEASIBLE if successful)
-        if not result_data.get("class_timetable"):
-            return {
-                "message": "❌ Timetable generation failed. No feasible solution found.",
-                "class_timetable": {},
-                "teacher_timetable": {},
-                "status": "INFEASIBLE",
-                "error_type": "UNKNOWN",
-                "error_details": {}
-            }
-
-        # Return all generated timetables and metadata
+        resolve_profile(request)
+    except TimetableError as e:
+        raise HTTPException(status_code=422, detail=e.message)
+
+
+def response_layout(http_request: Request, response_format: Optional[str], views: Optional[str]) -> Dict[str, Any]:
+    """Negotiate the /generate body: ?format= (or an Accept of the compact media type) picks the layout,
+    Accept: application/msgpack the encoding and Accept-Encoding: gzip the compression."""
+    accept = http_request.headers.get("accept", "")
+    layout = response_format or ("compact" if COMPACT_MEDIA_TYPE in accept else "json")
+    if layout not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=422, detail="format must be one of: json, compact")
+
+    extra_views = [v for v in (views or "").split(",") if v]
+    if any(v not in LEGACY_KEYS for v in extra_views):
+        raise HTTPException(status_code=422, detail="views must be a comma-separated list of: class, faculty, lab, classroom")
+
+    encoding = "json"
+    if any(media in accept for media in MSGPACK_MEDIA_TYPES):
+        if msgpack is None:
+            raise HTTPException(status_code=406, detail="msgpack responses are not available on this server")
+        encoding = "msgpack"
+    return {
+        "response_format": layout,
+        "views": extra_views,
+        "encoding": encoding,
+        "gzip": "gzip" in http_request.headers.get("accept-encoding", ""),
+    }
+
+
+def encode_response(body: Dict[str, Any], encoding: str = "json", gzip_ok: bool = False) -> Response:
+    """Serialize once (pydantic models via jsonable_encoder), then gzip bodies worth compressing."""
+    if encoding == "msgpack":
+        content = msgpack.packb(body, default=jsonable_encoder)
+        media_type = MSGPACK_MEDIA_TYPES[0]
+    else:
+        content = json.dumps(body, default=jsonable_encoder, separators=(",", ":")).encode("utf-8")
+        media_type = COMPACT_MEDIA_TYPE if body.get("format") == "compact" else "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if gzip_ok and len(content) >= GZIP_MIN_SIZE:
+        content = gzip.compress(content, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+def build_generate_response(request: TimetableRequest, result_data: Dict[str, Any], response_format: str = "json",
+                            views: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Shape generator output into the /generate response body.
+
+    "json" is the original layout (four dict-per-cell timetables plus the faculty
+    input); "compact" returns the session table and class grids (plus any extra
+    `views` grids) from the generator as they are.
+    """
+    compact = result_data.get("compact")
+    # Check if the generator returned a valid set of timetables (status is implicitly FEASIBLE if successful)
+    if not compact or not compact["grids"]["class"]:
+        return {
+            "message": "❌ Timetable generation failed. No feasible solution found.",
+            "class_timetable": {},
+            "teacher_timetable": {},
+            "status": "INFEASIBLE",
+            "error_type": "UNKNOWN",
+            "error_details": {}
+        }
+
+    timetable = CompactTimetable.from_dict(compact)
+    solve_info = {key: result_data[key] for key in SOLVE_INFO_KEYS if key in result_data}
+    if response_format == "compact":
         return {
             "status": "FEASIBLE",
             "message": "✅ Timetable generated successfully",
-            
-            # --- Timetables ---
-            "class_timetable": result_data["class_timetable"],
-            "teacher_timetable": result_data["faculty_timetable"], # Renamed for frontend compatibility
-            "lab_timetable": result_data["lab_timetable"], # NEW
-            "classroom_timetable": result_data["classroom_timetable"], # NEW
-            
-            # --- Metadata ---
+            "format": "compact",
+            "timetable": timetable.to_dict(views=["class"] + [v for v in views or [] if v != "class"]),
             "userId": request.userId,
             "title": request.title,
-            "faculty": request.faculty, # Renamed from 'teacherData'
             "classes": request.classes,
             "batches": request.batches,
             "classrooms": request.classrooms,
             "labs": request.labs,
             "workingDays": request.workingDays,
-            "periods": request.periods
+            "periods": request.periods,
+            **solve_info
         }
 
-    except TimetableError as te:
-        print(f"Timetable generation error: {te.message}")
+    timetables = timetable.timetables()
+    # Return all generated timetables and metadata
+    return {
+        "status": "FEASIBLE",
+        "message": "✅ Timetable generated successfully",
+
+        # --- Timetables ---
+        "class_timetable": timetables["class_timetable"],
+        "teacher_timetable": timetables["faculty_timetable"], # Renamed for frontend compatibility
+        "lab_timetable": timetables["lab_timetable"], # NEW
+        "classroom_timetable": timetables["classroom_timetable"], # NEW
+
+        # --- Metadata ---
+        "userId": request.userId,
+        "title": request.title,
+        "faculty": request.faculty, # Renamed from 'teacherData'
+        "classes": request.classes,
+        "batches": request.batches,
+        "classrooms": request.classrooms,
+        "labs": request.labs,
+        "workingDays": request.workingDays,
+        "periods": request.periods,
+
+        # --- Solve details (warm start / LNS summaries, timings and CP-SAT statistics) ---
+        **solve_info
+    }
+
+
+def build_error_response(error: BaseException) -> Dict[str, Any]:
+    """Shape a generation failure into the /generate error body."""
+    from generator import TimetableError
+
+    if isinstance(error, TimetableError):
+        print(f"Timetable generation error: {error.message}")
         return {
-            "message": te.message,
+            "message": error.message,
             "status": "ERROR",
-            "error_type": te.error_type,
-            "error_details": te.details
+            "error_type": error.error_type,
+            "error_details": error.details
         }
-    
+
+    error_message = str(error)
+    print(f"Unexpected error generating timetable: {error_message}")
+    print("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+
+    return {
+        "message": f"❌ Timetable generation failed due to unexpected error: {error_message}",
+        "status": "ERROR",
+        "error_type": "UNEXPECTED_ERROR",
+        "error_details": {"original_error": error_message}
+    }
+
+
+def queue_full_response(error: JobQueueFull) -> Dict[str, Any]:
+    return {
+        "message": f"❌ The timetable solver is busy. {error} Please retry shortly.",
+        "status": "ERROR",
+        "error_type": "QUEUE_FULL",
+        "error_details": {}
+    }
+
+
+async def solve_and_respond(request: TimetableRequest, response_format: str = "json", views: Optional[List[str]] = None,
+                            **solve_options) -> Dict[str, Any]:
+    """Queue a solve, wait for it without blocking the event loop and shape the response."""
+    try:
+        job = job_queue.submit(request, **solve_options)
+    except JobQueueFull as full:
+        return queue_full_response(full)
+
+    try:
+        # Shielded: the job may be shared, so only job_queue.cancel decides whether it stops
+        result_data = await asyncio.shield(asyncio.wrap_future(job.future))
+        return build_generate_response(request, result_data, response_format, views)
+    except asyncio.CancelledError:
+        # Client went away: free the solver core unless other requests still wait on it
+        job_queue.cancel(job.id)
+        raise
     except Exception as e:
-        error_message = str(e)
-        print(f"Unexpected error generating timetable: {error_message}")
-        print(traceback.format_exc())
-        
-        return {
-            "message": f"❌ Timetable generation failed due to unexpected error: {error_message}",
-            "status": "ERROR",
-            "error_type": "UNEXPECTED_ERROR",
-            "error_details": {"original_error": error_message}
-        }
+        return build_error_response(e)
+
+
+@app.post("/generate")
+async def generate_timetable(request: TimetableRequest, http_request: Request, mode: str = "auto",
+                             time_limit: Optional[float] = None, format: Optional[str] = None, views: Optional[str] = None):
+    # Ensure the user ID is the hardcoded one for local non-auth setup
+    request.userId = PLACEHOLDER_USER_ID
+    check_search_settings(request)
+    print(f"Received request: {request.title} by {request.userId}")
+    layout = response_layout(http_request, format, views)
+
+    # Thin synchronous wrapper over the job queue: the solve runs in the pool, not on the event loop
+    body = await solve_and_respond(request, layout["response_format"], layout["views"], **solver_options(mode, time_limit))
+    return encode_response(body, layout["encoding"], layout["gzip"])
+
+
+@app.post("/resolve/{timetable_id}")
+async def resolve_timetable(timetable_id: str, request: TimetableRequest, minimize_changes: bool = True):
+    """Re-solve a changed request warm-started from a saved timetable, keeping as many cells as possible."""
+    request.userId = PLACEHOLDER_USER_ID
+    check_search_settings(request)
+    try:
+        query = {"_id": ObjectId(timetable_id), "userId": PLACEHOLDER_USER_ID}
+    except InvalidId:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    with metrics.mongo_timer("resolve.find_one"):
+        previous = timetables().find_one(
+            query, {"class_timetable": 1, "teacher_timetable": 1, "lab_timetable": 1}
+        )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    previous.pop("_id", None)
+
+    print(f"Received re-solve request: {request.title} from {timetable_id}")
+    return await solve_and_respond(request, previous=previous, minimize_changes=minimize_changes)
+
+
+def variant_specs(body: VariantsRequest) -> List[VariantSpec]:
+    specs = body.variants or [VariantSpec(seed=i, weights=VARIANT_PRESETS[i % len(VARIANT_PRESETS)]) for i in range(body.count)]
+    if not 1 <= len(specs) <= MAX_VARIANTS:
+        raise HTTPException(status_code=422, detail=f"between 1 and {MAX_VARIANTS} variants can be generated at once")
+    for weights in [spec.weights for spec in specs] + [body.rank_weights or {}]:
+        unknown = set(weights) - set(quality.METRICS)
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"unknown weights {sorted(unknown)}; use: {', '.join(quality.METRICS)}")
+        if any(w < 0 for w in weights.values()):
+            raise HTTPException(status_code=422, detail="weights must not be negative")
+    return specs
+
+
+@app.post("/generate-variants")
+async def generate_variants(body: VariantsRequest, http_request: Request, format: Optional[str] = None,
+                            views: Optional[str] = None):
+    """Solve one request under several seeds/objectives at once and return the timetables ranked by soft quality.
+
+    Variants run concurrently in the job pool, sharing one wall-clock budget: at
+    the deadline running solves are stopped (keeping their best solution so far)
+    and queued ones cancelled.
+    """
+    from generator import TimetableError
+
+    request = body.request
+    request.userId = PLACEHOLDER_USER_ID
+    check_search_settings(request)
+    layout = response_layout(http_request, format, views)
+    specs = variant_specs(body)
+    budget = body.time_limit or VARIANTS_TIME_LIMIT
+    if budget <= 0:
+        raise HTTPException(status_code=422, detail="time_limit must be positive")
+
+    # Variants beyond the pool size wait for a free worker: give each round an equal share of the
+    # budget, and split the cores between the variants that run at the same time
+    running = min(len(specs), job_queue.max_workers)
+    share = budget / math.ceil(len(specs) / running)
+    cores = max(1, available_cores() // running)
+    started = time.time()
+    jobs = []
+    try:
+        for spec in specs:
+            jobs.append(job_queue.submit(request, seed=spec.seed, objective=spec.weights or None,
+                                         time_limit=share, num_workers=cores))
+    except JobQueueFull as full:
+        for job in jobs:
+            job_queue.cancel(job.id)
+        return encode_response(queue_full_response(full), layout["encoding"], layout["gzip"])
+
+    futures = [asyncio.wrap_future(job.future) for job in jobs]
+    try:
+        _, pending = await asyncio.wait(futures, timeout=budget)
+        if pending:
+            for job in jobs:
+                if job.future.running():
+                    job_queue.stop(job.id)
+                else:
+                    job_queue.cancel(job.id)
+            await asyncio.wait(pending, timeout=VARIANT_STOP_GRACE)
+    except asyncio.CancelledError:
+        for job in jobs:
+            job_queue.cancel(job.id)
+        raise
+
+    variants = []
+    for spec, job, future in zip(specs, jobs, futures):
+        entry = {"seed": spec.seed, "weights": spec.weights, "job_id": job.id}
+        if not future.done():
+            job_queue.cancel(job.id)
+            entry["result"] = build_error_response(TimetableError(
+                "❌ The variant did not finish within the time budget.", error_type="CANCELLED"))
+        elif future.cancelled() or future.exception() is not None:
+            error = TimetableError("❌ The variant was cancelled before it started.", error_type="CANCELLED") \
+                if future.cancelled() else future.exception()
+            entry["result"] = build_error_response(error)
+        else:
+            result_data = future.result()
+            measured = quality.measure(CompactTimetable.from_dict(result_data["compact"]))
+            entry.update(metrics=measured, score=quality.score(measured, body.rank_weights))
+            entry["result"] = build_generate_response(request, result_data, layout["response_format"], layout["views"])
+        variants.append(entry)
+
+    # Best score first; failed variants last, in request order
+    variants.sort(key=lambda v: (v.get("score") is None, v.get("score") or 0))
+    for rank, entry in enumerate(variants, 1):
+        entry["rank"] = rank
+    solved = sum(1 for v in variants if "score" in v)
+    return encode_response({
+        "status": "FEASIBLE" if solved else "ERROR",
+        "message": f"✅ {solved} of {len(variants)} variants generated" if solved else "❌ No variant produced a timetable.",
+        "format": layout["response_format"],
+        "time_limit": budget,
+        "elapsed": round(time.time() - started, 3),
+        "rank_weights": body.rank_weights or {name: 1 for name in quality.METRICS},
+        "variants": variants,
+    }, layout["encoding"], layout["gzip"])
+
+
+# --- Solve Jobs ---
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: TimetableRequest, stream: bool = False, mode: str = "auto", time_limit: Optional[float] = None):
+    # stream=true publishes every improved solution on /jobs/{job_id}/events
+    # mode=lns (or auto on very large inputs) reports LNS iterations/acceptance under progress.lns
+    request.userId = PLACEHOLDER_USER_ID
+    check_search_settings(request)
+    options = solver_options(mode, time_limit)
+    try:
+        job = job_queue.submit(request, stream=stream, **options)
+    except JobQueueFull as full:
+        raise HTTPException(status_code=429, detail=str(full), headers={"Retry-After": "5"})
+    return job_queue.get(job.id).to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, format: str = "json"):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=422, detail="format must be one of: json, compact")
+
+    body = job.to_dict()
+    if job.status == DONE:
+        body["result"] = jsonable_encoder(build_generate_response(job.request, job.result, format))
+    elif job.status == FAILED:
+        body["result"] = build_error_response(job.error)
+    return body
+
+
+@app.post("/jobs/{job_id}/stop")
+async def stop_job(job_id: str):
+    """Accept the best solution found so far and free the solver."""
+    job = job_queue.stop(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, poll_interval: float = 0.25):
+    """Server-Sent Events: `progress` on every change, `solution` per improved solution, then `done`."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last_progress = None
+        last_solution = 0
+        while True:
+            job_queue.get(job_id)  # refresh QUEUED -> RUNNING
+            finished = job.status not in (QUEUED, RUNNING)
+            progress = job.progress()
+
+            solution_count = progress.get("solution_count", 0)
+            if solution_count > last_solution:
+                solution = job.latest_solution()
+                if solution is not None:
+                    yield sse_event("solution", {
+                        **progress,
+                        "status": job.status,
+                        "timetables": build_generate_response(job.request, solution),
+                    })
+                last_solution = solution_count
+
+            progress.pop("elapsed", None)
+            if progress != last_progress:
+                yield sse_event("progress", {**job.to_dict()})
+                last_progress = progress
+
+            if finished:
+                yield sse_event("done", await get_job(job_id))
+                return
+            await asyncio.sleep(poll_interval)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return solution_cache.snapshot()
+
+
+@app.delete("/cache")
+async def clear_cache():
+    solution_cache.clear()
+    return {"message": "Cleared"}
+
+
+# --- Startup (deferred out of module import; see lifespan) ---
+startup = {"ready": False, "phases": {}, "solver_pool": None, "error": None}
+
+
+@contextmanager
+def startup_phase(phase: str):
+    started = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - started
+    startup["phases"][phase] = round(seconds, 3)
+    metrics.observe_startup(phase, seconds)
+
+
+def ensure_indexes():
+    try:
+        with metrics.mongo_timer("startup.create_index"):
+            timetables().create_index(TIMETABLE_LIST_INDEX, name="userId_createdAt")
+    except pymongo.errors.PyMongoError as e:
+        # The API still serves /generate without Mongo; listings fall back to unindexed scans
+        print(f"Could not create timetable indexes: {e}")
+
+
+def prepare_service():
+    """Connect the database, warm the solver pool and load the solver here too (runs once, in a thread)."""
+    try:
+        with startup_phase("database"):
+            ensure_indexes()
+            if os.getenv("SOLUTION_CACHE_MONGO") == "1":
+                try:
+                    solution_cache.store = MongoSolutionStore(database()["solution_cache"], solution_cache.ttl_seconds)
+                except pymongo.errors.PyMongoError as e:
+                    print(f"Solution cache runs without its Mongo tier: {e}")
+        with startup_phase("solver_pool"):
+            startup["solver_pool"] = job_queue.warm()
+        with startup_phase("solver_import"):
+            import generator  # request validation (resolve_profile) runs in this process
+    except Exception as e:
+        startup["error"] = str(e)
+        print(f"Startup failed: {e}")
+        return
+    startup["ready"] = True
+    metrics.observe_startup("ready", time.perf_counter() - IMPORT_STARTED)
+    print(f"Ready in {time.perf_counter() - IMPORT_STARTED:.2f}s: {startup['phases']}, solver pool {startup['solver_pool']}")
 
 
 @app.post("/add")
@@ -135,15 +630,17 @@ async def add_timetable(request: Request):
     india = timezone("Asia/Kolkata")
     data["createdAt"] = datetime.now(india).isoformat()
     data["userId"] = PLACEHOLDER_USER_ID # Hardcode the user ID
+    data["version"] = 0 # Bumped by every update (optimistic concurrency for PATCH /timetables/{id}/cells)
 
     # Handle renaming of 'faculty' back to 'teacherData' for old frontend compatibility
     if "faculty" in data:
         data["teacherData"] = data.pop("faculty")
 
-    result = collection.insert_one(data)
-    inserted_doc = collection.find_one({"_id":result.inserted_id})
-    inserted_doc["_id"] = str(inserted_doc["_id"])  
-    return jsonable_encoder(inserted_doc)
+    with metrics.mongo_timer("add.insert_one"):
+        result = timetables().insert_one(data)
+    # insert_one stores exactly `data` (plus the generated _id): no need to read it back
+    data["_id"] = str(result.inserted_id)
+    return jsonable_encoder(data)
 
 
 @app.get("/get-timetables/{user_id}")
@@ -152,7 +649,10 @@ def get_timetables(user_id: str):
     # Force the query to use the placeholder ID for non-auth setup
     query = {"userId": PLACEHOLDER_USER_ID}  
 
-    for doc in collection.find(query).sort("createdAt", pymongo.DESCENDING):
+    with metrics.mongo_timer("get_timetables.find"):
+        docs = list(timetables().find(query).sort("createdAt", pymongo.DESCENDING))
+
+    for doc in docs:
         doc["_id"] = str(doc["_id"])
         if isinstance(doc.get("createdAt"), datetime):
             doc["createdAt"] = doc["createdAt"].isoformat()
@@ -171,6 +671,215 @@ def get_timetables(user_id: str):
 
     return data
 
+def encode_cursor(created_at: str, doc_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, str(doc_id)]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Query for documents after `cursor` in (createdAt, _id) descending order."""
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        doc_id = ObjectId(doc_id)
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"createdAt": {"$lt": created_at}},
+        {"createdAt": created_at, "_id": {"$lt": doc_id}},
+    ]}
+
+
+@app.get("/timetables")
+def list_timetables(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None):
+    """Saved timetable summaries (no grids), newest first; pass `next_cursor` back as `cursor` for the next page."""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    match = {"userId": PLACEHOLDER_USER_ID}
+    if cursor:
+        match.update(decode_cursor(cursor))
+
+    size = lambda field: {"$size": {"$ifNull": [f"${field}", []]}}
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"createdAt": pymongo.DESCENDING, "_id": pymongo.DESCENDING}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "title": 1,
+            "createdAt": 1,
+            "sizes": {
+                "classes": size("classes"),
+                "batches": size("batches"),
+                "classrooms": size("classrooms"),
+                "labs": size("labs"),
+                "faculty": size("teacherData"),
+                "workingDays": "$workingDays",
+                "periods": "$periods",
+            },
+        }},
+    ]
+    with metrics.mongo_timer("list_timetables.aggregate"):
+        docs = list(timetables().aggregate(pipeline))
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["createdAt"], docs[-1]["_id"])
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return {"items": docs, "next_cursor": next_cursor}
+
+
+@app.get("/timetables/{timetable_id}")
+def get_timetable(timetable_id: str):
+    """One saved timetable document, in full."""
+    try:
+        query = {"_id": ObjectId(timetable_id), "userId": PLACEHOLDER_USER_ID}
+    except InvalidId:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    with metrics.mongo_timer("get_timetable.find_one"):
+        doc = timetables().find_one(query)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    doc["_id"] = str(doc["_id"])
+    return jsonable_encoder(doc)
+
+
+def version_filter(version: int) -> Any:
+    # Documents saved before versioning have no field: they count as version 0
+    return {"$in": [None, 0]} if version == 0 else version
+
+
+def fetch_rows(query: Dict[str, Any], rows, operation: str) -> Tuple[Optional[Dict[str, Any]], Dict[tuple, Any]]:
+    """Only the requested (view, key) grids of one document, plus its version."""
+    projection = {"version": 1, **{f"{VIEW_FIELDS[view]}.{key}": 1 for view, key in rows}}
+    with metrics.mongo_timer(operation):
+        doc = timetables().find_one(query, projection)
+    if doc is None:
+        return None, {}
+    grids = {}
+    for view, key in rows:
+        grid = (doc.get(VIEW_FIELDS[view]) or {}).get(key)
+        if isinstance(grid, list):
+            grids[(view, key)] = grid
+    return doc, grids
+
+
+@app.patch("/timetables/{timetable_id}/cells")
+def patch_timetable_cells(timetable_id: str, body: CellEditRequest):
+    """Apply cell edits atomically with targeted $set paths, keeping the other views in step.
+
+    Fails with 409 when the stored version differs from `body.version` (reload and
+    retry) or when a new session lands on a taken cell.
+    """
+    try:
+        query = {"_id": ObjectId(timetable_id), "userId": PLACEHOLDER_USER_ID}
+    except InvalidId:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    edits = [edit.dict() for edit in body.edits]
+    if not edits:
+        raise HTTPException(status_code=422, detail="No edits given")
+
+    try:
+        for edit in edits:
+            if edit["view"] not in VIEW_FIELDS:
+                raise CellEditError(f"Unknown view '{edit['view']}'. Use one of: {', '.join(VIEW_FIELDS)}.")
+            edit["value"] = normalise_value(edit["value"])
+
+        # Rows of the edited cells and of the new sessions, then of the sessions being replaced
+        rows = rows_touched(edits, [edit["value"] for edit in edits])
+        for view, key in rows:
+            mongo_path(view, key, 0, 0)
+        doc, grids = fetch_rows(query, rows, "patch_cells.find_one")
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Timetable not found")
+        if doc.get("version", 0) != body.version:
+            raise HTTPException(status_code=409, detail={"message": "Timetable was changed since it was loaded.", "version": doc.get("version", 0)})
+
+        replaced = [grids[(e["view"], e["key"])][e["day"]][e["period"]] for e in edits
+                    if (e["view"], e["key"]) in grids and 0 <= e["day"] < len(grids[(e["view"], e["key"])])
+                    and 0 <= e["period"] < len(grids[(e["view"], e["key"])][e["day"]])]
+        missing = rows_touched([], replaced) - set(grids)
+        if missing:
+            for view, key in missing:
+                mongo_path(view, key, 0, 0)
+            _, more = fetch_rows(query, missing, "patch_cells.find_one")
+            grids.update(more)
+
+        changes = plan_cell_edits(grids, edits)
+        updates = {mongo_path(*cell): value for cell, value in changes.items()}
+    except CellEditError as e:
+        raise HTTPException(status_code=409 if e.conflicts else 422, detail={"message": e.message, "conflicts": e.conflicts})
+
+    with metrics.mongo_timer("patch_cells.update_one"):
+        result = timetables().update_one(
+            {**query, "version": version_filter(body.version)},
+            {"$set": updates, "$inc": {"version": 1}} if updates else {"$inc": {"version": 1}},
+        )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=409, detail={"message": "Timetable was changed since it was loaded."})
+
+    return {
+        "_id": timetable_id,
+        "version": body.version + 1,
+        "changes": [{"view": view, "key": key, "day": d, "period": p, "value": value}
+                    for (view, key, d, p), value in changes.items()],
+    }
+
+
+def load_occupancy(timetable_id: str) -> Tuple[OccupancyIndex, int]:
+    """Occupancy index of a saved timetable; only the version is read when it is already cached."""
+    try:
+        query = {"_id": ObjectId(timetable_id), "userId": PLACEHOLDER_USER_ID}
+    except InvalidId:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    with metrics.mongo_timer("validate_moves.version"):
+        head = timetables().find_one(query, {"version": 1})
+    if head is None:
+        raise HTTPException(status_code=404, detail="Timetable not found")
+    version = head.get("version", 0)
+
+    index = occupancy_cache.get((timetable_id, version))
+    if index is None:
+        projection = {"workingDays": 1, "periods": 1, VIEW_FIELDS["faculty"]: 1, VIEW_FIELDS["class"]: 1}
+        with metrics.mongo_timer("validate_moves.find_one"):
+            doc = timetables().find_one(query, projection)
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Timetable not found")
+        index = OccupancyIndex.from_timetable(doc)
+        occupancy_cache.put((timetable_id, version), index)
+    return index, version
+
+
+@app.post("/validate-moves")
+def validate_moves(body: ValidateMovesRequest):
+    """Check proposed moves/swaps against faculty, room, class/batch and one-lecture-per-day rules.
+
+    Each check is a handful of lookups in an occupancy index that is built once
+    per saved version, so it can run on every drag-hover. With `alternatives`,
+    every free slot for each dragged session is returned too.
+    """
+    if body.timetable_id:
+        index, version = load_occupancy(body.timetable_id)
+    elif body.timetable:
+        index, version = OccupancyIndex.from_timetable(body.timetable), None
+    else:
+        raise HTTPException(status_code=422, detail="Give timetable_id or timetable")
+
+    results = []
+    alternatives = {}
+    for move in body.moves:
+        if move.view not in VIEW_FIELDS:
+            raise HTTPException(status_code=422, detail=f"Unknown view '{move.view}'. Use one of: {', '.join(VIEW_FIELDS)}.")
+        result = index.check_move(move.view, move.key, move.day, move.period, move.to_day, move.to_period, move.swap)
+        if body.alternatives:
+            source = (move.view, move.key, move.day, move.period)
+            if source not in alternatives:
+                alternatives[source] = index.alternatives(*source)
+            result["alternatives"] = alternatives[source]
+        results.append(result)
+    return {"version": version, "results": results}
+
+
 @app.put("/update-timetable/{timetable_id}")
 async def update_timetable(timetable_id: str, request:Request):
     data = await request.json()
@@ -198,11 +907,13 @@ async def update_timetable(timetable_id: str, request:Request):
         "userId": PLACEHOLDER_USER_ID # Enforce placeholder ID
     }
     
-    updated_doc = collection.find_one_and_update(
-        {"_id": ObjectId(timetable_id)},
-        {"$set": {k:v for k,v in update_fields.items() if v is not None}}, # Filter out None values
-        return_document=pymongo.ReturnDocument.AFTER
-    )
+    with metrics.mongo_timer("update_timetable.find_one_and_update"):
+        updated_doc = timetables().find_one_and_update(
+            {"_id": ObjectId(timetable_id)},
+            {"$set": {k:v for k,v in update_fields.items() if v is not None}, # Filter out None values
+             "$inc": {"version": 1}},
+            return_document=pymongo.ReturnDocument.AFTER
+        )
     
     if not updated_doc:
          raise HTTPException(status_code=404, detail="Timetable not found")
@@ -218,15 +929,38 @@ async def update_timetable(timetable_id: str, request:Request):
 @app.delete("/delete-timetable/{timetable_id}")
 async def delete_timetable(timetable_id: str):
     # Enforce user ID filter for safety (even with placeholder)
-    result = collection.delete_one({"_id": ObjectId(timetable_id), "userId": PLACEHOLDER_USER_ID})
+    with metrics.mongo_timer("delete_timetable.delete_one"):
+        result = timetables().delete_one({"_id": ObjectId(timetable_id), "userId": PLACEHOLDER_USER_ID})
     if result.deleted_count == 1:
         return {"message": "Deleted"}
     return {"message": "Not Found"}
 
+@app.get("/metrics")
+def prometheus_metrics():
+    body, content_type = metrics.render(job_queue, solution_cache)
+    return Response(content=body, media_type=content_type)
+
+@app.get("/ready")
+def readiness():
+    """Readiness probe: 503 until startup has connected the database and warmed the solver pool.
+
+    `/` is the liveness probe; it answers as soon as the process serves requests.
+    """
+    body = {
+        "ready": startup["ready"],
+        "startup": startup["phases"],
+        "solver_pool": startup["solver_pool"],
+        "error": startup["error"],
+    }
+    return JSONResponse(body, status_code=200 if startup["ready"] else 503)
+
 @app.api_route("/", methods=["GET", "HEAD"])
 async def root():
     return {"message": "Timetable Generator API"}
 
+
+metrics.observe_startup("import", time.perf_counter() - IMPORT_STARTED)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,338 @@
+# backend/storage.py
+# Database used by the API. MONGO_URI picks the backend: a MongoDB URI opens a
+# pymongo database, `memory://` an in-process stand-in (MemoryDatabase) for
+# load tests and local runs without MongoDB.
+from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
+from typing import Dict, List, Any, Optional, Tuple
+from bson import ObjectId
+import threading
+import copy
+import os
+
+MEMORY_URI = "memory://"
+DATABASE_NAME = "timetableDB"
+
+
+def connect(uri: Optional[str] = None, name: str = DATABASE_NAME):
+    """Database for `uri` (default MONGO_URI): pymongo for MongoDB URIs, MemoryDatabase for memory://."""
+    uri = uri if uri is not None else os.getenv("MONGO_URI")
+    if uri and uri.startswith(MEMORY_URI):
+        print("Using the in-memory database (nothing is persisted)")
+        return MemoryDatabase()
+    import pymongo
+
+    return pymongo.MongoClient(uri)[name]
+
+
+# --- Documents: dotted paths, filters, projections, updates ---
+
+_MISSING = object()
+
+
+def _get(doc: Any, path: str) -> Any:
+    for part in path.split("."):
+        if isinstance(doc, dict) and part in doc:
+            doc = doc[part]
+        elif isinstance(doc, list) and part.isdigit() and int(part) < len(doc):
+            doc = doc[int(part)]
+        else:
+            return _MISSING
+    return doc
+
+
+def _set(doc: Dict[str, Any], path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        if isinstance(doc, list):
+            doc = doc[int(part)]
+        else:
+            doc = doc.setdefault(part, {})
+    if isinstance(doc, list):
+        doc[int(parts[-1])] = value
+    else:
+        doc[parts[-1]] = value
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if op == "$eq":
+        return _equals(value, operand)
+    if op == "$ne":
+        return not _equals(value, operand)
+    if op == "$in":
+        return any(_equals(value, item) for item in operand)
+    if op == "$nin":
+        return not any(_equals(value, item) for item in operand)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$lt":
+            return value < operand
+        if op == "$lte":
+            return value <= operand
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+    except TypeError:  # different BSON types never match a range
+        return False
+    raise ValueError(f"Unsupported query operator {op}")
+
+
+def _equals(value: Any, operand: Any) -> bool:
+    if value is _MISSING:
+        return operand is None
+    if isinstance(value, list) and not isinstance(operand, list):
+        return operand in value
+    return value == operand
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """MongoDB filter semantics for the subset the API uses ($or/$and, comparisons, $in, $exists)."""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            value = _get(doc, key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif not _equals(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _evaluate(doc: Dict[str, Any], expression: Any) -> Any:
+    """Aggregation expression: "$field" references, $size, $ifNull and nested documents."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        if "$size" in expression:
+            return len(_evaluate(doc, expression["$size"]))
+        if "$ifNull" in expression:
+            for item in expression["$ifNull"]:
+                value = _evaluate(doc, item)
+                if value is not None:
+                    return value
+            return None
+        return {key: _evaluate(doc, value) for key, value in expression.items()}
+    return expression
+
+
+def project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Inclusion (dotted paths and expressions) or exclusion projection; _id is kept unless excluded."""
+    if not projection:
+        return doc
+    fields = {key: spec for key, spec in projection.items() if key != "_id"}
+    if fields and all(spec in (0, False) for spec in fields.values()):
+        result = {key: value for key, value in doc.items() if key not in fields}
+    else:
+        result = {}
+        for key, spec in fields.items():
+            value = _get(doc, key) if spec in (1, True) else _evaluate(doc, spec)
+            if value is not _MISSING:
+                _set(result, key, value)
+    if projection.get("_id", 1) and "_id" in doc:
+        result["_id"] = doc["_id"]
+    return result
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Any]):
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                _set(doc, path, value)
+            elif op == "$inc":
+                current = _get(doc, path)
+                _set(doc, path, (0 if current in (_MISSING, None) else current) + value)
+            elif op == "$unset":
+                parent, _, last = path.rpartition(".")
+                container = _get(doc, parent) if parent else doc
+                if isinstance(container, dict):
+                    container.pop(last, None)
+            else:
+                raise ValueError(f"Unsupported update operator {op}")
+
+
+def _sort(docs: List[Dict[str, Any]], keys: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    # Stable sorts from the last key to the first; missing/null values sort lowest
+    for path, direction in reversed(keys):
+        def key(doc, path=path):
+            value = _get(doc, path)
+            return (0, 0) if value in (_MISSING, None) else (1, value)
+        docs = sorted(docs, key=key, reverse=direction < 0)
+    return docs
+
+
+# --- In-memory stand-in for pymongo's Database/Collection ---
+
+class MemoryCursor:
+    """Sorts, skips and limits the matched documents, then projects them (as MongoDB does)."""
+    def __init__(self, docs: List[Dict[str, Any]], projection: Optional[Dict[str, Any]] = None):
+        self._docs = docs
+        self._projection = projection
+
+    def sort(self, key, direction: int = 1) -> "MemoryCursor":
+        self._docs = _sort(self._docs, [(key, direction)] if isinstance(key, str) else list(key))
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._docs = self._docs[count:]
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        if count:
+            self._docs = self._docs[:count]
+        return self
+
+    def __iter__(self):
+        return iter([copy.deepcopy(project(doc, self._projection)) for doc in self._docs])
+
+
+class MemoryCollection:
+    """Thread-safe list of documents behind the pymongo calls the API makes.
+
+    Documents are deep-copied in and out, as a round trip through BSON would,
+    so callers never share state with the store. Stored documents are never
+    modified in place (updates replace them), so cursors can hold them and copy
+    only what they return. Indexes are recorded but not
+    used (every query is a scan) and TTL indexes do not expire anything.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.indexes: Dict[str, Any] = {}
+        self._docs: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _matching(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [doc for doc in self._docs if matches(doc, query or {})]
+
+    def create_index(self, keys, name: Optional[str] = None, **options) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        self.indexes[name] = {"key": keys, **options}
+        return name
+
+    def insert_one(self, document: Dict[str, Any]) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        with self._lock:
+            self._docs.append(copy.deepcopy(document))
+        return InsertOneResult(document["_id"], True)
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> MemoryCursor:
+        with self._lock:
+            return MemoryCursor(self._matching(query), projection)
+
+    def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            for doc in self._docs:
+                if matches(doc, query or {}):
+                    return copy.deepcopy(project(doc, projection))
+        return None
+
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        with self._lock:
+            return len(self._matching(query))
+
+    def _upsert(self, query: Dict[str, Any], update: Dict[str, Any]) -> Any:
+        doc = {key: value for key, value in query.items()
+               if not key.startswith("$") and not isinstance(value, dict)}
+        doc.setdefault("_id", ObjectId())
+        apply_update(doc, update)
+        self._docs.append(doc)
+        return doc["_id"]
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> UpdateResult:
+        with self._lock:
+            for i, doc in enumerate(self._docs):
+                if matches(doc, query):
+                    self._docs[i] = updated = copy.deepcopy(doc)
+                    apply_update(updated, copy.deepcopy(update))
+                    return UpdateResult({"n": 1, "nModified": int(updated != doc)}, True)
+            if upsert:
+                upserted = self._upsert(query, copy.deepcopy(update))
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": upserted}, True)
+        return UpdateResult({"n": 0, "nModified": 0}, True)
+
+    def replace_one(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False) -> UpdateResult:
+        with self._lock:
+            for i, doc in enumerate(self._docs):
+                if matches(doc, query):
+                    self._docs[i] = {**copy.deepcopy(replacement), "_id": doc["_id"]}
+                    return UpdateResult({"n": 1, "nModified": 1}, True)
+            if upsert:
+                upserted = self._upsert(query, {"$set": copy.deepcopy(replacement)})
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": upserted}, True)
+        return UpdateResult({"n": 0, "nModified": 0}, True)
+
+    def find_one_and_update(self, query: Dict[str, Any], update: Dict[str, Any],
+                            projection: Optional[Dict[str, Any]] = None, return_document: bool = False,
+                            upsert: bool = False):
+        """`return_document` is pymongo.ReturnDocument.BEFORE (False) or AFTER (True)."""
+        with self._lock:
+            for i, doc in enumerate(self._docs):
+                if matches(doc, query):
+                    self._docs[i] = updated = copy.deepcopy(doc)
+                    apply_update(updated, copy.deepcopy(update))
+                    return copy.deepcopy(project(updated if return_document else doc, projection))
+            if upsert:
+                upserted = self._upsert(query, copy.deepcopy(update))
+                if return_document:
+                    return copy.deepcopy(project(self._docs[-1], projection))
+        return None
+
+    def delete_one(self, query: Dict[str, Any]) -> DeleteResult:
+        with self._lock:
+            for i, doc in enumerate(self._docs):
+                if matches(doc, query):
+                    del self._docs[i]
+                    return DeleteResult({"n": 1}, True)
+        return DeleteResult({"n": 0}, True)
+
+    def delete_many(self, query: Dict[str, Any]) -> DeleteResult:
+        with self._lock:
+            kept = [doc for doc in self._docs if not matches(doc, query)]
+            deleted = len(self._docs) - len(kept)
+            self._docs = kept
+        return DeleteResult({"n": deleted}, True)
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> MemoryCursor:
+        """$match, $sort, $skip, $limit and $project stages."""
+        with self._lock:
+            docs = self._docs
+            for stage in pipeline:
+                (name, spec), = stage.items()
+                if name == "$match":
+                    docs = [doc for doc in docs if matches(doc, spec)]
+                elif name == "$sort":
+                    docs = _sort(docs, list(spec.items()))
+                elif name == "$skip":
+                    docs = docs[spec:]
+                elif name == "$limit":
+                    docs = docs[:spec]
+                elif name == "$project":
+                    docs = [project(doc, spec) for doc in docs]
+                else:
+                    raise ValueError(f"Unsupported aggregation stage {name}")
+            return MemoryCursor(docs)
+
+
+class MemoryDatabase:
+    """Collections created on first access, like pymongo's `db[name]`."""
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+    def list_collection_names(self) -> List[str]:
+        return list(self._collections)
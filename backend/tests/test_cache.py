@@ -0,0 +1,35 @@
+# backend/tests/test_cache.py
+# Solution cache keys: what changes the solve changes the key, nothing else does.
+from cache import SolutionCache, request_cache_key
+from models import TimetableRequest
+
+REQUEST = {
+    "workingDays": 2, "periods": 3, "classes": ["CSE-A"], "batches": ["B1"], "classrooms": ["R1"], "labs": ["L1"],
+    "syllabus": {}, "userId": "u1", "title": "Sem 1",
+    "faculty": [
+        {"name": "Rao", "load_assignments": [{"subject": "Maths", "class_name": "CSE-A", "lecture_load": 2}]},
+        {"name": "Sen", "load_assignments": [{"subject": "Physics", "class_name": "CSE-A", "lecture_load": 1},
+                                             {"subject": "Chemistry", "class_name": "CSE-A", "lecture_load": 0}]},
+    ],
+}
+
+
+def request(**changes) -> TimetableRequest:
+    return TimetableRequest(**{**REQUEST, **changes})
+
+
+def test_hit_ignores_title_user_and_faculty_order():
+    cache = SolutionCache(max_entries=4, ttl_seconds=60)
+    cache.put(cache.key_for(request()), {"status": "FEASIBLE"})
+    same = request(title="Renamed", userId="u2", faculty=REQUEST["faculty"][::-1])
+    assert cache.get(cache.key_for(same)) == {"status": "FEASIBLE"}
+    assert cache.stats["hits"] == 1
+
+
+def test_solve_settings_change_the_key():
+    key = request_cache_key(request())
+    assert request_cache_key(request(periods=4)) != key
+    assert request_cache_key(request(profile="latency")) != key
+    assert request_cache_key(request(), mode="lns") != key
+    assert request_cache_key(request(), time_limit=5) != request_cache_key(request(), time_limit=10)
+    assert request_cache_key(request(), time_limit=None) == key
@@ -0,0 +1,39 @@
+# backend/tests/test_compact.py
+# Compact timetables keep concurrent batch labs, and rooms are never double booked.
+from collections import Counter
+from types import SimpleNamespace
+
+from compact import CompactTimetable, FULL_CLASS, assign_rooms
+
+REQUEST = SimpleNamespace(workingDays=1, periods=4, classes=["A", "B"], batches=["B1", "B2"],
+                          classrooms=["R1"], labs=["L1", "L2"], faculty=[SimpleNamespace(name=n) for n in ("Rao", "Sen", "Iyer")])
+# Busy cells: (class, batch, day, period) -> (faculty, subject, class, batch)
+OCCUPIED = {
+    ("A", FULL_CLASS, 0, 0): ("Rao", "Maths", "A", FULL_CLASS),
+    ("B", FULL_CLASS, 0, 1): ("Rao", "Maths", "B", FULL_CLASS),
+    # Both batches of A in labs at once (periods 2-3), B1 of B in period 0-1
+    **{("A", "B1", 0, p): ("Sen", "Chem Lab", "A", "B1") for p in (2, 3)},
+    **{("A", "B2", 0, p): ("Iyer", "Phy Lab", "A", "B2") for p in (2, 3)},
+    **{("B", "B1", 0, p): ("Sen", "Chem Lab", "B", "B1") for p in (0, 1)},
+}
+
+
+def test_assign_rooms_never_double_books():
+    rooms = assign_rooms(REQUEST, OCCUPIED)
+    assert set(rooms) == set(OCCUPIED)
+    taken = Counter((room, d, p) for (_, _, d, p), room in rooms.items())
+    assert max(taken.values()) == 1
+    # A lab block stays in one room
+    assert rooms[("A", "B1", 0, 2)] == rooms[("A", "B1", 0, 3)]
+    assert {rooms[(c, FULL_CLASS, 0, p)] for c, p in (("A", 0), ("B", 1))} == {"R1"}
+
+
+def test_concurrent_batch_labs_survive_the_round_trip():
+    compact = CompactTimetable.from_dict(CompactTimetable.from_cells(REQUEST, OCCUPIED).to_dict())
+    at_once = {compact.cell(sid)["batch"] for sid, d, p in compact.placements if (d, p) == (0, 2)}
+    assert at_once == {"B1", "B2"}
+
+    labs = compact.view("lab")
+    assert {labs["L1"][0][2]["batch"], labs["L2"][0][2]["batch"]} == {"B1", "B2"}
+    faculty = compact.view("faculty")
+    assert faculty["Sen"][0][3]["subject"] == "Chem Lab" and faculty["Iyer"][0][3]["subject"] == "Phy Lab"
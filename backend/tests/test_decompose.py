@@ -0,0 +1,35 @@
+# backend/tests/test_decompose.py
+# find_components splits classes that share no faculty and no binding room pool.
+from decompose import find_components, sub_request
+from generator import build_teacher_list
+from models import TimetableRequest
+
+
+def request(faculty, classrooms=("R1", "R2", "R3"), labs=("L1", "L2")) -> TimetableRequest:
+    return TimetableRequest(
+        workingDays=5, periods=6, classes=["A", "B", "C", "D"], batches=["B1"], classrooms=list(classrooms),
+        labs=list(labs), syllabus={}, userId="u1",
+        faculty=[{"name": name, "load_assignments": [{"subject": subject, "class_name": cls, "lecture_load": 2}
+                                                     for cls, subject in loads]} for name, loads in faculty.items()],
+    )
+
+
+FACULTY = {"Rao": [("A", "Maths"), ("B", "Maths")], "Sen": [("C", "Physics")]}
+
+
+def components(req):
+    return find_components(req, build_teacher_list(req))
+
+
+def test_shared_faculty_joins_and_idle_classes_are_dropped():
+    assert components(request(FACULTY)) == [["A", "B"], ["C"]]
+
+
+def test_binding_classroom_pool_joins_everything():
+    assert components(request(FACULTY, classrooms=("R1", "R2"))) == [["A", "B", "C"]]
+
+
+def test_sub_request_keeps_only_its_loads():
+    sub = sub_request(request(FACULTY), ["C"])
+    assert sub.classes == ["C"]
+    assert [f.name for f in sub.faculty] == ["Sen"]
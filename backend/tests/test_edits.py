@@ -0,0 +1,69 @@
+# backend/tests/test_edits.py
+# plan_cell_edits keeps the class, faculty and room views of a timetable consistent.
+import pytest
+
+from edits import FREE, CellEditError, plan_cell_edits
+
+MATHS = {"faculty": "Rao", "subject": "Maths", "class_name": "CSE-A", "batch": "", "room": "R1", "is_lab": False}
+PHYSICS = {"faculty": "Sen", "subject": "Physics", "class_name": "CSE-A", "batch": "", "room": "R2", "is_lab": False}
+LAB_B1 = {"faculty": "Rao", "subject": "Chem Lab", "class_name": "CSE-A", "batch": "B1", "room": "L1", "is_lab": True}
+LAB_B2 = {"faculty": "Sen", "subject": "Phy Lab", "class_name": "CSE-A", "batch": "B2", "room": "L2", "is_lab": True}
+
+
+def grids(**cells):
+    """One day of two periods per row; `cells` maps "view:key" to that row's cells."""
+    rows = {("class", "CSE-A"), ("faculty", "Rao"), ("faculty", "Sen"), ("classroom", "R1"), ("classroom", "R2"),
+            ("lab", "L1"), ("lab", "L2")}
+    result = {row: [[FREE, FREE]] for row in rows}
+    for name, row in cells.items():
+        view, key = name.split(":")
+        result[(view, key)] = [list(row)]
+    return result
+
+
+def edit(view, key, period, value):
+    return {"view": view, "key": key, "day": 0, "period": period, "value": value}
+
+
+def test_move_updates_every_view():
+    before = grids(**{"class:CSE-A": [MATHS, FREE], "faculty:Rao": [MATHS, FREE], "classroom:R1": [MATHS, FREE]})
+    writes = plan_cell_edits(before, [edit("class", "CSE-A", 0, FREE), edit("class", "CSE-A", 1, MATHS)])
+    assert writes == {
+        ("class", "CSE-A", 0, 0): FREE, ("faculty", "Rao", 0, 0): FREE, ("classroom", "R1", 0, 0): FREE,
+        ("class", "CSE-A", 0, 1): MATHS, ("faculty", "Rao", 0, 1): MATHS, ("classroom", "R1", 0, 1): MATHS,
+    }
+
+
+def test_swap_within_one_batch_of_edits():
+    before = grids(**{"class:CSE-A": [MATHS, PHYSICS], "faculty:Rao": [MATHS, FREE], "faculty:Sen": [FREE, PHYSICS],
+                      "classroom:R1": [MATHS, FREE], "classroom:R2": [FREE, PHYSICS]})
+    writes = plan_cell_edits(before, [edit("class", "CSE-A", 0, PHYSICS), edit("class", "CSE-A", 1, MATHS)])
+    assert writes[("class", "CSE-A", 0, 0)] == PHYSICS and writes[("class", "CSE-A", 0, 1)] == MATHS
+    assert writes[("faculty", "Sen", 0, 0)] == PHYSICS and writes[("faculty", "Sen", 0, 1)] == FREE
+    assert writes[("faculty", "Rao", 0, 1)] == MATHS and writes[("faculty", "Rao", 0, 0)] == FREE
+
+
+def test_conflicting_placement_is_rejected():
+    busy = {**PHYSICS, "faculty": "Rao"}
+    before = grids(**{"faculty:Rao": [FREE, busy]})
+    with pytest.raises(CellEditError) as error:
+        plan_cell_edits(before, [edit("class", "CSE-A", 1, MATHS)])
+    assert error.value.conflicts == [{"view": "faculty", "key": "Rao", "day": 0, "period": 1, "current": busy}]
+
+
+def test_concurrent_batch_labs_share_the_class_cell():
+    before = grids(**{"class:CSE-A": [LAB_B1, FREE], "faculty:Rao": [LAB_B1, FREE], "lab:L1": [LAB_B1, FREE]})
+    writes = plan_cell_edits(before, [edit("lab", "L2", 0, LAB_B2)])
+    assert writes == {("lab", "L2", 0, 0): LAB_B2, ("faculty", "Sen", 0, 0): LAB_B2}
+
+
+def test_invalid_edits():
+    before = grids()
+    with pytest.raises(CellEditError):
+        plan_cell_edits(before, [edit("room", "R1", 0, FREE)])
+    with pytest.raises(CellEditError):
+        plan_cell_edits(before, [edit("class", "CSE-B", 0, FREE)])
+    with pytest.raises(CellEditError):
+        plan_cell_edits(before, [edit("class", "CSE-A", 5, FREE)])
+    with pytest.raises(CellEditError):
+        plan_cell_edits(before, [edit("faculty", "Sen", 0, MATHS)])  # Maths is Rao's
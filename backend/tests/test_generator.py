@@ -0,0 +1,42 @@
+# backend/tests/test_generator.py
+# A small request solves to a timetable that meets every load without double bookings.
+from collections import Counter
+
+from compact import CompactTimetable
+from generator import generate_from_input
+from models import TimetableRequest
+
+REQUEST = TimetableRequest(
+    workingDays=3, periods=4, classes=["CSE-A", "CSE-B"], batches=["B1", "B2"], classrooms=["R1", "R2"],
+    labs=["L1"], syllabus={}, userId="u1",
+    faculty=[
+        {"name": "Rao", "load_assignments": [{"subject": "Maths", "class_name": "CSE-A", "lecture_load": 3},
+                                             {"subject": "Maths", "class_name": "CSE-B", "lecture_load": 3}]},
+        {"name": "Sen", "load_assignments": [{"subject": "Physics", "class_name": "CSE-A", "lecture_load": 2},
+                                             {"subject": "Physics Lab", "class_name": "CSE-A", "lecture_load": 0,
+                                              "lab_load": 4}]},
+    ],
+)
+
+
+def test_feasible_solve_meets_loads_without_conflicts():
+    timetable = CompactTimetable.from_dict(generate_from_input(REQUEST, time_limit=10)["compact"])
+    sessions = [timetable.sessions[sid] for sid, _, _ in timetable.placements]
+
+    periods = Counter((faculty, subject, class_name, batch) for faculty, subject, class_name, batch, _ in sessions)
+    assert periods == {("Rao", "Maths", "CSE-A", "Full Class"): 3, ("Rao", "Maths", "CSE-B", "Full Class"): 3,
+                       ("Sen", "Physics", "CSE-A", "Full Class"): 2,
+                       ("Sen", "Physics Lab", "CSE-A", "B1"): 2, ("Sen", "Physics Lab", "CSE-A", "B2"): 2}
+
+    # Each faculty member and room holds at most one session per period
+    slots = timetable.placements
+    for column in (0, 4):
+        taken = Counter((timetable.sessions[sid][column], d, p) for sid, d, p in slots)
+        assert max(taken.values()) == 1
+    # A class is never in a lecture and a lab at once
+    for class_name in REQUEST.classes:
+        for d in range(REQUEST.workingDays):
+            for p in range(REQUEST.periods):
+                batches = {timetable.sessions[sid][3] for sid, sd, sp in slots
+                           if (sd, sp) == (d, p) and timetable.sessions[sid][2] == class_name}
+                assert not ("Full Class" in batches and len(batches) > 1)
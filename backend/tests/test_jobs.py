@@ -0,0 +1,44 @@
+# backend/tests/test_jobs.py
+# JobQueue: pooled solves, cache hits and back-pressure.
+import time
+
+import pytest
+
+from cache import SolutionCache
+from compact import CompactTimetable
+from jobs import JobQueue, JobQueueFull, DONE, available_cores
+from models import TimetableRequest
+
+REQUEST = {
+    "workingDays": 2, "periods": 3, "classes": ["CSE-A"], "batches": ["B1"], "classrooms": ["R1"], "labs": ["L1"],
+    "syllabus": {}, "userId": "u1",
+    "faculty": [{"name": "Rao", "load_assignments": [{"subject": "Maths", "class_name": "CSE-A", "lecture_load": 2}]}],
+}
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(max_workers=1, max_pending=0, cache=SolutionCache(max_entries=4, ttl_seconds=60), prewarm=0)
+    yield queue
+    queue.shutdown()
+
+
+def test_solve_then_cache_hit(queue):
+    job = queue.submit(TimetableRequest(**REQUEST))
+    result = job.future.result(timeout=60)
+    deadline = time.time() + 5
+    while job.status != DONE and time.time() < deadline:  # done callbacks run after result() returns
+        time.sleep(0.01)
+    assert CompactTimetable.from_dict(result["compact"]).timetables()["class_timetable"]["CSE-A"]
+    # Pooled jobs without a profile split the cores between the pool's workers
+    assert result["search_profile"]["num_workers"] == max(1, available_cores() // queue.max_workers)
+
+    again = queue.submit(TimetableRequest(**{**REQUEST, "title": "Copy"}))
+    assert again.status == DONE and again.result == result
+    assert queue.cache.stats["hits"] == 1
+
+
+def test_full_queue_rejects(queue):
+    queue.submit(TimetableRequest(**REQUEST))
+    with pytest.raises(JobQueueFull):
+        queue.submit(TimetableRequest(**REQUEST), time_limit=5)
@@ -0,0 +1,57 @@
+# backend/tests/test_occupancy.py
+# Move validation and free-slot search on an OccupancyIndex.
+from occupancy import OccupancyIndex, session_key
+
+FREE = "Free"
+MATHS = {"faculty": "Rao", "subject": "Maths", "class_name": "CSE-A", "batch": "", "room": "R1", "is_lab": False}
+PHYSICS = {"faculty": "Sen", "subject": "Physics", "class_name": "CSE-A", "batch": "", "room": "R1", "is_lab": False}
+LAB = {"faculty": "Sen", "subject": "Phy Lab", "class_name": "CSE-A", "batch": "B1", "room": "L1", "is_lab": True}
+OTHER = {"faculty": "Rao", "subject": "Maths", "class_name": "CSE-B", "batch": "", "room": "R2", "is_lab": False}
+
+
+def index():
+    """Two days of four periods. Day 0: Maths, Physics, lab double block. Day 1: Rao teaches CSE-B in period 0."""
+    return OccupancyIndex.from_timetable({
+        "workingDays": 2, "periods": 4,
+        "teacher_timetable": {
+            "Rao": [[MATHS, FREE, FREE, FREE], [OTHER, FREE, FREE, FREE]],
+            "Sen": [[FREE, PHYSICS, LAB, LAB], [FREE, FREE, FREE, FREE]],
+        },
+    })
+
+
+def test_from_timetable_indexes_every_resource():
+    occupancy = index()
+    assert occupancy.at("class", "CSE-A", 0, 2) == session_key(LAB)
+    assert occupancy.at("classroom", "R1", 0, 1) == session_key(PHYSICS)
+    assert occupancy.batches["CSE-A"] == {"B1"}
+
+
+def test_check_move_reports_conflicts():
+    occupancy = index()
+    assert occupancy.check_move("class", "CSE-A", 0, 0, 1, 2) == {"valid": True, "conflicts": []}
+    faculty_busy = occupancy.check_move("class", "CSE-A", 0, 0, 1, 0)
+    assert not faculty_busy["valid"]
+    assert {(c["kind"], c["name"]) for c in faculty_busy["conflicts"]} == {("faculty", "Rao")}
+    same_day = occupancy.check_move("class", "CSE-A", 0, 0, 0, 1)
+    assert {c["kind"] for c in same_day["conflicts"]} == {"classroom", "class"}
+    assert occupancy.check_move("class", "CSE-A", 0, 0, 0, 1, swap=True)["valid"]
+    assert occupancy.check_move("class", "CSE-A", 1, 3, 0, 0)["conflicts"] == [{"kind": "empty_source"}]
+    assert occupancy.check_move("class", "CSE-A", 0, 0, 2, 0)["conflicts"] == [{"kind": "out_of_range"}]
+
+
+def test_lab_blocks_move_together():
+    occupancy = index()
+    assert occupancy.check_move("lab", "L1", 0, 3, 1, 0)["conflicts"][0]["kind"] == "lab_block_split"
+    assert occupancy.check_move("lab", "L1", 0, 2, 1, 2)["valid"]
+
+
+def test_alternatives_match_check_move():
+    occupancy = index()
+    for view, key, day, period in [("class", "CSE-A", 0, 0), ("lab", "L1", 0, 2), ("faculty", "Sen", 0, 1)]:
+        free = occupancy.alternatives(view, key, day, period)
+        assert free
+        expected = [{"day": d, "period": p} for d in range(2) for p in range(4)
+                    if (d, p) != (day, period) and occupancy.check_move(view, key, day, period, d, p)["valid"]]
+        assert free == expected
+    assert occupancy.alternatives("class", "CSE-A", 1, 3) == []
@@ -0,0 +1,57 @@
+# backend/tests/test_storage.py
+# Filter, projection and update semantics of the in-memory database.
+from storage import MemoryDatabase, matches, project, apply_update
+
+DOC = {"_id": 1, "userId": "u1", "title": "CSE", "version": 3, "tags": ["draft", "sem1"],
+       "class_timetable": {"A": [["Free", {"subject": "Maths"}]]}}
+
+
+def test_matches_equality_and_arrays():
+    assert matches(DOC, {"userId": "u1", "title": "CSE"})
+    assert not matches(DOC, {"userId": "u2"})
+    assert matches(DOC, {"tags": "sem1"})
+    assert matches(DOC, {"class_timetable.A.0.1.subject": "Maths"})
+    assert matches(DOC, {"missing": None})
+
+
+def test_matches_operators():
+    assert matches(DOC, {"version": {"$gte": 3, "$lt": 4}})
+    assert not matches(DOC, {"version": {"$gt": 3}})
+    assert matches(DOC, {"title": {"$in": ["ECE", "CSE"]}, "userId": {"$nin": ["u2"]}})
+    assert matches(DOC, {"missing": {"$exists": False}, "title": {"$exists": True}})
+    assert matches(DOC, {"$or": [{"title": "ECE"}, {"version": 3}]})
+    assert not matches(DOC, {"$and": [{"title": "CSE"}, {"version": {"$ne": 3}}]})
+    assert not matches(DOC, {"title": {"$lt": 5}})  # different types never match a range
+
+
+def test_project_inclusion_exclusion_and_expressions():
+    assert project(DOC, {"title": 1}) == {"_id": 1, "title": "CSE"}
+    assert project(DOC, {"title": 1, "_id": 0}) == {"title": "CSE"}
+    assert "class_timetable" not in project(DOC, {"class_timetable": 0})
+    assert project(DOC, {"tagCount": {"$size": "$tags"}, "owner": {"$ifNull": ["$missing", "$userId"]}, "_id": 0}) \
+        == {"tagCount": 2, "owner": "u1"}
+    assert project(DOC, {"class_timetable.A": 1, "_id": 0}) == {"class_timetable": {"A": DOC["class_timetable"]["A"]}}
+
+
+def test_apply_update():
+    doc = {"version": 1, "grid": {"A": [["Free", "Free"]]}, "stale": True}
+    apply_update(doc, {"$set": {"grid.A.0.1": "Maths", "title": "CSE"}, "$inc": {"version": 1, "edits": 2},
+                       "$unset": {"stale": ""}})
+    assert doc == {"version": 2, "grid": {"A": [["Free", "Maths"]]}, "title": "CSE", "edits": 2}
+
+
+def test_collection_round_trip_copies_documents():
+    collection = MemoryDatabase()["timetables"]
+    doc = {"title": "CSE", "version": 1}
+    inserted = collection.insert_one(doc).inserted_id
+    doc["title"] = "changed"
+    found = collection.find_one({"_id": inserted})
+    assert found["title"] == "CSE"
+    found["title"] = "changed"
+    assert collection.find_one({"_id": inserted})["title"] == "CSE"
+
+    assert collection.update_one({"_id": inserted, "version": 1}, {"$inc": {"version": 1}}).modified_count == 1
+    assert collection.update_one({"_id": inserted, "version": 1}, {"$inc": {"version": 1}}).matched_count == 0
+    collection.insert_one({"title": "ECE", "version": 5})
+    assert [d["title"] for d in collection.find({}, {"title": 1}).sort("version", -1)] == ["ECE", "CSE"]
+    assert collection.delete_many({"version": {"$gte": 2}}).deleted_count == 2